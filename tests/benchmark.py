@@ -0,0 +1,435 @@
+"""
+Benchmark the script editor hot paths
+
+usage:
+    python -m tests.benchmark [--only NAME ...] [--scale S]
+                              [--json PATH] [--compare BASELINE]
+
+Runs headless, e.g. with QT_QPA_PLATFORM=offscreen, and outside Unreal: a
+fake ``unreal`` module is installed first (see ``fakeUnreal``). Results
+are printed, and written as json with --json so the runs of two commits
+can be compared with --compare, which exits with 1 on a regression.
+
+Metrics ending with '_per_sec' are better higher, the ones ending with
+'_sec' are better lower.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from Qt import QtWidgets
+import Qt
+
+from unreal_script_editor import outputTextWidget
+
+from . import fakeUnreal
+
+
+MODULE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+LOG_LINES = 20000
+HIGHLIGHT_BLOCKS = 20000
+INDENT_LINES = 20000
+PAINT_LINES = 50000
+PAINT_COUNT = 200
+SESSION_TABS = 40
+SESSION_TAB_LINES = 5000
+
+# fake unreal classes, enough for the completion index to matter
+FAKE_CLASSES = 2000
+
+# results giving the size a benchmark ran with
+SIZE_KEYS = ('blocks', 'lines', 'tabs', 'tab_lines')
+
+# relative change of a metric reported as a regression
+REGRESSION_THRESHOLD = 0.1
+
+
+def legacy_update_logger(log_edit, message, mtype=None):
+    """
+    The original unbuffered QTextEdit append path of
+    OutputTextWidget.update_logger, kept as the baseline the buffered log
+    view is measured against
+
+    :param log_edit: QTextEdit. log text edit
+    :param message: str. message
+    :param mtype: str. message type
+    """
+    log_edit.setCurrentCharFormat(
+        outputTextWidget.LEVEL_FORMATS.get(mtype, outputTextWidget.REGULAR_FORMAT))
+
+    log_edit.insertPlainText(message)
+    log_edit.insertPlainText('\n')
+
+    scroll = log_edit.verticalScrollBar()
+    scroll.setValue(scroll.maximum())
+
+
+def python_sample(lines):
+    """
+    :param lines: int. number of lines
+    :return: str. python source built from the package sources
+    """
+    from unreal_script_editor.codeEditor.highlighter import benchmark
+
+    text = benchmark.sample_text(lines)
+    return '\n'.join(text.split('\n')[:lines])
+
+
+def json_sample(lines):
+    """
+    :param lines: int. minimum number of lines
+    :return: str. indented json document
+    """
+    items = list()
+    text = ''
+    while text.count('\n') < lines:
+        items.extend({
+            'name': 'asset_{}'.format(len(items) + i),
+            'path': '/Game/Props/asset_{}'.format(len(items) + i),
+            'enabled': i % 2 == 0,
+            'scale': [1.0, 0.5 * i, -2e-3],
+            'tags': None,
+        } for i in range(max(1, lines // 16)))
+        text = json.dumps(items, indent=4)
+    return text
+
+
+def bench_logger(lines=LOG_LINES):
+    """
+    Measure the log append throughput, unbuffered text edit against the
+    buffered log view
+
+    :param lines: int. number of messages appended
+    :return: dict. lines per second of both paths and the speedup
+    """
+    app = QtWidgets.QApplication.instance()
+    levels = ['info', 'info', 'info', 'warning', 'error']
+    messages = [
+        ('LogPython: processing asset {} of {}'.format(i, lines), levels[i % 5])
+        for i in range(lines)
+    ]
+
+    results = dict()
+    for name in ('legacy', 'buffered'):
+        if name == 'legacy':
+            widget = QtWidgets.QTextEdit()
+            widget.setReadOnly(True)
+        else:
+            widget = outputTextWidget.OutputTextWidget(archive_path=None)
+        widget.show()
+        app.processEvents()
+
+        start = time.perf_counter()
+        for message, mtype in messages:
+            if name == 'legacy':
+                legacy_update_logger(widget, message, mtype)
+            else:
+                widget.update_logger(message, mtype)
+        if name != 'legacy':
+            widget.flush()
+        app.processEvents()
+        elapsed = time.perf_counter() - start
+
+        results['{}_lines_per_sec'.format(name)] = lines / max(elapsed, 1e-9)
+        widget.close()
+        widget.deleteLater()
+
+    results['lines'] = lines
+    results['speedup'] = (results['buffered_lines_per_sec'] /
+                          results['legacy_lines_per_sec'])
+    return results
+
+
+def bench_highlight(blocks=HIGHLIGHT_BLOCKS):
+    """
+    Measure the full document highlighting throughput
+
+    :param blocks: int. number of lines of the samples
+    :return: dict. blocks per second of the python and json highlighters
+    """
+    from unreal_script_editor.codeEditor.highlighter import benchmark, jsonHighlight, pyHighlight
+
+    return {
+        'blocks': blocks,
+        'python_blocks_per_sec': benchmark.measure(
+            pyHighlight.PythonHighlighter, python_sample(blocks)),
+        'json_blocks_per_sec': benchmark.measure(
+            jsonHighlight.JsonHighlighter, json_sample(blocks)),
+    }
+
+
+def bench_indent(lines=INDENT_LINES):
+    """
+    Measure the line edits of a large selection, in a highlighted editor
+
+    :param lines: int. number of selected lines
+    :return: dict. lines per second of each edit
+    """
+    from unreal_script_editor.codeEditor import codeEditor
+    from unreal_script_editor.codeEditor.highlighter import pyHighlight
+
+    editor = codeEditor.CodeEditor()
+    editor.setPlainText(python_sample(lines))
+    highlighter = pyHighlight.PythonHighlighter(editor.document())
+    selection = list(range(lines))
+
+    results = {'lines': lines}
+    for name, edit in (('indent', editor.do_indent),
+                       ('unindent', editor.undo_indent),
+                       ('comment', editor.do_comment),
+                       ('uncomment', editor.undo_comment)):
+        start = time.perf_counter()
+        edit(selection)
+        results['{}_lines_per_sec'.format(name)] = \
+            lines / max(time.perf_counter() - start, 1e-9)
+
+    highlighter.setDocument(None)
+    editor.deleteLater()
+    return results
+
+
+def bench_line_numbers(lines=PAINT_LINES, paints=PAINT_COUNT):
+    """
+    Measure the painting of the line number area, scrolled through a large
+    document with error marks
+
+    :param lines: int. number of lines of the document
+    :param paints: int. number of repaints
+    :return: dict. repaints per second
+    """
+    from unreal_script_editor.codeEditor import codeEditor
+
+    app = QtWidgets.QApplication.instance()
+    editor = codeEditor.CodeEditor()
+    editor.resize(800, 1000)
+    editor.setPlainText(python_sample(lines))
+    editor.set_error_lines({line: 'error' for line in range(0, lines, 50)})
+    editor.show()
+    app.processEvents()
+
+    scroll = editor.verticalScrollBar()
+    area = editor.line_number_area
+    start = time.perf_counter()
+    for index in range(paints):
+        scroll.setValue(scroll.maximum() * index // paints)
+        area.repaint()
+    elapsed = time.perf_counter() - start
+
+    editor.close()
+    editor.deleteLater()
+    return {
+        'lines': lines,
+        'paints_per_sec': paints / max(elapsed, 1e-9),
+    }
+
+
+def bench_session(tabs=SESSION_TABS, tab_lines=SESSION_TAB_LINES):
+    """
+    Measure saving and restoring a session of many large tabs, in a
+    temporary session folder
+
+    :param tabs: int. number of tabs
+    :param tab_lines: int. number of lines per tab
+    :return: dict. seconds of a full save, a single tab save, a session
+             load and a window restore
+    """
+    from unreal_script_editor import main, sessionStore
+
+    folder = tempfile.mkdtemp(prefix='script_editor_bench_')
+    session_path, config_path = main.SESSION_PATH, main.CONFIG_PATH
+    snapshot_path = main.SNAPSHOT_PATH
+    main.SESSION_PATH = os.path.join(folder, 'session')
+    main.CONFIG_PATH = os.path.join(folder, 'config.txt')
+    main.SNAPSHOT_PATH = os.path.join(folder, 'snapshots')
+
+    text = python_sample(tab_lines)
+    try:
+        window = main.ScriptEditorWindow()
+        for index in range(tabs):
+            window.insert_tab(window.ui_tab_widget.count() - 1,
+                              '# tab {}\n{}'.format(index, text),
+                              'Tab {}'.format(index), activate=False)
+
+        start = time.perf_counter()
+        window.save_configs()
+        save_all = time.perf_counter() - start
+
+        script_tab = window.ui_tab_widget.widget(1)
+        script_tab.setPlainText('# edited\n' + text)
+        start = time.perf_counter()
+        window.save_configs()
+        save_one = time.perf_counter() - start
+        # the snapshots of the saves are written in the background
+        window.snapshots.wait()
+        window.deleteLater()
+
+        start = time.perf_counter()
+        sessionStore.SessionStore(main.SESSION_PATH).load()
+        load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        restored = main.ScriptEditorWindow()
+        restore = time.perf_counter() - start
+        restored.deleteLater()
+    finally:
+        main.SESSION_PATH, main.CONFIG_PATH = session_path, config_path
+        main.SNAPSHOT_PATH = snapshot_path
+        shutil.rmtree(folder, ignore_errors=True)
+
+    return {
+        'tabs': tabs,
+        'tab_lines': tab_lines,
+        'megabytes': tabs * len(text) / 1048576.0,
+        'save_all_sec': save_all,
+        'save_one_sec': save_one,
+        'load_sec': load,
+        'restore_window_sec': restore,
+    }
+
+
+BENCHMARKS = {
+    'highlight': bench_highlight,
+    'logger': bench_logger,
+    'session': bench_session,
+    'indent': bench_indent,
+    'line_numbers': bench_line_numbers,
+}
+
+
+def scaled_sizes(scale):
+    """
+    :param scale: float. factor applied to the default sizes
+    :return: dict. keyword arguments of each benchmark
+    """
+    def size(value):
+        return max(1, int(value * scale))
+
+    return {
+        'highlight': {'blocks': size(HIGHLIGHT_BLOCKS)},
+        'logger': {'lines': size(LOG_LINES)},
+        'session': {'tabs': size(SESSION_TABS), 'tab_lines': size(SESSION_TAB_LINES)},
+        'indent': {'lines': size(INDENT_LINES)},
+        'line_numbers': {'lines': size(PAINT_LINES)},
+    }
+
+
+def metadata():
+    """
+    :return: dict. commit, interpreter and Qt binding of the run
+    """
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=MODULE_PATH,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'commit': commit,
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'qt_binding': Qt.__binding__,
+        'qt_version': Qt.__qt_version__,
+        'qpa_platform': QtWidgets.QApplication.platformName(),
+    }
+
+
+def run(names=None, sizes=None):
+    """
+    Run benchmarks, with a fake unreal module
+
+    :param names: [str]. benchmarks to run, all if None
+    :param sizes: dict. keyword arguments of each benchmark, see scaled_sizes
+    :return: dict. metadata and results of each benchmark
+    """
+    fakeUnreal.install(FAKE_CLASSES)
+    sizes = sizes or dict()
+    results = dict()
+    for name in names or sorted(BENCHMARKS):
+        results[name] = BENCHMARKS[name](**sizes.get(name, dict()))
+        QtWidgets.QApplication.instance().processEvents()
+    return {'meta': metadata(), 'results': results}
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Compare the metrics of two runs, the benchmarks run with other sizes
+    are skipped
+
+    :param baseline: dict. previous run, as returned by run
+    :param current: dict. new run
+    :param threshold: float. relative change reported as a regression
+    :return: [(str, float, float, float, bool)]. metric, baseline value,
+             current value, relative change and whether it regressed
+    """
+    rows = list()
+    for group, metrics in sorted(current['results'].items()):
+        previous = baseline.get('results', dict()).get(group, dict())
+        if any(previous.get(key) != metrics[key] for key in SIZE_KEYS if key in metrics):
+            continue
+        for key, value in sorted(metrics.items()):
+            if not previous.get(key):
+                continue
+            if key.endswith('_per_sec'):
+                change = value / previous[key] - 1
+                regressed = change < -threshold
+            elif key.endswith('_sec'):
+                change = value / previous[key] - 1
+                regressed = change > threshold
+            else:
+                continue
+            rows.append(('{}.{}'.format(group, key), previous[key], value,
+                         change, regressed))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS),
+                        help='benchmarks to run, all by default')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='factor applied to the default sizes')
+    parser.add_argument('--lines', type=int,
+                        help='number of log lines appended, scaled by default')
+    parser.add_argument('--json', help='file to write the results to')
+    parser.add_argument('--compare', help='results of a previous run')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+    sizes = scaled_sizes(args.scale)
+    if args.lines:
+        sizes['logger']['lines'] = args.lines
+    current = run(args.only, sizes)
+    for group, metrics in sorted(current['results'].items()):
+        print('{}: {}'.format(group, ', '.join(
+            '{} {:.4g}'.format(key, value) for key, value in sorted(metrics.items()))))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        rows = compare(baseline, current, args.threshold)
+        for name, before, after, change, regressed in rows:
+            print('{:<40} {:>12.4g} {:>12.4g} {:>+8.1%}{}'.format(
+                name, before, after, change, '  REGRESSION' if regressed else ''))
+        if any(row[-1] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,18 @@
+"""
+Shared fixtures, the tests run headless and outside Unreal
+"""
+
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    """
+    :return: QApplication. application of the widget tests
+    """
+    from Qt import QtWidgets
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
@@ -0,0 +1,215 @@
+"""
+Stand-in for an Unreal editor with python remote execution enabled
+
+It answers the pings of the multicast group, connects to the command
+endpoint of a client and runs the received commands in its own namespace,
+as Unreal does, so the remote execution client can be tested anywhere.
+
+usage:
+    python -m tests.fakeRemote [--project NAME]
+"""
+
+import argparse
+import contextlib
+import getpass
+import io
+import os
+import platform
+import socket
+import sys
+import threading
+import time
+import traceback
+import uuid
+
+from unreal_script_editor import executor, remoteExecution
+
+from .fakeUnreal import ENGINE_VERSION
+
+
+class RemoteNode(object):
+    """
+    Node of the remote execution protocol, running commands in this
+    interpreter
+    """
+
+    def __init__(self, project_name='StandIn', group=remoteExecution.MULTICAST_GROUP,
+                 bind_address=remoteExecution.MULTICAST_BIND_ADDRESS):
+        """
+        Initialization
+
+        :param project_name: str. project name answered to the pings
+        :param group: (str, int). multicast group address and port
+        :param bind_address: str. address of the interface joining the group
+        """
+        self.node_id = str(uuid.uuid4())
+        self.project_name = project_name
+        self.group = group
+        self.bind_address = bind_address
+        self.namespace = executor.new_namespace()
+        # number of commands run
+        self.command_count = 0
+
+        self._socket = None
+        self._connections = dict()
+        self._stopping = threading.Event()
+        self._thread = None
+        # commands run one at a time, like on the game thread
+        self._execute_lock = threading.Lock()
+
+    def start(self):
+        self._socket = remoteExecution.multicast_socket(self.group, self.bind_address)
+        self._socket.settimeout(0.1)
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for connection in list(self._connections.values()):
+            self._close(connection)
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def pong_data(self):
+        return {
+            'user': getpass.getuser(),
+            'machine': platform.node(),
+            'engine_version': ENGINE_VERSION,
+            'engine_root': '',
+            'project_root': os.getcwd(),
+            'project_name': self.project_name,
+            'node_id': self.node_id,
+        }
+
+    def _send(self, message_type, dest, data=None):
+        self._socket.sendto(
+            remoteExecution.encode(message_type, self.node_id, dest, data), self.group)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                data = self._socket.recv(remoteExecution.RECEIVE_SIZE)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            message = remoteExecution.decode(data)
+            if message is None or message['source'] == self.node_id:
+                continue
+            if message['type'] == remoteExecution.TYPE_PING:
+                self._send(remoteExecution.TYPE_PONG, message['source'], self.pong_data())
+            elif message.get('dest') != self.node_id:
+                continue
+            elif message['type'] == remoteExecution.TYPE_OPEN_CONNECTION:
+                self._open(message['source'], message.get('data') or dict())
+            elif message['type'] == remoteExecution.TYPE_CLOSE_CONNECTION:
+                connection = self._connections.get(message['source'])
+                if connection is not None:
+                    self._close(connection)
+
+    def _open(self, client_id, data):
+        try:
+            connection = socket.create_connection(
+                (data['command_ip'], data['command_port']),
+                remoteExecution.CONNECT_TIMEOUT)
+        except (KeyError, OSError):
+            return
+        connection.settimeout(None)
+        previous = self._connections.pop(client_id, None)
+        if previous is not None:
+            self._close(previous)
+        self._connections[client_id] = connection
+        thread = threading.Thread(target=self._serve, args=(client_id, connection))
+        thread.daemon = True
+        thread.start()
+
+    def _close(self, connection):
+        try:
+            connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        connection.close()
+
+    def _serve(self, client_id, connection):
+        reader = remoteExecution.MessageReader()
+        while True:
+            try:
+                data = connection.recv(remoteExecution.RECEIVE_SIZE)
+            except OSError:
+                break
+            if not data:
+                break
+            for message in reader.feed(data):
+                if message['type'] != remoteExecution.TYPE_COMMAND:
+                    continue
+                result = self.execute(message.get('data') or dict())
+                try:
+                    connection.sendall(remoteExecution.encode(
+                        remoteExecution.TYPE_COMMAND_RESULT, self.node_id,
+                        client_id, result))
+                except OSError:
+                    return
+        if self._connections.get(client_id) is connection:
+            del self._connections[client_id]
+
+    def execute(self, data):
+        """
+        :param data: dict. data of a command message
+        :return: dict. data of its command result message
+        """
+        command = data.get('command', '')
+        exec_mode = data.get('exec_mode', remoteExecution.EXECUTE_FILE)
+        stdout, stderr = io.StringIO(), io.StringIO()
+        success = True
+        result = None
+
+        with self._execute_lock:
+            self.command_count += 1
+            try:
+                with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                    if exec_mode == remoteExecution.EVALUATE_STATEMENT:
+                        result = repr(eval(command, self.namespace))
+                    else:
+                        exec(compile(command, executor.FILENAME, 'exec'), self.namespace)
+            except BaseException:
+                success = False
+                stderr.write(traceback.format_exc())
+
+        output = [{'type': 'Info', 'output': line}
+                  for line in stdout.getvalue().splitlines()]
+        output.extend({'type': 'Error', 'output': line}
+                      for line in stderr.getvalue().splitlines())
+        return {
+            'success': success,
+            'command': command,
+            'result': 'None' if result is None else result,
+            'output': output,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--project', default='StandIn', help='project name of the node')
+    args = parser.parse_args(argv)
+
+    node = RemoteNode(args.project)
+    node.start()
+    print('remote node {} listening on {}:{}'.format(
+        node.node_id, *remoteExecution.MULTICAST_GROUP))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        node.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
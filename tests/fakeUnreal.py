@@ -0,0 +1,133 @@
+"""
+Stand-in for the ``unreal`` module outside the engine
+
+It mimics the shape of the unreal API (a few real classes plus many
+generated ones, with methods, properties and enum values) so the code
+introspecting it, e.g. the completion index, can be tested and benchmarked
+on any platform.
+
+>>> from tests import fakeUnreal
+>>> unreal = fakeUnreal.install()
+"""
+
+import sys
+import types
+
+
+MODULE_NAME = 'unreal'
+ENGINE_VERSION = '5.3.2-0+++UE5+Release-5.3-fake'
+
+# number of generated classes, the real module has tens of thousands
+CLASS_COUNT = 20000
+
+
+class _Object(object):
+    """
+    Base of the generated classes, like unreal.Object
+    """
+
+    def get_name(self):
+        return type(self).__name__
+
+    def get_editor_property(self, name):
+        return getattr(self, name, None)
+
+    def set_editor_property(self, name, value):
+        setattr(self, name, value)
+
+
+class SystemLibrary(_Object):
+    @staticmethod
+    def get_engine_version():
+        return ENGINE_VERSION
+
+
+class EditorAssetLibrary(_Object):
+    @staticmethod
+    def load_asset(asset_path):
+        return None
+
+    @staticmethod
+    def list_assets(directory_path, recursive=True, include_folder=False):
+        return list()
+
+    @staticmethod
+    def does_asset_exist(asset_path):
+        return False
+
+    @staticmethod
+    def save_asset(asset_to_save, only_if_is_dirty=True):
+        return True
+
+
+class Name(str):
+    pass
+
+
+def log(message):
+    print(message)
+
+
+def log_warning(message):
+    print(message)
+
+
+def log_error(message):
+    print(message)
+
+
+def _generated_class(index):
+    """
+    :param index: int. class number
+    :return: type. class with a few methods, properties and constants
+    """
+    name = 'Generated{:05d}'.format(index)
+    attributes = {
+        'VALUE_{}'.format(value): value for value in range(index % 4)
+    }
+    for member in ('get_{}_count', 'set_{}_enabled', 'is_{}_valid'):
+        member = member.format(index % 97)
+        attributes[member] = lambda self, *args: None
+    attributes['{}_property'.format(index % 89)] = property(lambda self: None)
+    return type(name, (_Object,), attributes)
+
+
+def create(class_count=CLASS_COUNT):
+    """
+    Build a fake unreal module
+
+    :param class_count: int. number of generated classes
+    :return: module. fake unreal module
+    """
+    module = types.ModuleType(MODULE_NAME)
+    module.__file__ = __file__
+    module.Object = _Object
+    for value in (SystemLibrary, EditorAssetLibrary, Name,
+                  log, log_warning, log_error):
+        setattr(module, value.__name__, value)
+
+    for index in range(class_count):
+        cls = _generated_class(index)
+        setattr(module, cls.__name__, cls)
+    return module
+
+
+def install(class_count=CLASS_COUNT):
+    """
+    Register a fake unreal module, unless a module is already imported
+
+    :param class_count: int. number of generated classes
+    :return: module. the imported unreal module
+    """
+    if MODULE_NAME not in sys.modules:
+        sys.modules[MODULE_NAME] = create(class_count)
+    return sys.modules[MODULE_NAME]
+
+
+def uninstall():
+    """
+    Unregister the fake unreal module, if installed
+    """
+    module = sys.modules.get(MODULE_NAME)
+    if module is not None and getattr(module, '__file__', None) == __file__:
+        del sys.modules[MODULE_NAME]
@@ -0,0 +1,58 @@
+"""
+Least recently used cache of compiled code objects
+"""
+
+import pytest
+
+from unreal_script_editor import codeCache
+
+
+def test_hit_returns_same_code():
+    cache = codeCache.CodeCache()
+    code = cache.compile('x = 1')
+    assert cache.compile('x = 1') is code
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_includes_mode_and_filename():
+    cache = codeCache.CodeCache()
+    cache.compile('1', 'exec')
+    cache.compile('1', 'eval')
+    cache.compile('1', 'eval', 'other')
+    assert len(cache) == 3
+
+
+def test_evicts_least_recently_used():
+    cache = codeCache.CodeCache(max_entries=2)
+    first = cache.compile('a = 1')
+    cache.compile('b = 2')
+    # used again, so b is the least recently used
+    cache.compile('a = 1')
+    cache.compile('c = 3')
+
+    assert len(cache) == 2
+    assert cache.compile('a = 1') is first
+    misses = cache.misses
+    cache.compile('b = 2')
+    assert cache.misses == misses + 1
+
+
+def test_evicts_by_source_size():
+    cache = codeCache.CodeCache(max_bytes=100)
+    for i in range(10):
+        cache.compile('x = {}  # {}'.format(i, 'a' * 30))
+    assert len(cache) == 2
+
+
+def test_syntax_errors_are_not_cached():
+    cache = codeCache.CodeCache()
+    with pytest.raises(SyntaxError):
+        cache.compile('def')
+    assert len(cache) == 0
+
+
+def test_clear():
+    cache = codeCache.CodeCache()
+    cache.compile('x = 1')
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,66 @@
+"""
+Line edits of the code editor: indent, comment and their undo
+"""
+
+import pytest
+
+from unreal_script_editor.codeEditor import codeEditor
+
+
+@pytest.fixture
+def editor(qapp):
+    editor = codeEditor.CodeEditor()
+    editor.setPlainText(u'def f():\n    x = "\U0001f600"\n\n    return x\nend')
+    return editor
+
+
+def lines(editor):
+    return editor.toPlainText().split('\n')
+
+
+def test_indent_and_unindent(editor):
+    text = editor.toPlainText()
+    editor.do_indent(range(1, 4))
+    assert lines(editor)[1:4] == [u'\t    x = "\U0001f600"', '\t', '\t    return x']
+    # the edited lines are selected
+    assert editor.get_selection_range() == (1, 3)
+
+    editor.undo_indent(range(1, 4))
+    assert editor.toPlainText() == text
+    editor.undo_indent(range(1, 2))
+    assert lines(editor)[1] == u'x = "\U0001f600"'
+
+
+def test_comment_at_least_indentation(editor):
+    text = editor.toPlainText()
+    editor.toggle_comment(range(0, 4))
+    assert lines(editor)[:4] == [
+        '# def f():', u'#     x = "\U0001f600"', '', '#     return x']
+    editor.toggle_comment(range(0, 4))
+    assert editor.toPlainText() == text
+
+
+def test_single_undo_step(editor):
+    text = editor.toPlainText()
+    editor.do_comment(range(0, 5))
+    editor.document().undo()
+    assert editor.toPlainText() == text
+
+
+def test_unchanged_lines_are_not_rewritten(editor):
+    revision = editor.document().revision()
+    editor.undo_comment(range(0, 5))
+    assert editor.document().revision() == revision
+
+
+def test_selection_range_without_selection(editor):
+    cursor = editor.textCursor()
+    cursor.setPosition(editor.document().findBlockByNumber(3).position())
+    editor.setTextCursor(cursor)
+    assert editor.get_selection_range() == (3, 3)
+
+
+def test_pressed_keys_per_editor(qapp):
+    first, second = codeEditor.CodeEditor(), codeEditor.CodeEditor()
+    first.pressed_keys.append(1)
+    assert second.pressed_keys == []
@@ -0,0 +1,117 @@
+"""
+Symbol index ranking, the unreal module index and the completion provider
+"""
+
+import pytest
+
+from unreal_script_editor import completion
+from unreal_script_editor.codeEditor import symbolIndex
+
+from . import fakeUnreal
+
+
+SYMBOLS = [
+    ('EditorAssetLibrary', symbolIndex.CLASS),
+    ('EditorLevelLibrary', symbolIndex.CLASS),
+    ('editor_property', symbolIndex.FUNCTION),
+    ('get_editor_subsystem', symbolIndex.FUNCTION),
+    ('SystemLibrary', symbolIndex.CLASS),
+    ('log', symbolIndex.FUNCTION),
+]
+
+
+def names(candidates):
+    return [name for name, _ in candidates]
+
+
+def test_prefix_is_case_insensitive_and_sorted():
+    group = symbolIndex.SymbolGroup(SYMBOLS)
+    # by lower case name, '_' before the letters
+    assert [group.names[i] for i in group.prefix('EDITOR')] == [
+        'editor_property', 'EditorAssetLibrary', 'EditorLevelLibrary']
+    assert group.prefix('zzz') == []
+    assert len(group.prefix('e', limit=2)) == 2
+
+
+def test_fuzzy_ranks_tightest_match_first():
+    group = symbolIndex.SymbolGroup(SYMBOLS)
+    ranked = [group.names[i] for i in group.fuzzy('eal')]
+    assert ranked[0] == 'EditorAssetLibrary'
+    assert 'SystemLibrary' not in ranked
+
+    # 'lib' is contiguous in both, the shorter name first
+    assert [group.names[i] for i in group.fuzzy('lib')][:2] == [
+        'SystemLibrary', 'EditorAssetLibrary']
+
+
+def test_complete_prefix_before_fuzzy():
+    index = symbolIndex.SymbolIndex()
+    index.add('unreal', SYMBOLS)
+    candidates = index.complete('unreal', 'ed')
+    assert names(candidates)[:3] == [
+        'editor_property', 'EditorAssetLibrary', 'EditorLevelLibrary']
+    assert names(candidates)[3:] == ['get_editor_subsystem']
+    assert index.complete('missing', 'ed') == []
+
+
+def test_index_round_trip():
+    index = symbolIndex.SymbolIndex()
+    index.add('', SYMBOLS)
+    index.add('unreal.SystemLibrary', [('get_engine_version', symbolIndex.FUNCTION)])
+    loaded = symbolIndex.SymbolIndex.from_dict(index.to_dict())
+    assert 'unreal.SystemLibrary' in loaded
+    assert loaded.complete('', 'ed') == index.complete('', 'ed')
+
+
+def test_unreal_index_is_saved_per_engine_version(tmp_path):
+    module = fakeUnreal.create(50)
+    unreal_index = completion.UnrealIndex(module, str(tmp_path))
+    assert ('SystemLibrary', symbolIndex.CLASS) in unreal_index.complete('unreal', 'SystemLib')
+    assert names(unreal_index.complete('unreal.SystemLibrary', 'get_engine')) == [
+        'get_engine_version']
+    unreal_index.save()
+    assert unreal_index.path.startswith(str(tmp_path))
+
+    # reloaded from the saved index, the module is not indexed again
+    reloaded = completion.UnrealIndex(module, str(tmp_path))
+    reloaded.load()
+    assert not reloaded._dirty
+    assert 'unreal.SystemLibrary' in reloaded.index
+    assert reloaded.complete('unreal', 'SystemLib') == unreal_index.complete('unreal', 'SystemLib')
+
+
+def test_unreal_index_without_unreal(tmp_path, monkeypatch):
+    unreal_index = completion.UnrealIndex(cache_path=str(tmp_path))
+    monkeypatch.setattr(unreal_index, 'module', lambda: None)
+    assert unreal_index.complete('unreal', 'a') == []
+    unreal_index.save()
+    assert not list(tmp_path.iterdir())
+
+
+def test_provider(qapp, tmp_path):
+    from Qt import QtGui
+
+    provider = completion.CompletionProvider(
+        completion.UnrealIndex(fakeUnreal.create(10), str(tmp_path)))
+    document = QtGui.QTextDocument('asset_count = 1\nprinter = None\n')
+
+    query, candidates = provider(document, 'x = pri')
+    assert query == 'pri'
+    # the script names and builtins starting with the query come first
+    assert names(candidates)[:2] == ['printer', 'print']
+
+    query, candidates = provider(document, 'unreal.EditorAsset')
+    assert query == 'EditorAsset'
+    assert names(candidates)[0] == 'EditorAssetLibrary'
+
+    assert provider(document, 'os.pa') == ('pa', [])
+    assert provider(document, 'x = ') == ('', [])
+
+
+@pytest.mark.parametrize('text, keyword', [('imp', 'import'), ('whi', 'while')])
+def test_provider_keywords(qapp, tmp_path, text, keyword):
+    from Qt import QtGui
+
+    provider = completion.CompletionProvider(completion.UnrealIndex(cache_path=str(tmp_path)))
+    _, candidates = provider(QtGui.QTextDocument(''), text)
+    assert (keyword, symbolIndex.KEYWORD) in candidates
@@ -0,0 +1,106 @@
+"""
+Threaded and subprocess runs of the commands
+"""
+
+import io
+import time
+
+from unreal_script_editor import executor
+
+
+def run(command, mode=executor.THREAD, namespace=None):
+    execution = executor.Execution(command, mode, namespace)
+    execution.start()
+    assert execution.wait(30)
+    return execution, execution.messages()
+
+
+def test_thread_output():
+    execution, messages = run('print("a")\nprint("b", end="")')
+    assert execution.success
+    assert messages == [('info', 'a'), ('info', 'b')]
+
+
+def test_thread_error_lines():
+    execution, messages = run('x = 1\nraise ValueError("broken")')
+    result = execution.result()
+    assert not result.success
+    assert messages[-1] == ('error', 'ValueError: broken')
+    assert all(mtype == 'error' for mtype, _ in messages)
+    assert result.error_line_count == len(messages) > 1
+    # the traceback starts in the command
+    assert executor.FILENAME in messages[1][1]
+
+
+def test_syntax_error():
+    execution, messages = run('def')
+    assert not execution.success
+    assert messages[-1][1].startswith('SyntaxError')
+
+
+def test_namespace_is_kept():
+    namespace = executor.new_namespace()
+    run('value = 41', namespace=namespace)
+    execution, messages = run('print(value + 1)', namespace=namespace)
+    assert messages == [('info', '42')]
+
+
+def test_cancel_finishes():
+    execution = executor.Execution('while True:\n    pass')
+    execution.start()
+    time.sleep(0.1)
+    execution.cancel()
+    assert execution.wait(10)
+    result = execution.result()
+    assert result.cancelled and not result.success
+    assert ('error', 'KeyboardInterrupt: execution cancelled') in execution.messages()
+
+
+def test_cancel_before_running():
+    execution = executor.Execution('pass')
+    execution.cancelled = True
+    execution.start()
+    assert execution.wait(10)
+    assert not execution.success
+
+
+def test_many_cancels_never_hang():
+    for index in range(100):
+        execution = executor.Execution('for i in range({}): pass'.format(index * 100))
+        execution.start()
+        execution.cancel()
+        assert execution.wait(10)
+
+
+def test_process():
+    execution, messages = run('import sys\nprint("out")\nsys.exit(3)', executor.PROCESS)
+    assert not execution.success
+    assert messages == [('info', 'out')]
+
+    execution, messages = run('print(1 + 1)', executor.PROCESS)
+    assert execution.success
+    assert messages == [('info', '2')]
+
+
+def test_process_cancel():
+    execution = executor.Execution('import time\ntime.sleep(60)', executor.PROCESS)
+    execution.start()
+    execution.cancel()
+    assert execution.wait(10)
+    assert execution.result().cancelled
+
+
+def test_router_without_stream():
+    router = executor.StreamRouter(None, 'info')
+    assert router.write('lost') == 4
+    router.flush()
+    assert not router.isatty()
+    assert router.encoding == 'utf-8'
+
+
+def test_router_passes_other_threads():
+    stream = io.StringIO()
+    router = executor.StreamRouter(stream, 'info')
+    router.write('direct\n')
+    assert stream.getvalue() == 'direct\n'
+    assert router.getvalue() == 'direct\n'
@@ -0,0 +1,35 @@
+"""
+File helpers: data directory and atomic writes
+"""
+
+import os
+import sys
+
+import pytest
+
+from unreal_script_editor import fileIO
+
+
+def test_data_path_override(monkeypatch, tmp_path):
+    monkeypatch.setenv(fileIO.DATA_ENV, str(tmp_path))
+    assert fileIO.data_path('logs', 'runs.bin') == os.path.join(
+        str(tmp_path), 'logs', 'runs.bin')
+
+
+@pytest.mark.skipif(os.name == 'nt' or sys.platform == 'darwin', reason='xdg layout')
+def test_data_path_outside_package(monkeypatch, tmp_path):
+    monkeypatch.delenv(fileIO.DATA_ENV, raising=False)
+    monkeypatch.setenv('XDG_DATA_HOME', str(tmp_path))
+    assert fileIO.data_root() == os.path.join(str(tmp_path), fileIO.DATA_NAME)
+
+    package = os.path.dirname(os.path.abspath(fileIO.__file__))
+    assert not fileIO.data_root().startswith(package)
+
+
+def test_atomic_write(tmp_path):
+    path = str(tmp_path / 'sub' / 'file.txt')
+    fileIO.atomic_write(path, b'first')
+    fileIO.atomic_write(path, b'second')
+    with open(path, 'rb') as f:
+        assert f.read() == b'second'
+    assert os.listdir(str(tmp_path / 'sub')) == ['file.txt']
@@ -0,0 +1,144 @@
+"""
+Columnar log storage, eviction to the archive and paging through it
+"""
+
+from unreal_script_editor import logArchive, logStore
+
+
+def test_append_splits_lines():
+    store = logStore.LogStore()
+    assert store.append('first\nsecond', logStore.ERROR, timestamp=1.0) == 2
+    store.append('third', logStore.INFO, timestamp=2.0)
+
+    assert len(store) == 3
+    assert [store.text(i) for i in range(3)] == ['first', 'second', 'third']
+    assert [store.level(i) for i in range(3)] == [logStore.ERROR] * 2 + [logStore.INFO]
+    assert store.timestamp(2) == 2.0
+
+
+def test_level_code():
+    assert logStore.level_code('warning') == logStore.WARNING
+    assert logStore.level_code('unknown') == logStore.REGULAR
+
+
+def test_level_view():
+    store = logStore.LogStore()
+    for i in range(10):
+        store.append('line {}'.format(i), logStore.ERROR if i % 3 == 0 else logStore.INFO)
+
+    errors = logStore.LevelView(store, [logStore.ERROR])
+    assert [errors[row] for row in range(len(errors))] == [0, 3, 6, 9]
+
+    both = logStore.LevelView(store, [logStore.ERROR, logStore.INFO])
+    assert len(both) == 10
+    assert [both[row] for row in range(10)] == list(range(10))
+    assert both.rank(6) == 6
+    assert errors.rank(6) == 2
+
+
+def test_search():
+    store = logStore.LogStore()
+    store.append('Alpha', logStore.INFO)
+    store.append('beta\nALPHA beta', logStore.ERROR)
+
+    assert list(store.search('alpha')) == [0, 2]
+    assert list(store.search('alpha', case_sensitive=True)) == []
+    assert list(store.search('beta', levels=[logStore.ERROR])) == [1, 2]
+    assert list(store.search('alpha', start=1)) == [2]
+    assert list(store.search('')) == []
+
+
+def test_search_unicode_case():
+    store = logStore.LogStore()
+    store.append(u'Straße: ÉTÉ', logStore.INFO)
+    store.append(u'été', logStore.INFO)
+    store.append(u'STRASSE', logStore.WARNING)
+
+    assert list(store.search(u'été')) == [0, 1]
+    assert list(store.search(u'straße')) == [0, 2]
+    assert list(store.search(u'été', case_sensitive=True)) == [1]
+    assert list(store.search(u'ÉTÉ', start=1)) == [1]
+
+
+def test_evict_by_entries():
+    store = logStore.LogStore(max_entries=100)
+    for i in range(120):
+        store.append('line {}'.format(i), logStore.WARNING if i % 2 else logStore.INFO)
+
+    store.evict(store.excess())
+    assert len(store) == 75
+    assert store.evicted == 45
+    assert store.text(0) == 'line 45'
+    assert store.level(0) == logStore.WARNING
+    assert store.excess() == 0
+    warnings = logStore.LevelView(store, [logStore.WARNING])
+    assert store.text(warnings[0]) == 'line 45'
+
+
+def test_evict_by_bytes():
+    store = logStore.LogStore(max_bytes=1000)
+    for i in range(100):
+        store.append('x' * 19)
+    assert store.excess() > 0
+    store.evict(store.excess())
+    assert len(store.data) <= 750
+
+
+def test_archive_pager(tmp_path):
+    path = str(tmp_path / 'output.log')
+    archive = logArchive.LogArchive(path, max_bytes=2000, backup_count=3)
+    store = logStore.LogStore(max_entries=50, archive=archive)
+    for i in range(200):
+        store.append('line {}\twith tab'.format(i), logStore.ERROR if i % 5 == 0 else logStore.INFO,
+                     timestamp=float(i))
+        store.evict(store.excess())
+
+    files = archive.files()
+    assert len(files) > 1
+    pager = logArchive.ArchivePager(files)
+    try:
+        first = int(pager.line(0)[2].split()[1])
+        rows = [pager.line(row) for row in range(len(pager))]
+    finally:
+        pager.close()
+
+    # the oldest files were rotated out, the rest is contiguous
+    texts = [text for _, _, text in rows]
+    assert texts == ['line {}\twith tab'.format(i) for i in range(first, first + len(rows))]
+    assert texts[-1] == 'line {}\twith tab'.format(store.evicted - 1)
+    for timestamp, level, text in rows:
+        number = int(text.split()[1])
+        assert timestamp == float(number)
+        assert level == (logStore.ERROR if number % 5 == 0 else logStore.INFO)
+
+
+def test_archive_pager_skips_empty_files(tmp_path):
+    empty = tmp_path / 'output.log.1'
+    empty.write_bytes(b'')
+    pager = logArchive.ArchivePager([str(empty)])
+    assert len(pager) == 0
+    pager.close()
+
+
+def test_tail_index(tmp_path, monkeypatch):
+    import mmap
+
+    # small chunks, so lines straddle them
+    monkeypatch.setattr(logArchive, 'CHUNK_BYTES', 7)
+    lines = ['{}\tinfo\t{}'.format(i, 'x' * (i % 11)) for i in range(40)]
+    path = tmp_path / 'output.log'
+    path.write_bytes(('\n'.join(lines) + '\npartial').encode('utf-8'))
+
+    with open(str(path), 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            index = logArchive.TailIndex(mapped, logArchive.count_lines(mapped))
+            assert len(index) == 40
+            # the newest lines are indexed without reading the oldest ones
+            assert mapped[index.start(39):].startswith(b'39\t')
+            assert index._end > 0
+            for line in (0, 20, 5, 38):
+                end = mapped.find(b'\n', index.start(line))
+                assert mapped[index.start(line):end].decode('utf-8') == lines[line]
+        finally:
+            mapped.close()
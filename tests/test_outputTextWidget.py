@@ -0,0 +1,44 @@
+"""
+Output log widget: plain and html messages, scrollback eviction
+"""
+
+from unreal_script_editor import outputTextWidget
+
+
+def test_html_lines(qapp):
+    lines = outputTextWidget.html_lines(
+        '<font color="#ff0000">red</font> and <b>bold</b><br>a &lt; b')
+    assert [text for text, _ in lines] == ['red and bold', 'a < b']
+    assert lines[0][1] == (
+        '<span style="color:#ff0000">red</span>&nbsp;and&nbsp;'
+        '<span style="font-weight:bold">bold</span>')
+    assert lines[1][1] == 'a&nbsp;&lt;&nbsp;b'
+
+
+def test_html_lines_outside_bmp(qapp):
+    lines = outputTextWidget.html_lines(u'\U0001f600 <i>end</i>')
+    assert lines == [(u'\U0001f600 end',
+                      u'\U0001f600&nbsp;<span style="font-style:italic">end</span>')]
+
+
+def test_html_entries(qapp):
+    widget = outputTextWidget.OutputTextWidget(max_lines=100, archive_path=None)
+    model = widget.model
+    widget.update_logger('plain')
+    widget.update_logger_html('<b>first</b><br>second')
+    widget.flush()
+
+    rows = [model.index(row) for row in range(model.rowCount())]
+    assert [model.data(index) for index in rows] == ['plain', 'first', 'second']
+    assert [model.data(index, outputTextWidget.HTML_ROLE) for index in rows] == [
+        None, '<span style="font-weight:bold">first</span>', 'second']
+
+    # the html of the evicted entries is dropped
+    for i in range(150):
+        widget.update_logger('line {}'.format(i))
+    widget.flush()
+    assert not model._html
+    widget.update_logger_html('<b>last</b>')
+    widget.flush()
+    last = model.index(model.rowCount() - 1)
+    assert model.data(last, outputTextWidget.HTML_ROLE) == '<span style="font-weight:bold">last</span>'
@@ -0,0 +1,69 @@
+"""
+The tokenizer spans against the formats of the original regex highlighter
+"""
+
+import json
+import os
+
+import pytest
+
+from unreal_script_editor.codeEditor.highlighter import pyTokenizer
+
+
+FIXTURE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'highlight_spans.json')
+
+with open(FIXTURE_PATH, 'r') as f:
+    CASES = json.load(f)['cases']
+
+
+def style_runs(spans, length):
+    """
+    :param spans: [(int, int, str)]. spans, later ones over earlier ones
+    :param length: int. length of the line
+    :return: [[int, int, str]]. spans merged into runs of the same style
+    """
+    styles = [None] * length
+    for start, size, style in spans:
+        styles[start:start + size] = [style] * size
+
+    runs = list()
+    for position, style in enumerate(styles):
+        if style is None:
+            continue
+        if runs and runs[-1][2] == style and sum(runs[-1][:2]) == position:
+            runs[-1][1] += 1
+        else:
+            runs.append([position, 1, style])
+    return runs
+
+
+@pytest.mark.parametrize('case', CASES, ids=[case['text'][:30] for case in CASES])
+def test_spans_match_fixture(case):
+    state = pyTokenizer.STATE_NORMAL
+    for line, expected in zip(case['text'].split('\n'), case['spans']):
+        spans, state = pyTokenizer.tokenize(line, state)
+        assert style_runs(spans, len(line)) == expected, line
+
+
+def test_changes_differ_from_legacy():
+    changed = [case for case in CASES if 'legacy' in case]
+    assert changed
+    for case in changed:
+        assert case['change']
+        assert case['legacy'] != case['spans']
+
+
+def test_multiline_state():
+    spans, state = pyTokenizer.tokenize('x = """start')
+    assert state == pyTokenizer.STATE_TRI_DOUBLE
+    spans, state = pyTokenizer.tokenize('still inside', state)
+    assert spans == [(0, 12, 'string2')]
+    assert state == pyTokenizer.STATE_TRI_DOUBLE
+    spans, state = pyTokenizer.tokenize('end""" + 1', state)
+    assert state == pyTokenizer.STATE_NORMAL
+    assert spans[0] == (0, 6, 'string2')
+
+
+def test_unknown_state_is_normal():
+    assert pyTokenizer.tokenize('def f(): pass', -1) == pyTokenizer.tokenize('def f(): pass')
@@ -0,0 +1,121 @@
+"""
+Remote execution protocol and client, against the stand-in node
+"""
+
+import socket
+
+import pytest
+
+from unreal_script_editor import remoteExecution
+
+from . import fakeRemote
+
+
+# away from the default port, not to reach a running editor
+GROUP = ('239.0.0.1', 16766)
+
+
+def test_encode_decode():
+    data = remoteExecution.encode(
+        remoteExecution.TYPE_COMMAND, 'client', 'node', {'command': u'print("é")'})
+    message = remoteExecution.decode(data)
+    assert message['type'] == remoteExecution.TYPE_COMMAND
+    assert message['dest'] == 'node'
+    assert message['data'] == {'command': u'print("é")'}
+
+    assert remoteExecution.decode(b'not json') is None
+    assert remoteExecution.decode(b'{"type": "ping"}') is None
+
+
+def test_message_reader_split_and_joined():
+    first = remoteExecution.encode(remoteExecution.TYPE_PING, 'a', data={'text': u'é' * 10})
+    second = remoteExecution.encode(remoteExecution.TYPE_PONG, 'b')
+    stream = first + second + b'{"foreign": 1}'
+
+    reader = remoteExecution.MessageReader()
+    messages = list()
+    # one byte at a time, splitting the multi-byte characters
+    for index in range(len(stream)):
+        messages.extend(reader.feed(stream[index:index + 1]))
+    assert [message['type'] for message in messages] == [
+        remoteExecution.TYPE_PING, remoteExecution.TYPE_PONG]
+    assert messages[0]['data']['text'] == u'é' * 10
+
+    reader = remoteExecution.MessageReader()
+    assert len(reader.feed(first + second)) == 2
+
+
+@pytest.fixture(scope='module')
+def client():
+    node = fakeRemote.RemoteNode(group=GROUP)
+    client = remoteExecution.RemoteClient(
+        group=GROUP, endpoint=('127.0.0.1', 0), max_in_flight=4)
+    try:
+        node.start()
+        client.start()
+        client.connection()
+    except OSError as error:
+        client.stop()
+        node.stop()
+        pytest.skip('no multicast: {}'.format(error))
+    client.node = node
+    yield client
+    client.stop()
+    node.stop()
+
+
+def run(client, command, exec_mode=remoteExecution.EXECUTE_FILE):
+    remote_command = client.execute(command, exec_mode)
+    assert remote_command.wait(10)
+    return remote_command
+
+
+def test_output(client):
+    remote_command = run(client, 'print("hello")\nprint("world")')
+    assert remote_command.success
+    assert remote_command.messages() == [('info', 'hello'), ('info', 'world')]
+
+
+def test_evaluate(client):
+    remote_command = run(client, '1 + 1', remoteExecution.EVALUATE_STATEMENT)
+    assert remote_command.success
+    assert remote_command.result == '2'
+
+
+def test_failure(client):
+    remote_command = run(client, 'raise ValueError("broken")')
+    assert not remote_command.success
+    messages = remote_command.messages()
+    assert ('error', 'ValueError: broken') in messages
+    result = remote_command.execution_result()
+    assert result.error_line_count == len(messages)
+
+
+def test_connection_is_reused(client):
+    connection = client.connection()
+    run(client, 'x = 1')
+    assert client.connection() is connection
+    assert run(client, 'x', remoteExecution.EVALUATE_STATEMENT).result == '1'
+
+
+def test_pipelined_commands_keep_order(client):
+    count = client.node.command_count
+    commands = [client.execute('order = {}'.format(i)) for i in range(10)]
+    commands.append(client.execute('order', remoteExecution.EVALUATE_STATEMENT))
+    assert all(command.wait(10) for command in commands)
+    assert commands[-1].result == '9'
+    assert client.node.command_count == count + 11
+
+
+def test_no_node():
+    client = remoteExecution.RemoteClient(group=('239.0.0.1', 16767))
+    try:
+        client.start()
+    except socket.error as error:
+        pytest.skip('no multicast: {}'.format(error))
+    try:
+        client.discovery.wait_for_node = lambda timeout=None: []
+        with pytest.raises(ConnectionError):
+            client.execute('pass')
+    finally:
+        client.stop()
@@ -0,0 +1,49 @@
+"""
+Script tabs: materialization budget, undo history and modified state
+"""
+
+from unreal_script_editor import scriptTab
+
+
+def materialized_tabs(count):
+    tabs = list()
+    for i in range(count):
+        tab = scriptTab.ScriptTab('x = {}\n'.format(i))
+        tab.materialize()
+        tab.last_used = float(i)
+        tabs.append(tab)
+    return tabs
+
+
+def test_trim_keeps_undo_history(qapp):
+    tabs = materialized_tabs(3)
+    tabs[0].editor().insertPlainText('y = 1\n')
+    assert tabs[0].has_undo()
+
+    released = scriptTab.trim(tabs, keep=tabs[2], max_tabs=1)
+    assert released == [tabs[1]]
+    assert tabs[0].is_materialized()
+    assert not tabs[1].is_materialized()
+    assert tabs[1].toPlainText() == 'x = 1\n'
+
+
+def test_set_same_text_is_not_modified(qapp):
+    tab = scriptTab.ScriptTab('print(1)\n')
+    tab.setPlainText('print(1)\n')
+    assert not tab.is_modified()
+
+    tab.materialize()
+    tab.setPlainText('print(1)\n')
+    assert not tab.is_modified()
+    assert not tab.has_undo()
+
+
+def test_set_text_is_undoable(qapp):
+    tab = scriptTab.ScriptTab('print(1)\n')
+    tab.materialize()
+    tab.setPlainText('')
+    assert tab.is_modified()
+
+    tab.editor().undo()
+    assert tab.toPlainText() == 'print(1)\n'
+    assert not tab.is_modified()
@@ -0,0 +1,54 @@
+"""
+Chunked search and in place replacement
+"""
+
+import pytest
+
+from unreal_script_editor import search
+
+
+def find(text, pattern, replacement=None, **kwargs):
+    query = search.Query(pattern, **kwargs)
+    hits = list()
+    for position, line, chunk in search.text_chunks(text, 64):
+        hits.extend(search.chunk_hits(query, chunk, position, line, replacement))
+    return hits
+
+
+def test_hits_across_chunks():
+    text = '\n'.join('line {} value'.format(i) for i in range(100))
+    hits = find(text, 'value')
+    assert len(hits) == 100
+    assert [hit.line for hit in hits] == list(range(100))
+    assert all(text[hit.position:hit.position + hit.length] == 'value' for hit in hits)
+    assert hits[3].column == len('line 3 ')
+
+
+def test_query_options():
+    text = 'Value value values'
+    assert len(find(text, 'value')) == 3
+    assert len(find(text, 'value', case_sensitive=True)) == 2
+    assert len(find(text, 'value', whole_word=True)) == 2
+    assert [hit.replacement for hit in find(text, r'(v)alue', r'\1', regex=True)] == [
+        'V', 'v', 'v']
+
+
+@pytest.mark.parametrize('line', [
+    'value = foo(1)  # plain',
+    u'value = "é\U0001f600" + foo(2) \U0001f600 foo',
+])
+def test_replace_in_document(qapp, line):
+    from Qt import QtGui
+
+    text = '\n'.join([line] * 500)
+    document = QtGui.QTextDocument()
+    document.setPlainText(text)
+    hits = find(text, 'foo', 'replaced')
+
+    search.replace_in_document(document, text, hits)
+    assert document.toPlainText() == search.splice(text, hits)
+    assert document.blockCount() == 500
+
+    # a single undo step
+    document.undo()
+    assert document.toPlainText() == text
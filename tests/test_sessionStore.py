@@ -0,0 +1,119 @@
+"""
+Session persistence: round trip, several instances and damaged sessions
+"""
+
+import json
+import os
+
+import pytest
+
+from unreal_script_editor import sessionStore
+
+
+def entry(tab_id, label=None, active=False):
+    return {'tab_id': tab_id, 'label': label or tab_id, 'active': active}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'session')
+
+
+def test_round_trip(path):
+    store = sessionStore.SessionStore(path)
+    assert not store.exists()
+    store.save([entry('a', 'Tab A', True), entry('b')], {'a': 'print(1)\n', 'b': u'# é\n'})
+
+    tabs = sessionStore.SessionStore(path).load()
+    assert [tab['tab_id'] for tab in tabs] == ['a', 'b']
+    assert [tab['label'] for tab in tabs] == ['Tab A', 'b']
+    assert [tab['active'] for tab in tabs] == [True, False]
+    assert [tab['command'] for tab in tabs] == ['print(1)\n', u'# é\n']
+
+
+def test_only_changed_texts_are_written(path):
+    store = sessionStore.SessionStore(path)
+    store.save([entry('a'), entry('b')], {'a': 'one', 'b': 'two'})
+    store.save([entry('a'), entry('b')], {'b': 'three'})
+
+    tabs = sessionStore.SessionStore(path).load()
+    assert [tab['command'] for tab in tabs] == ['one', 'three']
+
+
+def test_closed_tab_file_is_removed(path):
+    store = sessionStore.SessionStore(path)
+    store.save([entry('a'), entry('b')], {'a': 'one', 'b': 'two'})
+    store.save([entry('a')], {})
+
+    assert not os.path.exists(store.tab_path('b'))
+    assert [tab['tab_id'] for tab in sessionStore.SessionStore(path).load()] == ['a']
+
+
+def test_missing(path):
+    store = sessionStore.SessionStore(path)
+    store.save([entry('a')], {'a': 'one'})
+    assert store.missing(['a', 'b']) == ['b']
+
+
+def test_other_instance_tabs_are_kept(path):
+    first = sessionStore.SessionStore(path)
+    first.save([entry('a')], {'a': 'one'})
+    second = sessionStore.SessionStore(path)
+    second.load()
+
+    first.save([entry('a'), entry('c')], {'c': 'three'})
+    second.save([entry('a'), entry('b')], {'b': 'two'})
+
+    tabs = sessionStore.SessionStore(path).load()
+    assert [tab['tab_id'] for tab in tabs] == ['a', 'b', 'c']
+    assert [tab['command'] for tab in tabs] == ['one', 'two', 'three']
+
+
+def test_unknown_tab_files_are_cleaned_on_load(path):
+    store = sessionStore.SessionStore(path)
+    store.save([entry('a')], {'a': 'one'})
+    with open(store.tab_path('orphan'), 'w') as f:
+        f.write('lost')
+
+    sessionStore.SessionStore(path).load()
+    assert not os.path.exists(store.tab_path('orphan'))
+    assert os.path.exists(store.tab_path('a'))
+
+
+@pytest.mark.parametrize('index', [b'{broken', b'[]', b'{"tabs": [{"label": "no id"}]}'])
+def test_damaged_index_is_not_overwritten(path, index):
+    store = sessionStore.SessionStore(path)
+    store.save([entry('a')], {'a': 'precious'})
+    with open(store.index_path, 'wb') as f:
+        f.write(index)
+
+    reopened = sessionStore.SessionStore(path)
+    with pytest.raises(ValueError):
+        reopened.load()
+    assert not reopened.writable
+    with pytest.raises(RuntimeError):
+        reopened.save([entry('new')], {'new': ''})
+    assert os.path.exists(store.tab_path('a'))
+
+    backup = reopened.move_aside()
+    assert backup and not os.path.exists(path)
+    with open(os.path.join(backup, 'tabs', 'a.py'), 'r') as f:
+        assert f.read() == 'precious'
+
+    reopened.save([entry('new')], {'new': 'fresh'})
+    with open(reopened.index_path, 'r') as f:
+        assert [tab['tab_id'] for tab in json.load(f)['tabs']] == ['new']
+
+
+def test_missing_tab_text_loads_empty(path):
+    store = sessionStore.SessionStore(path)
+    store.save([entry('a')], {'a': 'one'})
+    os.remove(store.tab_path('a'))
+    assert sessionStore.SessionStore(path).load()[0]['command'] == ''
+
+
+def test_save_async(path):
+    store = sessionStore.SessionStore(path)
+    store.save_async([entry('a')], {'a': 'one'})
+    store.wait()
+    assert sessionStore.SessionStore(path).load()[0]['command'] == 'one'
@@ -0,0 +1,67 @@
+"""
+Deduplicated snapshots of the tab texts
+"""
+
+import pytest
+
+from unreal_script_editor import snapshotStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return snapshotStore.SnapshotStore(str(tmp_path / 'snapshots'))
+
+
+def script(line_count, changed=None):
+    lines = ['value_{0} = compute({0}, "{1}")'.format(i, 'x' * (i % 7))
+             for i in range(line_count)]
+    if changed is not None:
+        lines[changed] = 'value_{} = None  # edited'.format(changed)
+    return '\n'.join(lines)
+
+
+def test_unchanged_text_is_not_added(store):
+    assert store.add('tab', 'Tab', 'print(1)') is not None
+    assert store.add('tab', 'Tab', 'print(1)') is None
+    # the same text in another tab is a snapshot of that tab
+    assert store.add('other', 'Other', 'print(1)') is not None
+    assert len(store.snapshots()) == 2
+
+
+def test_text_round_trip(store):
+    texts = [u'', u'print("é")\n', script(2000)]
+    snapshots = [store.add('tab', 'Tab', text) for text in texts]
+    assert [store.text(snapshot) for snapshot in snapshots] == texts
+    assert snapshots[2].line_count == 2000
+    assert snapshots[2].size == len(texts[2])
+
+
+def test_previous(store):
+    first = store.add('tab', 'Tab', 'a')
+    store.add('other', 'Other', 'b')
+    second = store.add('tab', 'Tab', 'c', reason=snapshotStore.CLEAR)
+
+    assert store.previous(second) == first
+    assert store.previous(first) is None
+    assert store.latest('tab') == second
+    assert second.reason == snapshotStore.CLEAR
+
+
+def test_edits_share_chunks(store):
+    base = script(5000)
+    store.add('tab', 'Tab', base)
+    size = store.disk_size()
+    for edit in range(20):
+        store.add('tab', 'Tab', script(5000, changed=edit * 200))
+
+    # each edit only stores the few chunks around it
+    assert store.disk_size() - size < size
+    assert store.text(store.latest('tab')) == script(5000, changed=19 * 200)
+
+
+def test_reopened_store(store, tmp_path):
+    snapshot = store.add('tab', 'Tab', script(100))
+    reopened = snapshotStore.SnapshotStore(str(tmp_path / 'snapshots'))
+    assert reopened.snapshots() == [snapshot]
+    assert reopened.text(snapshot) == script(100)
+    assert reopened.add('tab', 'Tab', script(100)) is None
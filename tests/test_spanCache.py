@@ -0,0 +1,42 @@
+"""
+Span cache keys and the lazy highlighter contract
+"""
+
+import pytest
+
+from unreal_script_editor.codeEditor.highlighter import lazyHighlight, pyTokenizer, spanCache
+
+
+class Colliding(str):
+    """
+    Text whose hash collides with every other one
+    """
+
+    def __hash__(self):
+        return 0
+
+
+def test_hash_collision_is_a_miss():
+    cache = spanCache.SpanCache()
+    cache.tokenize(Colliding('x = 1'), pyTokenizer.STATE_NORMAL)
+    assert cache.get(Colliding('# xy'), pyTokenizer.STATE_NORMAL) is None
+    assert cache.tokenize(Colliding('# xy'), pyTokenizer.STATE_NORMAL) == \
+        pyTokenizer.tokenize('# xy')
+    assert len(cache) == 2
+
+
+def test_least_recently_used_eviction():
+    cache = spanCache.SpanCache(max_entries=2)
+    for text in ('a', 'b', 'a', 'c'):
+        cache.tokenize(text, pyTokenizer.STATE_NORMAL)
+    assert cache.get('b', pyTokenizer.STATE_NORMAL) is None
+    assert cache.get('a', pyTokenizer.STATE_NORMAL) is not None
+
+
+def test_request_is_abstract(qapp):
+    from Qt import QtWidgets
+
+    editor = QtWidgets.QPlainTextEdit()
+    highlighter = lazyHighlight.LazyPythonHighlighter(editor)
+    with pytest.raises(NotImplementedError):
+        highlighter.request(editor.document().begin(), pyTokenizer.STATE_NORMAL, 1)
@@ -0,0 +1,275 @@
+"""
+Run several scripts one after another, e.g. tabs or the files of a folder
+
+A batch returns to the Qt event loop between two items, so the window is
+repainted and can pause or cancel the batch. Standalone, each item runs in
+the background through an ``executor.ExecutionEngine``, the window stays
+responsive during the items too. In Unreal, commands run on the game
+thread, the window is only updated between two items.
+"""
+
+import collections
+import glob
+import os
+import time
+
+from Qt import QtCore
+
+from . import executor
+
+
+PENDING = 'pending'
+RUNNING = 'running'
+OK = 'ok'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+TIMED_OUT = 'timed out'
+SKIPPED = 'skipped'
+
+# output lines kept per item, the latest ones
+MAX_ITEM_LINES = 5000
+
+
+def result_status(result):
+    """
+    :param result: executor.ExecutionResult. outcome of a command
+    :return: str. OK, FAILED, CANCELLED or TIMED_OUT
+    """
+    if result.timed_out:
+        return TIMED_OUT
+    if result.cancelled:
+        return CANCELLED
+    return OK if result.success else FAILED
+
+
+class BatchItem(object):
+    """
+    Script of a batch, and the outcome of its run
+    """
+
+    def __init__(self, label, get_command, tab_id):
+        """
+        Initialization
+
+        :param label: str. name shown for the item, e.g. a tab label
+        :param get_command: callable. returns the source to run, called
+                            when the item starts, may raise an IOError
+        :param tab_id: str. session id of the tab of the item, or the id
+                       of its file, identifying its runs in the history
+        """
+        self.label = label
+        self.get_command = get_command
+        self.tab_id = tab_id
+
+        self.status = PENDING
+        # source which ran, None if it could not be read
+        self.command = None
+        self.result = None
+        self.messages = collections.deque(maxlen=MAX_ITEM_LINES)
+
+
+def file_id(path):
+    """
+    :param path: str. script file
+    :return: str. 32 hex digits id of the file, in place of a tab id
+    """
+    import hashlib
+    return hashlib.md5(os.path.normcase(os.path.abspath(path)).encode('utf-8')).hexdigest()
+
+
+def read_script(path):
+    """
+    :param path: str. script file
+    :return: str. source of the file
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def file_item(path):
+    """
+    :param path: str. script file
+    :return: BatchItem. item running the file, read when it starts
+    """
+    return BatchItem(os.path.basename(path), lambda: read_script(path), file_id(path))
+
+
+def folder_scripts(folder):
+    """
+    :param folder: str. folder of scripts
+    :return: [str]. python files of the folder, sorted by name
+    """
+    return sorted(glob.glob(os.path.join(folder, '*.py')),
+                  key=lambda path: os.path.basename(path).lower())
+
+
+class BatchQueue(QtCore.QObject):
+    """
+    Sequential run of batch items, one per event loop iteration
+    """
+    item_started = QtCore.Signal(int)
+    item_finished = QtCore.Signal(int)
+    output = QtCore.Signal(str, str)
+    paused = QtCore.Signal(bool)
+    finished = QtCore.Signal(bool)
+
+    def __init__(self, items, run_sync=None, mode=executor.THREAD, timeout=None,
+                 namespace=None, stop_on_error=False, parent=None):
+        """
+        Initialization
+
+        :param items: [BatchItem]. items, run in order
+        :param run_sync: callable. runs a command synchronously and returns
+                         its executor.ExecutionResult and output lines, the
+                         items run in the background if None
+        :param mode: str. executor.THREAD or executor.PROCESS, of the
+                     background runs
+        :param timeout: float. seconds after which a background item is
+                        cancelled
+        :param namespace: dict. globals shared by the threaded items, a new
+                          namespace per item if None
+        :param stop_on_error: bool. whether a failed item skips the next ones
+        :param parent: QObject. parent object
+        """
+        super(BatchQueue, self).__init__(parent)
+        self.items = list(items)
+        self.run_sync = run_sync
+        self.mode = mode
+        self.timeout = timeout
+        self.namespace = namespace
+        self.stop_on_error = stop_on_error
+
+        self.index = -1
+        self.done_count = 0
+        self.elapsed = 0.0
+
+        self._start = None
+        self._running_item = False
+        self._paused = False
+        self._cancelled = False
+        self._done = False
+
+        self.engine = None
+        if run_sync is None:
+            self.engine = executor.ExecutionEngine(self)
+            self.engine.output.connect(self.on_output)
+            self.engine.finished.connect(self.end_item)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.next_item)
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._timer.start()
+
+    def is_running(self):
+        return self._start is not None and not self._done
+
+    def is_paused(self):
+        return self._paused
+
+    def current(self):
+        return self.items[self.index]
+
+    def pause(self):
+        """
+        Hold the next items, the running one finishes
+        """
+        if self._paused or self._done:
+            return
+        self._paused = True
+        self.paused.emit(True)
+
+    def resume(self):
+        if not self._paused:
+            return
+        self._paused = False
+        self.paused.emit(False)
+        if not self._running_item and not self._done:
+            self._timer.start()
+
+    def cancel(self):
+        """
+        Cancel the running item, if it runs in the background, and skip
+        the next ones
+        """
+        if self._done:
+            return
+        self._cancelled = True
+        if self._running_item and self.engine is not None:
+            self.engine.cancel()
+        elif not self._running_item:
+            self._timer.stop()
+            self.finish(False)
+
+    def counts(self):
+        """
+        :return: collections.Counter. number of items per status
+        """
+        return collections.Counter(item.status for item in self.items)
+
+    def next_item(self):
+        """
+        Start the next item, unless paused
+        """
+        if self._paused or self._done:
+            return
+        if self.index + 1 >= len(self.items):
+            self.finish(True)
+            return
+
+        self.index += 1
+        item = self.current()
+        item.status = RUNNING
+        self._running_item = True
+        self.item_started.emit(self.index)
+
+        try:
+            item.command = item.get_command()
+        except (IOError, OSError, UnicodeDecodeError) as error:
+            self.on_output('{}: {}'.format(item.label, error), 'error')
+            self.end_item(executor.ExecutionResult(False, False, False, 0.0, None))
+            return
+
+        if self.engine is None:
+            result, messages = self.run_sync(item.command)
+            for mtype, line in messages:
+                self.on_output(line, mtype)
+            self.end_item(result)
+        else:
+            self.engine.run(item.command, self.mode, self.timeout, self.namespace)
+
+    def on_output(self, line, mtype):
+        self.current().messages.append((mtype, line))
+        self.output.emit(line, mtype)
+
+    def end_item(self, result):
+        """
+        :param result: executor.ExecutionResult. outcome of the running item
+        """
+        item = self.current()
+        item.result = result
+        item.status = result_status(result)
+        self._running_item = False
+        self.done_count += 1
+        self.item_finished.emit(self.index)
+
+        failed = item.status in (FAILED, TIMED_OUT)
+        if self._cancelled or (failed and self.stop_on_error):
+            self.finish(False)
+        elif not self._paused:
+            self._timer.start()
+
+    def finish(self, completed):
+        """
+        :param completed: bool. whether every item ran
+        """
+        for item in self.items[self.index + 1:]:
+            item.status = SKIPPED
+        self._done = True
+        self._paused = False
+        if self._start is not None:
+            self.elapsed = time.perf_counter() - self._start
+        self.finished.emit(completed)
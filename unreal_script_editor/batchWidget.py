@@ -0,0 +1,225 @@
+"""
+Progress, controls and per item logs of a batchQueue.BatchQueue
+"""
+
+from Qt import QtWidgets, QtCore, QtGui
+
+from . import batchQueue
+from .reportTable import NumberItem
+
+
+STATUS_BRUSHES = {
+    batchQueue.OK: QtGui.QBrush(QtGui.QColor(110, 190, 110)),
+    batchQueue.FAILED: QtGui.QBrush(QtGui.QColor(220, 90, 90)),
+    batchQueue.TIMED_OUT: QtGui.QBrush(QtGui.QColor(220, 90, 90)),
+    batchQueue.CANCELLED: QtGui.QBrush(QtGui.QColor(220, 170, 80)),
+}
+
+
+def pick_items(parent, title, labels):
+    """
+    Ask which items to run, all checked by default
+
+    :param parent: QWidget. parent of the dialog
+    :param title: str. dialog title
+    :param labels: [str]. item names
+    :return: [int]. indexes of the checked items, empty if cancelled
+    """
+    dialog = QtWidgets.QDialog(parent)
+    dialog.setWindowTitle(title)
+    item_list = QtWidgets.QListWidget()
+    for label in labels:
+        item = QtWidgets.QListWidgetItem(label)
+        item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
+        item.setCheckState(QtCore.Qt.Checked)
+        item_list.addItem(item)
+
+    buttons = QtWidgets.QDialogButtonBox(
+        QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+    buttons.accepted.connect(dialog.accept)
+    buttons.rejected.connect(dialog.reject)
+
+    layout = QtWidgets.QVBoxLayout(dialog)
+    layout.addWidget(item_list)
+    layout.addWidget(buttons)
+
+    if not dialog.exec():
+        return list()
+    return [row for row in range(item_list.count())
+            if item_list.item(row).checkState() == QtCore.Qt.Checked]
+
+
+class BatchPanel(QtWidgets.QWidget):
+    """
+    Items of the running batch, with their status and output
+    """
+    HEADERS = ['Item', 'Status', 'Time (s)', 'Lines', 'Error Lines']
+
+    def __init__(self, parent=None):
+        """
+        Initialization
+        """
+        super(BatchPanel, self).__init__(parent)
+
+        self.ui_stop_on_error_check = QtWidgets.QCheckBox('Stop on first error')
+        self.ui_pause_btn = QtWidgets.QPushButton('Pause')
+        self.ui_pause_btn.setCheckable(True)
+        self.ui_pause_btn.setEnabled(False)
+        self.ui_cancel_btn = QtWidgets.QPushButton('Cancel')
+        self.ui_cancel_btn.setEnabled(False)
+
+        self.ui_progress_bar = QtWidgets.QProgressBar()
+        self.ui_progress_bar.setValue(0)
+        self.ui_status_label = QtWidgets.QLabel()
+
+        self.ui_item_table = QtWidgets.QTableWidget(0, len(self.HEADERS))
+        self.ui_item_table.setHorizontalHeaderLabels(self.HEADERS)
+        self.ui_item_table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.ui_item_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.ui_item_table.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.ui_item_table.verticalHeader().hide()
+        self.ui_item_table.horizontalHeader().setStretchLastSection(True)
+
+        # output of the selected item
+        self.ui_item_log = QtWidgets.QPlainTextEdit()
+        self.ui_item_log.setReadOnly(True)
+        self.ui_item_log.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
+
+        controls = QtWidgets.QHBoxLayout()
+        controls.addWidget(self.ui_stop_on_error_check)
+        controls.addStretch()
+        controls.addWidget(self.ui_pause_btn)
+        controls.addWidget(self.ui_cancel_btn)
+
+        splitter = QtWidgets.QSplitter(QtCore.Qt.Vertical)
+        splitter.addWidget(self.ui_item_table)
+        splitter.addWidget(self.ui_item_log)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addLayout(controls)
+        layout.addWidget(self.ui_progress_bar)
+        layout.addWidget(self.ui_status_label)
+        layout.addWidget(splitter)
+
+        self.queue = None
+
+        self.ui_pause_btn.toggled.connect(self.on_pause_toggled)
+        self.ui_cancel_btn.clicked.connect(self.cancel)
+        self.ui_item_table.itemSelectionChanged.connect(self.show_item_log)
+
+    def stop_on_error(self):
+        return self.ui_stop_on_error_check.isChecked()
+
+    def run(self, queue):
+        """
+        List the items of a batch and start it
+
+        :param queue: batchQueue.BatchQueue. batch to run
+        """
+        self.queue = queue
+        self.ui_item_table.setRowCount(len(queue.items))
+        for row, item in enumerate(queue.items):
+            self.ui_item_table.setItem(row, 0, QtWidgets.QTableWidgetItem(item.label))
+            self.update_row(row)
+        self.ui_item_table.resizeColumnsToContents()
+        self.ui_item_log.clear()
+
+        self.ui_progress_bar.setRange(0, len(queue.items))
+        self.ui_progress_bar.setValue(0)
+        self.ui_pause_btn.setChecked(False)
+        self.ui_pause_btn.setEnabled(True)
+        self.ui_cancel_btn.setEnabled(True)
+        self.ui_stop_on_error_check.setEnabled(False)
+
+        queue.item_started.connect(self.on_item_started)
+        queue.item_finished.connect(self.on_item_finished)
+        queue.paused.connect(self.on_paused)
+        queue.finished.connect(self.on_finished)
+        self.update_status()
+        queue.start()
+
+    def cancel(self):
+        if self.queue is not None:
+            self.queue.cancel()
+
+    def on_pause_toggled(self, checked):
+        if self.queue is None:
+            return
+        if checked:
+            self.queue.pause()
+        else:
+            self.queue.resume()
+
+    def on_paused(self, paused):
+        self.ui_pause_btn.setChecked(paused)
+        self.update_status()
+
+    def on_item_started(self, row):
+        self.update_row(row)
+        self.ui_item_table.scrollToItem(self.ui_item_table.item(row, 0))
+        self.update_status()
+
+    def on_item_finished(self, row):
+        self.update_row(row)
+        self.ui_progress_bar.setValue(self.queue.done_count)
+        self.update_status()
+        if self.ui_item_table.currentRow() == row:
+            self.show_item_log()
+
+    def on_finished(self, completed):
+        for row in range(len(self.queue.items)):
+            self.update_row(row)
+        self.ui_pause_btn.setChecked(False)
+        self.ui_pause_btn.setEnabled(False)
+        self.ui_cancel_btn.setEnabled(False)
+        self.ui_stop_on_error_check.setEnabled(True)
+        self.update_status(completed)
+
+    def update_row(self, row):
+        """
+        :param row: int. index of the item to show the status of
+        """
+        item = self.queue.items[row]
+        result = item.result
+        cells = [
+            QtWidgets.QTableWidgetItem(item.status),
+            NumberItem(result.wall_time if result else 0.0,
+                       '{:.3f}'.format(result.wall_time) if result else ''),
+            NumberItem(result.line_count if result else 0,
+                       str(result.line_count) if result else ''),
+            NumberItem(result.error_line_count if result else 0,
+                       str(result.error_line_count) if result else ''),
+        ]
+        brush = STATUS_BRUSHES.get(item.status)
+        if brush is not None:
+            cells[0].setForeground(brush)
+        for column, cell in enumerate(cells, 1):
+            self.ui_item_table.setItem(row, column, cell)
+
+    def update_status(self, completed=None):
+        """
+        :param completed: bool. whether the batch ended, None while running
+        """
+        queue = self.queue
+        counts = queue.counts()
+        text = '{} of {} items'.format(queue.done_count, len(queue.items))
+        details = ['{} {}'.format(counts[status], status) for status in (
+            batchQueue.OK, batchQueue.FAILED, batchQueue.TIMED_OUT,
+            batchQueue.CANCELLED, batchQueue.SKIPPED) if counts[status]]
+        if details:
+            text += ': ' + ', '.join(details)
+        if completed is not None:
+            text += ' ({:.2f}s{})'.format(queue.elapsed, '' if completed else ', stopped')
+        elif queue.is_paused():
+            text += ' (paused)'
+        self.ui_status_label.setText(text)
+
+    def show_item_log(self):
+        """
+        Show the output of the selected item
+        """
+        row = self.ui_item_table.currentRow()
+        if self.queue is None or not 0 <= row < len(self.queue.items):
+            return
+        item = self.queue.items[row]
+        self.ui_item_log.setPlainText('\n'.join(line for _, line in item.messages))
@@ -0,0 +1,93 @@
+"""
+Cache of compiled code objects for repeated executions
+
+Re-running an unchanged tab reuses the code object compiled on its first
+run, instead of parsing and compiling the whole source again.
+"""
+
+import collections
+import threading
+
+
+# maximum number of cached code objects
+MAX_ENTRIES = 64
+
+# maximum total size of the sources of the cached code objects
+MAX_BYTES = 64 * 1024 * 1024
+
+
+def source_hash(source):
+    """
+    :param source: str. python source
+    :return: str. hex digest identifying the source
+    """
+    # not imported on startup, before the first run
+    import hashlib
+    return hashlib.sha1(source.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+class CodeCache(object):
+    """
+    Least recently used cache of code objects, keyed by the hash of their
+    source, their compile mode and file name
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        """
+        Initialization
+
+        :param max_entries: int. maximum number of cached code objects
+        :param max_bytes: int. maximum total size of the cached sources
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = collections.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def compile(self, source, mode='exec', filename='<string>'):
+        """
+        Get the code object of a source, compiling it on a cache miss
+
+        Compilation errors are raised and never cached.
+
+        :param source: str. python source
+        :param mode: str. compile mode, 'exec', 'eval' or 'single'
+        :param filename: str. file name shown in tracebacks
+        :return: code. compiled code object
+        """
+        key = (source_hash(source), mode, filename)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        code = compile(source, filename, mode)
+
+        with self._lock:
+            self.misses += 1
+            if key not in self._entries:
+                self._entries[key] = (code, len(source))
+                self._size += len(source)
+            while self._entries and (
+                    len(self._entries) > self.max_entries or
+                    self._size > self.max_bytes):
+                _, (_, size) = self._entries.popitem(last=False)
+                self._size -= size
+        return code
+
+
+CACHE = CodeCache()
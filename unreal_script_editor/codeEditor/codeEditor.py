@@ -6,6 +6,28 @@ https://doc.qt.io/qtforpython/examples/example_widgets__codeeditor.html
 from Qt import QtCore, QtGui, QtWidgets
 
 
+INDENT = '\t'
+TAB_SIZE = 4
+COMMENT = '#'
+
+# line separator of QTextCursor.selectedText
+PARAGRAPH_SEPARATOR = u'\u2029'
+
+# characters typed before completion candidates pop up unprompted
+COMPLETION_MIN_PREFIX = 2
+
+
+def utf16_length(text):
+    """
+    :param text: str. text
+    :return: int. length of the text in a QTextDocument, where characters
+             outside the basic multilingual plane count twice
+    """
+    if text.isascii():
+        return len(text)
+    return len(text.encode('utf-16-le')) // 2
+
+
 class LineNumberArea(QtWidgets.QWidget):
     def __init__(self, editor):
         super(LineNumberArea, self).__init__(editor)
@@ -17,10 +39,17 @@ class LineNumberArea(QtWidgets.QWidget):
     def paintEvent(self, event):
         self._code_editor.lineNumberAreaPaintEvent(event)
 
-class CodeTextEdit(QtWidgets.QPlainTextEdit):
-    is_first = False
-    pressed_keys = list()
+    def event(self, event):
+        if event.type() == QtCore.QEvent.ToolTip:
+            message = self._code_editor.error_at(event.pos().y())
+            if message:
+                QtWidgets.QToolTip.showText(event.globalPos(), message, self)
+            else:
+                QtWidgets.QToolTip.hideText()
+            return True
+        return super(LineNumberArea, self).event(event)
 
+class CodeTextEdit(QtWidgets.QPlainTextEdit):
     indented = QtCore.Signal(object)
     unindented = QtCore.Signal(object)
     commented = QtCore.Signal(object)
@@ -28,6 +57,9 @@ class CodeTextEdit(QtWidgets.QPlainTextEdit):
 
     def __init__(self):
         super(CodeTextEdit, self).__init__()
+        self.is_first = False
+        # keys held down, per editor
+        self.pressed_keys = list()
 
         self.indented.connect(self.do_indent)
         self.unindented.connect(self.undo_indent)
@@ -45,11 +77,14 @@ class CodeTextEdit(QtWidgets.QPlainTextEdit):
         """
         Get text selection line range from cursor
         Note: currently only support continuous selection
-        :return: (int, int). start line number and end line number
+        Note: without selection, this is the line of the cursor, so
+        un-indent and comment act on it, not on the first line (0, 0)
+        :return: (int, int). start line number and end line number,
+                 the cursor line twice if nothing is selected
         """
         cursor = self.textCursor()
         if not cursor.hasSelection():
-            return 0, 0
+            return cursor.blockNumber(), cursor.blockNumber()
 
         start_pos = cursor.selectionStart()
         end_pos = cursor.selectionEnd()
@@ -61,19 +96,92 @@ class CodeTextEdit(QtWidgets.QPlainTextEdit):
 
         return start_line, end_line
 
+    def line_texts(self, lines):
+        """
+        Get the text of consecutive lines, read from the document at once
+        :param lines: [int]. consecutive line numbers
+        :return: (int, [str]). position of the first line and line texts
+        """
+        document = self.document()
+        first = document.findBlockByNumber(lines[0])
+        last = document.findBlockByNumber(lines[-1])
+        if not last.isValid():
+            last = document.lastBlock()
+
+        cursor = QtGui.QTextCursor(document)
+        cursor.setPosition(first.position())
+        cursor.setPosition(last.position() + last.length() - 1,
+                           QtGui.QTextCursor.KeepAnchor)
+        return first.position(), cursor.selectedText().split(PARAGRAPH_SEPARATOR)
+
+    def edit_lines(self, lines, edit):
+        """
+        Edit the start of consecutive lines as a single undo step
+
+        The lines are read at once and edited as strings in a single pass,
+        then the changed range is replaced by one insertion, instead of
+        moving a cursor to each line.
+        :param lines: [int]. consecutive line numbers
+        :param edit: callable. receives the text of a line and returns
+                     (column, length to remove, text to insert), or None
+                     to leave the line unchanged
+        """
+        if not lines:
+            return
+
+        position, texts = self.line_texts(lines)
+        edited = list()
+        first = last = None
+        for index, text in enumerate(texts):
+            change = edit(text)
+            if change:
+                column, length, insert = change
+                text = text[:column] + insert + text[column + length:]
+                if first is None:
+                    first = index
+                last = index
+            edited.append(text)
+        if first is None:
+            return
+
+        # document positions count utf-16 code units, python indices do not
+        if first:
+            position += utf16_length('\n'.join(texts[:first])) + 1
+        end = position + utf16_length('\n'.join(texts[first:last + 1]))
+
+        cursor = QtGui.QTextCursor(self.document())
+        cursor.beginEditBlock()
+        cursor.setPosition(position)
+        cursor.setPosition(end, QtGui.QTextCursor.KeepAnchor)
+        cursor.insertText('\n'.join(edited[first:last + 1]))
+        cursor.endEditBlock()
+
+    def select_lines(self, lines):
+        """
+        Select whole lines, e.g. after editing them
+        :param lines: [int]. consecutive line numbers
+        """
+        document = self.document()
+        first = document.findBlockByNumber(lines[0])
+        last = document.findBlockByNumber(lines[-1])
+        if not last.isValid():
+            last = document.lastBlock()
+
+        cursor = self.textCursor()
+        cursor.setPosition(first.position())
+        cursor.setPosition(last.position() + last.length() - 1,
+                           QtGui.QTextCursor.KeepAnchor)
+        self.setTextCursor(cursor)
+
     def remove_line_start(self, string, line_number):
         """
         Remove certain string occurrence on line start
         :param string: str. string pattern to remove
         :param line_number: int. line number
         """
-        cursor = QtGui.QTextCursor(
-            self.document().findBlockByLineNumber(line_number))
-        cursor.select(QtGui.QTextCursor.LineUnderCursor)
-        text = cursor.selectedText()
-        if text.startswith(string):
-            cursor.removeSelectedText()
-            cursor.insertText(text.split(string, 1)[-1])
+        self.edit_lines(
+            [line_number],
+            lambda text: (0, len(string), '') if text.startswith(string) else None)
 
     def insert_line_start(self, string, line_number):
         """
@@ -81,10 +189,7 @@ class CodeTextEdit(QtWidgets.QPlainTextEdit):
         :param string: str. string pattern to insert
         :param line_number: int. line number
         """
-        cursor = QtGui.QTextCursor(
-            self.document().findBlockByLineNumber(line_number))
-        self.setTextCursor(cursor)
-        self.textCursor().insertText(string)
+        self.edit_lines([line_number], lambda text: (0, 0, string))
 
     def keyPressEvent(self, event):
         """
@@ -117,7 +222,8 @@ class CodeTextEdit(QtWidgets.QPlainTextEdit):
             self.process_multi_keys(self.pressed_keys)
 
         self.is_first = False
-        self.pressed_keys.pop()
+        if self.pressed_keys:
+            self.pressed_keys.pop()
         super(CodeTextEdit, self).keyReleaseEvent(event)
 
     def process_multi_keys(self, keys):
@@ -127,39 +233,76 @@ class CodeTextEdit(QtWidgets.QPlainTextEdit):
         """
         # toggle comments indent event
         if keys == [QtCore.Qt.Key_Control, QtCore.Qt.Key_Slash]:
-            pass
+            start_line, end_line = self.get_selection_range()
+            self.toggle_comment(range(start_line, end_line+1))
 
     def do_indent(self, lines):
         """
         Indent lines
         :param lines: [int]. line numbers
         """
-        for line in lines:
-            self.insert_line_start('\t', line)
+        self.edit_lines(lines, lambda text: (0, 0, INDENT))
+        self.select_lines(lines)
 
     def undo_indent(self, lines):
         """
-        Un-indent lines
+        Un-indent lines, removing a tab or up to a tab width of spaces
+        :param lines: [int]. line numbers
+        """
+        def unindent(text):
+            if text.startswith(INDENT):
+                return 0, len(INDENT), ''
+            spaces = len(text[:TAB_SIZE]) - len(text[:TAB_SIZE].lstrip(' '))
+            return (0, spaces, '') if spaces else None
+
+        self.edit_lines(lines, unindent)
+        self.select_lines(lines)
+
+    def toggle_comment(self, lines):
+        """
+        Comment out lines, or un-comment them if they are all commented
         :param lines: [int]. line numbers
         """
-        for line in lines:
-            self.remove_line_start('\t', line)
+        _, texts = self.line_texts(lines)
+        if all(text.lstrip().startswith(COMMENT)
+               for text in texts if text.strip()):
+            self.undo_comment(lines)
+        else:
+            self.do_comment(lines)
 
     def do_comment(self, lines):
         """
-        Comment out lines
+        Comment out lines, at the indentation of the least indented one
         :param lines: [int]. line numbers
         """
-        for line in lines:
-            pass
+        _, texts = self.line_texts(lines)
+        indents = [len(text) - len(text.lstrip())
+                   for text in texts if text.strip()]
+        if not indents:
+            return
+
+        column = min(indents)
+        self.edit_lines(
+            lines,
+            lambda text: (column, 0, COMMENT + ' ') if text.strip() else None)
+        self.select_lines(lines)
 
     def undo_comment(self, lines):
         """
         Un-comment lines
         :param lines: [int]. line numbers
         """
-        for line in lines:
-            pass
+        def uncomment(text):
+            column = len(text) - len(text.lstrip())
+            if not text.startswith(COMMENT, column):
+                return None
+            length = len(COMMENT)
+            if text.startswith(' ', column + length):
+                length += 1
+            return column, length, ''
+
+        self.edit_lines(lines, uncomment)
+        self.select_lines(lines)
 
 
 class CodeEditor(CodeTextEdit):
@@ -175,7 +318,7 @@ class CodeEditor(CodeTextEdit):
         self.font.setPointSize(10)
         self.setFont(self.font)
 
-        self.tab_size = 4
+        self.tab_size = TAB_SIZE
         self.setTabStopWidth(self.tab_size * self.fontMetrics().width(' '))
 
         self.blockCountChanged.connect(self.update_line_number_area_width)
@@ -183,6 +326,116 @@ class CodeEditor(CodeTextEdit):
 
         self.update_line_number_area_width(0)
 
+        self.completion_provider = None
+        self.completer = None
+        self._completion_prefix = ''
+
+        # {line number: message} of the lines marked in the gutter
+        self.error_lines = dict()
+
+    def set_error_lines(self, error_lines):
+        """
+        Mark lines with errors in the line number area
+        :param error_lines: dict. {line number: message}, 0 based
+        """
+        if error_lines == self.error_lines:
+            return
+        self.error_lines = error_lines
+        self.line_number_area.update()
+
+    def error_at(self, y):
+        """
+        :param y: int. vertical position in the line number area
+        :return: str. error message of the line at the position, if any
+        """
+        block = self.cursorForPosition(QtCore.QPoint(0, y)).block()
+        return self.error_lines.get(block.blockNumber())
+
+    def set_completion_provider(self, provider):
+        """
+        Enable auto-completion, candidates pop up while typing names or
+        on Ctrl+Space
+        :param provider: callable. receives the document and the text of
+                         the line before the cursor, returns the partial
+                         name and a list of (name, kind) candidates
+        """
+        self.completion_provider = provider
+        if self.completer is not None:
+            return
+
+        self.completer = QtWidgets.QCompleter(self)
+        self.completer.setWidget(self)
+        self.completer.setCompletionMode(
+            QtWidgets.QCompleter.UnfilteredPopupCompletion)
+        self.completer.setModel(QtCore.QStringListModel(self.completer))
+        self.completer.activated[str].connect(self.insert_completion)
+
+    def keyPressEvent(self, event):
+        """
+        Extend the key press event to drive the completion popup
+        """
+        popup = self.completer.popup() if self.completer else None
+        if popup is not None and popup.isVisible() and event.key() in (
+                QtCore.Qt.Key_Enter, QtCore.Qt.Key_Return,
+                QtCore.Qt.Key_Tab, QtCore.Qt.Key_Escape):
+            # handled by the completer
+            event.ignore()
+            return
+
+        force = event.key() == QtCore.Qt.Key_Space and \
+            event.modifiers() == QtCore.Qt.ControlModifier
+        if not force:
+            super(CodeEditor, self).keyPressEvent(event)
+
+        if self.completion_provider is None:
+            return
+
+        text = event.text()
+        typing = bool(text) and (text[-1].isalnum() or text[-1] in '_.')
+        erasing = event.key() == QtCore.Qt.Key_Backspace and popup.isVisible()
+        if force or typing or erasing:
+            self.update_completion(force)
+        else:
+            popup.hide()
+
+    def update_completion(self, force=False):
+        """
+        Show the completion candidates of the name before the cursor
+        :param force: bool. show them even for a short partial name
+        """
+        cursor = self.textCursor()
+        line = cursor.block().text()[:cursor.positionInBlock()]
+        prefix, candidates = self.completion_provider(self.document(), line)
+
+        popup = self.completer.popup()
+        if not candidates or not (
+                force or line.endswith('.') or
+                len(prefix) >= COMPLETION_MIN_PREFIX):
+            popup.hide()
+            return
+
+        self._completion_prefix = prefix
+        model = self.completer.model()
+        model.setStringList([name for name, _ in candidates])
+        popup.setCurrentIndex(model.index(0, 0))
+
+        rect = self.cursorRect()
+        rect.setWidth(popup.sizeHintForColumn(0) +
+                      popup.verticalScrollBar().sizeHint().width())
+        self.completer.complete(rect)
+
+    def insert_completion(self, name):
+        """
+        Replace the partial name before the cursor with a completion
+        :param name: str. completed name
+        """
+        cursor = self.textCursor()
+        cursor.movePosition(
+            QtGui.QTextCursor.Left, QtGui.QTextCursor.KeepAnchor,
+            len(self._completion_prefix))
+        cursor.insertText(name)
+        self.setTextCursor(cursor)
+
     def line_number_area_width(self):
         digits = 1
         max_num = max(1, self.blockCount())
@@ -203,6 +456,7 @@ class CodeEditor(CodeTextEdit):
     def lineNumberAreaPaintEvent(self, event):
         BACKGROUND_COLOR = QtGui.QColor(21, 21, 21)
         LINENUMBER_COLOR = QtGui.QColor(200, 200, 200)
+        ERROR_COLOR = QtGui.QColor(150, 30, 30)
 
         painter = QtGui.QPainter(self.line_number_area)
         painter.fillRect(event.rect(), BACKGROUND_COLOR)
@@ -218,6 +472,10 @@ class CodeEditor(CodeTextEdit):
                 painter.setPen(LINENUMBER_COLOR)
                 width = self.line_number_area.width() - 10
                 height = self.fontMetrics().height()
+                if block_number in self.error_lines:
+                    painter.fillRect(
+                        0, int(top), self.line_number_area.width(),
+                        int(bottom - top), ERROR_COLOR)
                 painter.drawText(
                     0,
                     int(top),
@@ -0,0 +1,94 @@
+"""
+Benchmark the python syntax highlighter in blocks per second
+
+usage:
+    python -m unreal_script_editor.codeEditor.highlighter.benchmark [file ...]
+
+Without any file argument, a large sample is generated from the python
+sources of this package. The spans of the highlighter are checked against
+the formats of the original regex highlighter by tests/test_pyTokenizer.py.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+from Qt import QtGui, QtWidgets
+
+from .pyHighlight import PythonHighlighter
+
+
+MODULE_PATH = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_PATH = os.path.dirname(os.path.dirname(MODULE_PATH))
+
+SAMPLE_BLOCKS = 50000
+
+
+def sample_text(blocks=SAMPLE_BLOCKS):
+    """
+    Build a large python sample from the package sources
+
+    :param blocks: int. minimum number of lines in the sample
+    :return: str. sample text
+    """
+    sources = list()
+    for path in sorted(glob.glob(
+            os.path.join(PACKAGE_PATH, '**', '*.py'), recursive=True)):
+        with open(path, 'r') as f:
+            sources.append(f.read())
+
+    source = '\n'.join(sources)
+    count = max(1, source.count('\n'))
+    return '\n'.join([source] * (blocks // count + 1))
+
+
+def measure(highlighter_class, text, repeat=3):
+    """
+    Measure the full document highlighting speed of a highlighter
+
+    :param highlighter_class: QSyntaxHighlighter. highlighter type to measure
+    :param text: str. document content
+    :param repeat: int. number of runs, the best one is kept
+    :return: float. blocks highlighted per second
+    """
+    document = QtGui.QTextDocument()
+    document.setPlainText(text)
+    highlighter = highlighter_class(document)
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        highlighter.rehighlight()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    highlighter.setDocument(None)
+    return document.blockCount() / max(best, 1e-9)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('files', nargs='*', help='python files to highlight')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+    samples = list()
+    for path in args.files:
+        with open(path, 'r') as f:
+            samples.append((os.path.basename(path), f.read()))
+    if not samples:
+        samples.append(('<generated sample>', sample_text()))
+
+    for name, text in samples:
+        print('{}: {} blocks, {:.0f} blocks/s'.format(
+            name,
+            text.count('\n') + 1,
+            measure(PythonHighlighter, text, args.repeat)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,409 @@
+"""
+Viewport-lazy syntax highlighting for very large python documents
+
+Unlike ``QSyntaxHighlighter``, which formats the whole document up front,
+the lazy highlighter formats the blocks visible in the editor first and
+fills in the rest of the document in short idle time slices.
+
+Each block stores the multi-line string state it was formatted with and
+the state it ends in (see ``pack_state``), so after an edit only the
+blocks whose incoming state actually changed are formatted again.
+
+``ThreadedPythonHighlighter`` additionally moves the tokenization to a
+worker thread, the GUI thread only applies spans from ``spanCache.CACHE``.
+"""
+
+import time
+
+from Qt import QtCore, QtGui
+
+from . import pyTokenizer, spanCache
+from .pyHighlight import STYLES
+
+
+# documents with more blocks than this should use the lazy highlighter
+BLOCK_THRESHOLD = 20000
+
+# seconds spent formatting per idle slice, before yielding to the event loop
+SLICE_BUDGET = 0.008
+
+# maximum number of blocks formatted synchronously after an edit
+SYNC_LIMIT = 500
+
+# number of blocks tokenized per worker request
+RUN_SIZE = 2000
+
+UNKNOWN_STATE = -1
+
+
+def pack_state(in_state, out_state):
+    """
+    Pack the incoming and outgoing tokenizer states into a block user state
+
+    :param in_state: int. state the block was formatted with
+    :param out_state: int. state the block ends in
+    :return: int. packed user state
+    """
+    return in_state * 4 + out_state
+
+
+def unpack_state(user_state):
+    """
+    Unpack a block user state
+
+    :param user_state: int. user state packed by pack_state
+    :return: (int, int). incoming and outgoing tokenizer states,
+             (None, None) for blocks which are not formatted yet
+    """
+    if user_state < 0:
+        return None, None
+    return user_state // 4, user_state % 4
+
+
+class LazyPythonHighlighter(QtCore.QObject):
+    """
+    Syntax highlighter for the Python language, formatting the visible
+    blocks of an editor first and the rest of its document when idle
+    """
+
+    def __init__(self, editor):
+        """
+        Initialization
+
+        :param editor: QPlainTextEdit. editor whose document is highlighted
+        """
+        super(LazyPythonHighlighter, self).__init__(editor)
+        self.styles = STYLES
+
+        self._editor = editor
+        self._document = editor.document()
+        self._block_count = self._document.blockCount()
+
+        # every block before the frontier ends in a verified state
+        self._frontier = 0
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.fill_slice)
+
+        self._document.contentsChange.connect(self.on_contents_change)
+        self._editor.updateRequest.connect(self.on_update_request)
+
+        # start from the event loop, before the editor is first painted
+        QtCore.QTimer.singleShot(0, self.highlight_visible)
+        self._timer.start()
+
+    def document(self):
+        """
+        :return: QTextDocument. the highlighted document
+        """
+        return self._document
+
+    def is_complete(self):
+        """
+        :return: bool. whether every block of the document is highlighted
+        """
+        return self._frontier >= self._document.blockCount()
+
+    def rehighlight(self):
+        """
+        Discard every block state and highlight the document again
+        """
+        block = self._document.begin()
+        while block.isValid():
+            block.setUserState(UNKNOWN_STATE)
+            block = block.next()
+
+        self._frontier = 0
+        self.highlight_visible()
+        self._timer.start()
+
+    def tokenize(self, text, in_state):
+        """
+        Get the spans of a block
+
+        :param text: str. block text
+        :param in_state: int. state the previous block ends in
+        :return: ([(int, int, str)], int). spans and the state the block
+                 ends in, None if the block is not tokenized yet
+        """
+        return spanCache.CACHE.tokenize(text, in_state)
+
+    def request(self, block, in_state, count):
+        """
+        Request the tokenization of blocks whose spans are not available
+
+        Only called when ``tokenize`` returns None: this highlighter
+        tokenizes on demand, subclasses deferring the tokenization must
+        implement it.
+
+        :param block: QTextBlock. first block to tokenize
+        :param in_state: int. state the previous block ends in
+        :param count: int. number of consecutive blocks to tokenize
+        """
+        raise NotImplementedError(
+            '{} defers tokenization without implementing request'.format(
+                type(self).__name__))
+
+    def format_block(self, block, in_state):
+        """
+        Apply the formats of a tokenized block to its layout
+
+        The document is not marked dirty, see ``mark_dirty``.
+
+        :param block: QTextBlock. block to format
+        :param in_state: int. state the previous block ends in
+        :return: int. state the block ends in, None if the block is not
+                 tokenized yet
+        """
+        result = self.tokenize(block.text(), in_state)
+        if result is None:
+            return None
+        spans, out_state = result
+
+        ranges = list()
+        for start, length, style in spans:
+            format_range = QtGui.QTextLayout.FormatRange()
+            format_range.start = start
+            format_range.length = length
+            format_range.format = self.styles[style]
+            ranges.append(format_range)
+
+        block.layout().setFormats(ranges)
+        block.setUserState(pack_state(in_state, out_state))
+        return out_state
+
+    def mark_dirty(self, first, last):
+        """
+        Request a re-layout of a range of formatted blocks
+
+        :param first: QTextBlock. first formatted block
+        :param last: QTextBlock. last formatted block
+        """
+        start = first.position()
+        self._document.markContentsDirty(
+            start, last.position() + last.length() - start)
+
+    def previous_state(self, block):
+        """
+        Get the state the block before the given one ends in
+
+        :param block: QTextBlock. block
+        :return: int. tokenizer state, the normal state is assumed for
+                 previous blocks which are not formatted yet
+        """
+        _, out_state = unpack_state(block.previous().userState())
+        if out_state is None:
+            return pyTokenizer.STATE_NORMAL
+        return out_state
+
+    def highlight_visible(self):
+        """
+        Format the blocks currently visible in the editor
+
+        Blocks past the frontier are formatted with the state of their
+        previous block, even if that is not verified yet. The idle slices
+        correct them once the frontier reaches them.
+        """
+        block = self._editor.firstVisibleBlock()
+        if not block.isValid():
+            return
+
+        height = self._editor.viewport().height()
+        offset = self._editor.contentOffset()
+        in_state = self.previous_state(block)
+
+        first = last = None
+        while block.isValid():
+            top = self._editor.blockBoundingGeometry(block).translated(offset).top()
+            if top > height:
+                break
+
+            stored_in, stored_out = unpack_state(block.userState())
+            if stored_in != in_state:
+                stored_out = self.format_block(block, in_state)
+                if stored_out is None:
+                    self.request(block, in_state, RUN_SIZE)
+                    break
+                if first is None:
+                    first = block
+                last = block
+
+            in_state = stored_out
+            block = block.next()
+
+        if first is not None:
+            self.mark_dirty(first, last)
+
+    def fill_slice(self):
+        """
+        Verify and format blocks from the frontier onwards, until the
+        time budget of one slice is spent
+        """
+        deadline = time.perf_counter() + SLICE_BUDGET
+
+        block = self._document.findBlockByNumber(self._frontier)
+        in_state = self.previous_state(block)
+
+        first = last = None
+        while block.isValid():
+            stored_in, stored_out = unpack_state(block.userState())
+            if stored_in != in_state:
+                stored_out = self.format_block(block, in_state)
+                if stored_out is None:
+                    # resumed once the requested blocks are tokenized
+                    self.request(block, in_state, RUN_SIZE)
+                    self._timer.stop()
+                    break
+                if first is None:
+                    first = block
+                last = block
+
+            in_state = stored_out
+            block = block.next()
+            self._frontier += 1
+
+            if time.perf_counter() > deadline:
+                break
+
+        if first is not None:
+            self.mark_dirty(first, last)
+
+        if not block.isValid():
+            self._timer.stop()
+
+    def on_contents_change(self, position, removed, added):
+        """
+        Re-format the edited blocks, and the following blocks as long as
+        their incoming state changed
+
+        :param position: int. position of the change
+        :param removed: int. number of characters removed
+        :param added: int. number of characters added
+        """
+        block_count = self._document.blockCount()
+        delta = block_count - self._block_count
+        self._block_count = block_count
+
+        first = self._document.findBlock(position)
+        last = self._document.findBlock(position + added)
+        if not first.isValid():
+            return
+        if not last.isValid():
+            last = self._document.lastBlock()
+
+        number = first.blockNumber()
+        last_number = last.blockNumber()
+
+        # blocks created by the edit are unknown already, only the blocks
+        # split or merged at both ends may carry a stale state
+        first.setUserState(UNKNOWN_STATE)
+        last.setUserState(UNKNOWN_STATE)
+
+        in_state = self.previous_state(first)
+        block = first
+        consistent = False
+        count = 0
+        while block.isValid() and count < SYNC_LIMIT:
+            stored_in, stored_out = unpack_state(block.userState())
+            if stored_in == in_state and block.blockNumber() > last_number:
+                consistent = True
+                break
+            out_state = self.format_block(block, in_state)
+            if out_state is None:
+                self.request(block, in_state, RUN_SIZE)
+                break
+            in_state = out_state
+            block = block.next()
+            count += 1
+
+        if count:
+            self.mark_dirty(first, block.previous() if block.isValid()
+                            else self._document.lastBlock())
+
+        stop = block.blockNumber() if block.isValid() else block_count
+        if number <= self._frontier:
+            if self._frontier > number:
+                self._frontier += delta
+            if consistent:
+                self._frontier = max(self._frontier, stop)
+            else:
+                self._frontier = stop
+
+        if not self.is_complete():
+            self._timer.start()
+
+    def on_update_request(self, rect, dy):
+        """
+        Format newly exposed blocks when the editor scrolls or resizes
+
+        :param rect: QRect. updated viewport area
+        :param dy: int. scrolled distance in pixels
+        """
+        if dy or rect.contains(self._editor.viewport().rect()):
+            self.highlight_visible()
+
+
+class ThreadedPythonHighlighter(LazyPythonHighlighter):
+    """
+    Lazy python highlighter tokenizing in a worker thread
+
+    Blocks missing from ``spanCache.CACHE`` are sent to the worker in runs
+    of consecutive blocks, the highlighting resumes with cached spans when
+    the run is tokenized.
+    """
+    tokenized = QtCore.Signal()
+
+    def __init__(self, editor):
+        """
+        Initialization
+
+        :param editor: QPlainTextEdit. editor whose document is highlighted
+        """
+        self._pending = None
+        super(ThreadedPythonHighlighter, self).__init__(editor)
+        self.tokenized.connect(self.on_tokenized)
+
+    def tokenize(self, text, in_state):
+        """
+        Override: only return spans which are already cached
+        """
+        return spanCache.CACHE.get(text, in_state)
+
+    def request(self, block, in_state, count):
+        """
+        Override: tokenize the blocks in the worker thread
+        """
+        if self._pending is not None:
+            return
+
+        texts = list()
+        while block.isValid() and len(texts) < count:
+            texts.append(block.text())
+            block = block.next()
+
+        self._pending = spanCache.executor().submit(
+            spanCache.CACHE.tokenize_run, texts, in_state)
+        self._pending.add_done_callback(self.emit_tokenized)
+
+    def emit_tokenized(self, future):
+        """
+        Notify the GUI thread that a requested run is tokenized,
+        called from the worker thread
+
+        :param future: concurrent.futures.Future. finished request
+        """
+        try:
+            self.tokenized.emit()
+        except RuntimeError:
+            # highlighter deleted while the worker was busy
+            pass
+
+    def on_tokenized(self):
+        """
+        Resume highlighting with the newly cached spans
+        """
+        self._pending = None
+        self.highlight_visible()
+        if not self.is_complete():
+            self._timer.start()
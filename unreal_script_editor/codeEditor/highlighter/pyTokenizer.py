@@ -0,0 +1,110 @@
+"""
+Single-pass Python tokenizer used by the syntax highlighters
+
+The tokenizer has no Qt dependency, it turns one line (block) of text into
+a list of typed spans ``(start, length, style_key)`` where ``style_key`` is
+a key of ``pyHighlight.STYLES``.
+"""
+
+import re
+
+
+# bumped whenever the tokenizer output changes, invalidates cached spans
+REVISION = 1
+
+# block states, shared with QSyntaxHighlighter.setCurrentBlockState
+STATE_NORMAL = 0
+STATE_TRI_SINGLE = 1
+STATE_TRI_DOUBLE = 2
+
+TRI_DELIMITERS = {
+    STATE_TRI_SINGLE: "'''",
+    STATE_TRI_DOUBLE: '"""',
+}
+
+# Python keywords
+KEYWORDS = [
+    'and', 'assert', 'break', 'class', 'continue', 'def',
+    'del', 'elif', 'else', 'except', 'exec', 'finally',
+    'for', 'from', 'global', 'if', 'import', 'in',
+    'is', 'lambda', 'not', 'or', 'pass', 'print',
+    'raise', 'return', 'try', 'while', 'yield',
+    'None', 'True', 'False',
+]
+
+# one alternation for every rule, earlier branches win on the same position
+# so comments and strings swallow whatever keywords they contain
+TOKEN_RE = re.compile(
+    r"""
+    (?P<comment>\#.*)
+    |(?P<triple>'''|\"\"\")
+    |(?P<string>"[^"\\]*(?:\\.[^"\\]*)*"|'[^'\\]*(?:\\.[^'\\]*)*')
+    |\b(?P<defclass>def|class)\b\s*(?P<name>\w+)?
+    |\b(?P<self>self)\b
+    |\b(?P<keyword>{keywords})\b
+    |\b(?P<numbers>[+-]?(?:
+        0[xX][0-9A-Fa-f]+[lL]?
+        |[0-9]+(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?[lL]?
+    ))\b
+    """.format(keywords='|'.join(
+        sorted(KEYWORDS, key=len, reverse=True))),
+    re.VERBOSE
+)
+
+
+def tokenize(text, state=STATE_NORMAL):
+    """
+    Tokenize a single block of text
+
+    :param text: str. text of the block, without line break
+    :param state: int. block state the previous block ended in,
+                  any unknown state (e.g. -1) is treated as STATE_NORMAL
+    :return: ([(int, int, str)], int). spans as (start, length, style key)
+             and the state this block ends in
+    """
+    spans = list()
+    pos = 0
+    end = len(text)
+
+    # continue a multi-line string from the previous block
+    delimiter = TRI_DELIMITERS.get(state)
+    if delimiter:
+        close = text.find(delimiter)
+        if close < 0:
+            if end:
+                spans.append((0, end, 'string2'))
+            return spans, state
+        pos = close + 3
+        spans.append((0, pos, 'string2'))
+
+    search = TOKEN_RE.search
+    while pos < end:
+        match = search(text, pos)
+        if not match:
+            break
+
+        kind = match.lastgroup
+        start = match.start()
+        pos = match.end()
+
+        if kind == 'triple':
+            delimiter = match.group(kind)
+            close = text.find(delimiter, pos)
+            if close < 0:
+                spans.append((start, end - start, 'string2'))
+                if delimiter == "'''":
+                    return spans, STATE_TRI_SINGLE
+                return spans, STATE_TRI_DOUBLE
+            pos = close + 3
+            spans.append((start, pos - start, 'string2'))
+        elif kind == 'name':
+            # 'def'/'class' followed by an identifier
+            spans.append((start, match.end('defclass') - start, 'keyword'))
+            spans.append((match.start(kind), pos - match.start(kind), 'defclass'))
+        elif kind == 'defclass':
+            # 'def'/'class' without an identifier yet
+            spans.append((start, match.end(kind) - start, 'keyword'))
+        else:
+            spans.append((start, pos - start, kind))
+
+    return spans, STATE_NORMAL
@@ -0,0 +1,130 @@
+"""
+Cache of tokenized block spans, shared by every highlighter
+
+The cache has no Qt dependency so blocks can be tokenized in a worker
+thread, the highlighters on the GUI thread then only apply cached spans.
+"""
+
+import collections
+import threading
+
+from . import pyTokenizer
+
+
+# maximum number of cached blocks, shared across every document
+MAX_ENTRIES = 100000
+
+_EXECUTOR = None
+
+
+class SpanCache(object):
+    """
+    Least recently used cache of tokenizer results
+
+    Entries are keyed by the tokenizer revision, the state the block
+    starts in and the block text itself, so a hit always compares the
+    text, and identical lines in any document share a single entry.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        """
+        Initialization
+
+        :param max_entries: int. number of entries kept before the least
+                            recently used ones are evicted
+        """
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(text, state):
+        """
+        :param text: str. block text
+        :param state: int. state the block starts in
+        :return: tuple. cache key of the block
+        """
+        return pyTokenizer.REVISION, state, text
+
+    def get(self, text, state):
+        """
+        Get the cached tokenizer result of a block
+
+        :param text: str. block text
+        :param state: int. state the block starts in
+        :return: ([(int, int, str)], int). spans and the state the block
+                 ends in, None if the block is not cached
+        """
+        key = self.key(text, state)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+        return result
+
+    def put(self, text, state, result):
+        """
+        Cache the tokenizer result of a block
+
+        :param text: str. block text
+        :param state: int. state the block starts in
+        :param result: ([(int, int, str)], int). spans and end state
+        """
+        key = self.key(text, state)
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def tokenize(self, text, state):
+        """
+        Get the tokenizer result of a block, tokenizing it on a cache miss
+
+        :param text: str. block text
+        :param state: int. state the block starts in
+        :return: ([(int, int, str)], int). spans and end state
+        """
+        if state not in pyTokenizer.TRI_DELIMITERS:
+            state = pyTokenizer.STATE_NORMAL
+
+        result = self.get(text, state)
+        if result is None:
+            result = pyTokenizer.tokenize(text, state)
+            self.put(text, state, result)
+        return result
+
+    def tokenize_run(self, texts, state):
+        """
+        Tokenize consecutive blocks into the cache, chaining their states
+
+        :param texts: [str]. text of consecutive blocks
+        :param state: int. state the first block starts in
+        :return: int. state the last block ends in
+        """
+        for text in texts:
+            _, state = self.tokenize(text, state)
+        return state
+
+
+CACHE = SpanCache()
+
+
+def executor():
+    """
+    Get the worker shared by every threaded highlighter
+
+    :return: concurrent.futures.ThreadPoolExecutor. single thread executor
+    """
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        from concurrent import futures
+        _EXECUTOR = futures.ThreadPoolExecutor(max_workers=1)
+    return _EXECUTOR
@@ -0,0 +1,177 @@
+"""
+Sorted-array index of symbol names for completion
+
+Names are grouped by owner (e.g. '' for the global names, 'unreal' for the
+members of the unreal module). Each group keeps its names sorted by their
+lower case form, so a prefix lookup is a binary search, and joined in a
+single string, so a fuzzy lookup is one regex scan done in C.
+"""
+
+import bisect
+import re
+
+
+CLASS = 'class'
+FUNCTION = 'function'
+PROPERTY = 'property'
+VARIABLE = 'variable'
+MODULE = 'module'
+KEYWORD = 'keyword'
+
+# maximum number of candidates returned by a lookup
+LIMIT = 50
+
+
+class SymbolGroup(object):
+    """
+    Names of a single owner
+    """
+
+    def __init__(self, symbols):
+        """
+        Initialization
+
+        :param symbols: iterable. (name, kind) pairs
+        """
+        symbols = sorted(set(symbols), key=lambda symbol: symbol[0].lower())
+        self.names = [name for name, _ in symbols]
+        self.kinds = [kind for _, kind in symbols]
+        self.keys = [name.lower() for name in self.names]
+        self._joined = None
+        self._starts = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def joined(self):
+        """
+        :return: str. lower case names, one per line, built on first use
+        """
+        if self._joined is None:
+            self._joined = '\n'.join(self.keys)
+        return self._joined
+
+    def starts(self):
+        """
+        :return: [int]. position of each name in the joined string
+        """
+        if self._starts is None:
+            self._starts = list()
+            position = 0
+            for key in self.keys:
+                self._starts.append(position)
+                position += len(key) + 1
+        return self._starts
+
+    def prefix(self, prefix, limit=LIMIT):
+        """
+        :param prefix: str. case insensitive name prefix
+        :param limit: int. maximum number of results
+        :return: [int]. indices of the names starting with the prefix,
+                 in alphabetical order
+        """
+        prefix = prefix.lower()
+        keys = self.keys
+        start = bisect.bisect_left(keys, prefix)
+        end = start
+        while end < len(keys) and end - start < limit and \
+                keys[end].startswith(prefix):
+            end += 1
+        return list(range(start, end))
+
+    def fuzzy(self, query, limit=LIMIT):
+        """
+        :param query: str. case insensitive characters the names contain
+                      in order, e.g. 'eal' matches 'EditorAssetLibrary'
+        :param limit: int. maximum number of results
+        :return: [int]. indices of the matching names, the tightest
+                 and shortest matches first
+        """
+        if not query:
+            return list(range(min(limit, len(self.names))))
+
+        # each character is followed by anything but the next one, so a
+        # match is the tightest from its start, and never spans two names
+        query = query.lower()
+        pattern = ''.join(
+            re.escape(char) + '[^{}\n]*'.format(re.escape(next_char))
+            for char, next_char in zip(query, query[1:]))
+        regex = re.compile(pattern + re.escape(query[-1]))
+
+        # rank by the span of the matched characters, then the name length,
+        # the name index is the line of the match in the joined string
+        ranked = dict()
+        starts = self.starts()
+        for match in regex.finditer(self.joined()):
+            index = bisect.bisect_right(starts, match.start()) - 1
+            span = match.end() - match.start()
+            if index not in ranked or span < ranked[index][0]:
+                ranked[index] = (span, len(self.keys[index]), index)
+        return [index for _, _, index in sorted(ranked.values())[:limit]]
+
+
+class SymbolIndex(object):
+    """
+    Symbol names of several owners
+    """
+
+    def __init__(self):
+        """
+        Initialization
+        """
+        self.groups = dict()
+
+    def __contains__(self, owner):
+        return owner in self.groups
+
+    def add(self, owner, symbols):
+        """
+        Set the names of an owner
+
+        :param owner: str. dotted owner path, '' for the global names
+        :param symbols: iterable. (name, kind) pairs
+        """
+        self.groups[owner] = SymbolGroup(symbols)
+
+    def complete(self, owner, query, limit=LIMIT):
+        """
+        Get the completion candidates of a partial name: the names starting
+        with it, then the fuzzy matches
+
+        :param owner: str. dotted owner path, '' for the global names
+        :param query: str. partial name
+        :param limit: int. maximum number of results
+        :return: [(str, str)]. candidate names and kinds
+        """
+        group = self.groups.get(owner)
+        if group is None:
+            return list()
+
+        indices = group.prefix(query, limit)
+        if len(indices) < limit and query:
+            seen = set(indices)
+            indices.extend(
+                index for index in group.fuzzy(query, limit)
+                if index not in seen)
+        return [(group.names[index], group.kinds[index])
+                for index in indices[:limit]]
+
+    def to_dict(self):
+        """
+        :return: dict. {owner: [[name, kind]]}, serializable as json
+        """
+        return {
+            owner: [list(symbol) for symbol in zip(group.names, group.kinds)]
+            for owner, group in self.groups.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        :param data: dict. {owner: [[name, kind]]}, as given by to_dict
+        :return: SymbolIndex. index of the names
+        """
+        index = cls()
+        for owner, symbols in data.items():
+            index.add(owner, (tuple(symbol) for symbol in symbols))
+        return index
@@ -0,0 +1,277 @@
+"""
+Auto-completion of the unreal API and of the names of the current script
+
+The members of the unreal module are indexed once, then saved per engine
+version, so later sessions load the index instead of introspecting the
+module again. The members of a class are only introspected the first time
+they are completed, and saved along.
+"""
+
+import builtins
+import inspect
+import json
+import keyword
+import logging
+import os
+import re
+import time
+
+from . import fileIO
+from .codeEditor import symbolIndex
+
+
+LOGGER = logging.getLogger(__name__)
+
+CACHE_PATH = fileIO.data_path('cache', 'completion')
+
+# version of the saved index format
+INDEX_FORMAT = 1
+
+ROOT = 'unreal'
+
+# dotted name being typed, at the end of the text before the cursor
+CONTEXT_RE = re.compile(r'([A-Za-z_][\w.]*)?$')
+NAME_RE = re.compile(r'[A-Za-z_]\w*')
+
+# seconds before the names of a script changed since are indexed again
+SCRIPT_REFRESH = 1.0
+
+
+def engine_version(module):
+    """
+    :param module: module. unreal module
+    :return: str. engine version, 'unknown' if not available
+    """
+    try:
+        return str(module.SystemLibrary.get_engine_version())
+    except Exception:
+        return 'unknown'
+
+
+def index_path(version, cache_path=None):
+    """
+    :param version: str. engine version
+    :param cache_path: str. directory of the saved indices, CACHE_PATH if None
+    :return: str. path of the index of the engine version
+    """
+    name = re.sub(r'[^\w.-]+', '_', version)
+    return os.path.join(cache_path or CACHE_PATH, 'unreal_{}.json'.format(name))
+
+
+def symbol_kind(value):
+    """
+    :param value: object. member value
+    :return: str. symbolIndex kind of the member
+    """
+    if inspect.isclass(value):
+        return symbolIndex.CLASS
+    if inspect.ismodule(value):
+        return symbolIndex.MODULE
+    if callable(value):
+        return symbolIndex.FUNCTION
+    return symbolIndex.PROPERTY
+
+
+def members(value):
+    """
+    :param value: object. module, class or instance to introspect
+    :return: [(str, str)]. public member names and kinds
+    """
+    symbols = list()
+    for name in dir(value):
+        if name.startswith('_'):
+            continue
+        try:
+            kind = symbol_kind(getattr(value, name))
+        except Exception:
+            # e.g. a property raising on a class
+            kind = symbolIndex.PROPERTY
+        symbols.append((name, kind))
+    return symbols
+
+
+class UnrealIndex(object):
+    """
+    Lazily built and persisted index of the unreal module members
+    """
+
+    def __init__(self, module=None, cache_path=None):
+        """
+        Initialization
+
+        :param module: module. unreal module, imported on first use if None
+        :param cache_path: str. directory of the saved indices, CACHE_PATH
+                           if None
+        """
+        self.cache_path = cache_path or CACHE_PATH
+        self.index = None
+        self.path = None
+
+        self._module = module
+        self._dirty = False
+
+    def module(self):
+        """
+        :return: module. unreal module, None outside Unreal
+        """
+        if self._module is None:
+            try:
+                import unreal
+                self._module = unreal
+            except ImportError:
+                pass
+        return self._module
+
+    def load(self):
+        """
+        Load the saved index of the engine version, or index the module
+        """
+        if self.index is not None:
+            return
+
+        self.index = symbolIndex.SymbolIndex()
+        module = self.module()
+        if module is None:
+            return
+
+        self.path = index_path(engine_version(module), self.cache_path)
+        try:
+            with open(self.path, 'rb') as f:
+                data = json.loads(f.read().decode('utf-8'))
+            if data.get('format') == INDEX_FORMAT:
+                self.index = symbolIndex.SymbolIndex.from_dict(data['symbols'])
+        except (IOError, OSError, ValueError, KeyError):
+            pass
+
+        if ROOT not in self.index:
+            start = time.perf_counter()
+            self.index.add(ROOT, members(module))
+            self._dirty = True
+            LOGGER.info('indexed the unreal module in %.3fs',
+                        time.perf_counter() - start)
+
+    def resolve(self, owner):
+        """
+        :param owner: str. dotted path within the unreal module
+        :return: object. value of the path, None if it does not exist
+        """
+        value = self.module()
+        for name in owner.split('.')[1:]:
+            try:
+                value = getattr(value, name)
+            except Exception:
+                return None
+        return value
+
+    def complete(self, owner, query, limit=symbolIndex.LIMIT):
+        """
+        :param owner: str. dotted path within the unreal module
+        :param query: str. partial member name
+        :param limit: int. maximum number of results
+        :return: [(str, str)]. candidate names and kinds
+        """
+        self.load()
+        if owner not in self.index:
+            value = self.resolve(owner)
+            if value is None:
+                return list()
+            self.index.add(owner, members(value))
+            self._dirty = True
+        return self.index.complete(owner, query, limit)
+
+    def save(self):
+        """
+        Save the index, if it changed since it was loaded
+        """
+        if not self._dirty or self.path is None:
+            return
+
+        data = {'format': INDEX_FORMAT, 'symbols': self.index.to_dict()}
+        try:
+            fileIO.atomic_write(self.path, json.dumps(data).encode('utf-8'))
+            self._dirty = False
+        except (IOError, OSError):
+            LOGGER.exception('failed to save the completion index')
+
+
+class CompletionProvider(object):
+    """
+    Completion candidates of the text before the cursor: unreal members
+    after 'unreal.', otherwise the names of the script, the builtins and
+    the keywords
+    """
+
+    def __init__(self, unreal_index=None):
+        """
+        Initialization
+
+        :param unreal_index: UnrealIndex. unreal module index
+        """
+        self.unreal_index = unreal_index or UnrealIndex()
+
+        self.globals = symbolIndex.SymbolIndex()
+        symbols = [(name, symbolIndex.KEYWORD) for name in keyword.kwlist]
+        symbols.extend(members(builtins))
+        symbols.append((ROOT, symbolIndex.MODULE))
+        self.globals.add('', symbols)
+
+        # names of the last completed script
+        self._document = None
+        self._revision = None
+        self._indexed = 0.0
+        self._script = symbolIndex.SymbolIndex()
+
+    def script_names(self, document):
+        """
+        Get the index of the names of a script, indexed again if it
+        changed, at most every SCRIPT_REFRESH seconds
+
+        :param document: QTextDocument. script document
+        :return: symbolIndex.SymbolIndex. names of the script
+        """
+        now = time.time()
+        if document is not self._document or (
+                document.revision() != self._revision and
+                now - self._indexed > SCRIPT_REFRESH):
+            names = set(NAME_RE.findall(document.toPlainText()))
+            self._script.add(
+                '', ((name, symbolIndex.PROPERTY) for name in names))
+            self._document = document
+            self._revision = document.revision()
+            self._indexed = now
+        return self._script
+
+    def __call__(self, document, text, limit=symbolIndex.LIMIT):
+        """
+        :param document: QTextDocument. script document
+        :param text: str. text of the line before the cursor
+        :param limit: int. maximum number of results
+        :return: (str, [(str, str)]). partial name being completed and
+                 candidate names and kinds
+        """
+        dotted = CONTEXT_RE.search(text).group(1) or ''
+        owner, _, query = dotted.rpartition('.')
+
+        if owner:
+            if owner == ROOT or owner.startswith(ROOT + '.'):
+                return query, self.unreal_index.complete(owner, query, limit)
+            return query, list()
+
+        if not query:
+            return query, list()
+
+        candidates = list()
+        seen = set([query])
+        for index in (self.script_names(document), self.globals):
+            for name, kind in index.complete('', query, limit):
+                if name not in seen:
+                    seen.add(name)
+                    candidates.append((name, kind))
+
+        # prefix matches of either index before the fuzzy ones
+        prefix = query.lower()
+        candidates.sort(key=lambda symbol: not symbol[0].lower().startswith(prefix))
+        return query, candidates[:limit]
+
+    def save(self):
+        self.unreal_index.save()
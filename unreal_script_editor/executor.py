@@ -0,0 +1,534 @@
+"""
+Non-blocking execution of python commands outside Unreal
+
+A command runs either in a worker thread of this interpreter, sharing its
+modules, or in a separate python subprocess. Its stdout and stderr are
+streamed line by line through a thread-safe queue, which the GUI thread
+drains periodically (see ``ExecutionEngine``).
+
+Commands are compiled through ``codeCache.CACHE``, the subprocess receives
+the marshalled code object so it does not compile the source again.
+"""
+
+import builtins
+import collections
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+
+from Qt import QtCore
+
+from . import codeCache
+
+
+THREAD = 'thread'
+PROCESS = 'process'
+# runs synchronously in the calling thread, e.g. the Unreal game thread
+INLINE = 'inline'
+
+# interval (ms) at which the GUI thread collects the streamed output
+POLL_INTERVAL = 30
+
+# file name of the executed commands, shown in tracebacks
+FILENAME = '<script editor>'
+
+# subprocess entry point, running the marshalled code read from stdin
+PROCESS_BOOTSTRAP = (
+    "import marshal, sys; "
+    "exec(marshal.loads(sys.stdin.buffer.read()), {'__name__': '__main__'})"
+)
+
+
+ExecutionResult = collections.namedtuple(
+    'ExecutionResult', ['success', 'cancelled', 'timed_out', 'wall_time', 'tool',
+                        'cpu_time', 'peak_rss_delta', 'line_count', 'error_line_count'])
+ExecutionResult.__new__.__defaults__ = (None, None, None, 0, 0)
+
+
+def peak_rss():
+    """
+    :return: int. peak resident memory of this process in bytes, None if
+             unknown
+    """
+    try:
+        import resource
+    except ImportError:
+        resource = None
+
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes, except on macOS
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+    if os.name == 'nt':
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD),
+                        ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t),
+                        ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t),
+                        ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(
+                process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    return None
+
+
+class StreamRouter(object):
+    """
+    File-like object replacing sys.stdout/sys.stderr, which sends the text
+    written by registered threads to their queue, line by line, and the
+    text written by any other thread to the original stream
+
+    The original stream is None when python runs without a console, e.g.
+    pythonw, the text of the other threads is then discarded.
+    """
+
+    def __init__(self, stream, level):
+        """
+        Initialization
+
+        :param stream: file. original stream, None if there is none
+        :param level: str. message type of the lines, e.g. 'info' or 'error'
+        """
+        self.stream = stream
+        self.level = level
+        self._queues = dict()
+        self._partials = dict()
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if self.stream is None:
+            raise AttributeError(name)
+        return getattr(self.stream, name)
+
+    @property
+    def encoding(self):
+        return getattr(self.stream, 'encoding', None) or 'utf-8'
+
+    def isatty(self):
+        return self.stream is not None and self.stream.isatty()
+
+    def register(self, output_queue):
+        """
+        Route the writes of the current thread to a queue
+
+        :param output_queue: queue.Queue. queue receiving (type, line)
+        """
+        with self._lock:
+            self._queues[threading.get_ident()] = output_queue
+
+    def unregister(self):
+        """
+        Stop routing the current thread, flushing its incomplete line
+        """
+        ident = threading.get_ident()
+        with self._lock:
+            output_queue = self._queues.pop(ident, None)
+            partial = self._partials.pop(ident, '')
+        if output_queue is not None and partial:
+            output_queue.put((self.level, partial))
+
+    def write(self, text):
+        ident = threading.get_ident()
+        output_queue = self._queues.get(ident)
+        if output_queue is None:
+            if self.stream is None:
+                return len(text)
+            return self.stream.write(text)
+
+        lines = (self._partials.pop(ident, '') + text).split('\n')
+        for line in lines[:-1]:
+            output_queue.put((self.level, line))
+        if lines[-1]:
+            self._partials[ident] = lines[-1]
+        return len(text)
+
+    def flush(self):
+        if self.stream is not None and threading.get_ident() not in self._queues:
+            self.stream.flush()
+
+
+def install_routers():
+    """
+    Replace sys.stdout and sys.stderr with stream routers, once
+
+    :return: (StreamRouter, StreamRouter). stdout and stderr routers
+    """
+    if not isinstance(sys.stdout, StreamRouter):
+        sys.stdout = StreamRouter(sys.stdout, 'info')
+    if not isinstance(sys.stderr, StreamRouter):
+        sys.stderr = StreamRouter(sys.stderr, 'error')
+    return sys.stdout, sys.stderr
+
+
+def new_namespace():
+    """
+    :return: dict. globals of a command run as a main script
+    """
+    return {'__name__': '__main__', '__builtins__': builtins}
+
+
+class Execution(object):
+    """
+    A single run of a python command in a worker thread or a subprocess
+    """
+
+    def __init__(self, command, mode=THREAD, namespace=None, tool=None):
+        """
+        Initialization
+
+        :param command: str. python source to run
+        :param mode: str. THREAD, PROCESS or INLINE
+        :param namespace: dict. globals of a threaded or inline run,
+                          a new main namespace if None
+        :param tool: profiling.Profiler or profiling.MemoryTracer. tool
+                     started and stopped around a threaded or inline run
+        """
+        self.command = command
+        self.mode = mode
+        self.namespace = new_namespace() if namespace is None else namespace
+        self.tool = tool
+
+        self.output = queue.Queue()
+        self.success = False
+        self.cancelled = False
+        self.timed_out = False
+
+        # resources used by the run, None if unknown
+        self.cpu_time = None
+        self.peak_rss_delta = None
+        self.line_count = 0
+        self.error_line_count = 0
+
+        self._done = threading.Event()
+        self._thread = None
+        # a threaded command is interrupted once at most, and only while
+        # it runs, never in the cleanup after it
+        self._interrupt_lock = threading.Lock()
+        self._interruptible = False
+        self._interrupted = False
+        self._process = None
+        self._start = None
+        self._wall_time = None
+        self._start_times = None
+
+    def start(self):
+        """
+        Start running the command, returns immediately unless inline
+        """
+        self._start = time.perf_counter()
+        if self.mode == PROCESS:
+            self._start_process()
+        elif self.mode == INLINE:
+            self._run_code()
+        else:
+            self._thread = threading.Thread(target=self._run_code)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def elapsed(self):
+        """
+        :return: float. seconds the command has been running for
+        """
+        if self._wall_time is not None:
+            return self._wall_time
+        if self._start is None:
+            return 0.0
+        return time.perf_counter() - self._start
+
+    def is_done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Block until the command finished
+
+        :param timeout: float. maximum seconds to wait
+        :return: bool. whether the command finished
+        """
+        return self._done.wait(timeout)
+
+    def cancel(self, timed_out=False):
+        """
+        Interrupt the command
+
+        A threaded command is interrupted by a KeyboardInterrupt raised in
+        its thread, which is delivered once the thread runs python code
+        again (not while it is blocked in a C call). An interrupt not
+        delivered when the command ends is dropped. A subprocess is killed.
+
+        :param timed_out: bool. whether the cancellation is due to a timeout
+        """
+        if self.is_done():
+            return
+
+        self.cancelled = True
+        self.timed_out = timed_out
+        if self._process is not None:
+            self._process.kill()
+        elif self._thread is not None:
+            with self._interrupt_lock:
+                if not self._interruptible or self._interrupted:
+                    return
+                import ctypes
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                    ctypes.c_ulong(self._thread.ident),
+                    ctypes.py_object(KeyboardInterrupt))
+                self._interrupted = True
+
+    def _disarm(self):
+        """
+        From the running thread, once the command returned: stop accepting
+        interrupts and drop the one pending, if any
+        """
+        while True:
+            try:
+                with self._interrupt_lock:
+                    self._interruptible = False
+                    if self._interrupted:
+                        import ctypes
+                        ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                            ctypes.c_ulong(threading.get_ident()), None)
+                return
+            except KeyboardInterrupt:
+                # delivered before it could be dropped
+                continue
+
+    def check_thread(self):
+        """
+        Finish a threaded command whose thread ended without finishing,
+        e.g. killed by an exception escaping its cleanup
+        """
+        if self._thread is not None and not self._thread.is_alive() and \
+                not self.is_done():
+            self.output.put(('error', 'the execution thread ended unexpectedly'))
+            self._finish()
+
+    def messages(self):
+        """
+        Drain the output streamed so far
+
+        :return: [(str, str)]. message type and line
+        """
+        messages = list()
+        while True:
+            try:
+                messages.append(self.output.get_nowait())
+            except queue.Empty:
+                break
+
+        self.line_count += len(messages)
+        self.error_line_count += sum(1 for mtype, _ in messages if mtype == 'error')
+        return messages
+
+    def result(self):
+        """
+        :return: ExecutionResult. outcome of the finished command
+        """
+        return ExecutionResult(
+            self.success, self.cancelled, self.timed_out, self.elapsed(),
+            self.tool, self.cpu_time, self.peak_rss_delta, self.line_count,
+            self.error_line_count)
+
+    def _finish(self):
+        if self._done.is_set():
+            return
+        self._wall_time = time.perf_counter() - self._start
+        self._done.set()
+
+    def _run_code(self):
+        stdout, stderr = install_routers()
+        stdout.register(self.output)
+        stderr.register(self.output)
+
+        # the memory peak is process wide, only its growth is the run's
+        start_cpu = time.thread_time()
+        start_peak = peak_rss()
+
+        error = list()
+        with self._interrupt_lock:
+            self._interruptible = self._thread is not None
+        try:
+            code = codeCache.CACHE.compile(self.command, 'exec', FILENAME)
+            if self.tool is not None:
+                # from the running thread, profiles are per thread
+                self.tool.start()
+            try:
+                # cancelled before the thread could be interrupted
+                if self.cancelled:
+                    raise KeyboardInterrupt
+                exec(code, self.namespace)
+            finally:
+                self._disarm()
+                if self.tool is not None:
+                    self.tool.stop()
+            self.success = True
+        except KeyboardInterrupt:
+            error.append('KeyboardInterrupt: execution cancelled')
+        except BaseException:
+            # skip this frame, the traceback starts in the command
+            exc_type, exc_value, exc_traceback = sys.exc_info()
+            error = traceback.format_exception(
+                exc_type, exc_value, exc_traceback.tb_next)
+        finally:
+            self.cpu_time = time.thread_time() - start_cpu
+            end_peak = peak_rss()
+            if start_peak is not None and end_peak is not None:
+                self.peak_rss_delta = end_peak - start_peak
+
+            stdout.unregister()
+            stderr.unregister()
+            for line in ''.join(error).rstrip('\n').split('\n') if error else []:
+                self.output.put(('error', line))
+            self._finish()
+
+    def _start_process(self):
+        # only needed by subprocess runs, not imported on startup
+        import marshal
+        import subprocess
+
+        try:
+            code = codeCache.CACHE.compile(self.command, 'exec', FILENAME)
+        except (SyntaxError, ValueError) as error:
+            lines = traceback.format_exception_only(type(error), error)
+            for line in ''.join(lines).rstrip('\n').split('\n'):
+                self.output.put(('error', line))
+            self._finish()
+            return
+
+        self._start_times = os.times()
+        self._process = subprocess.Popen(
+            [sys.executable, '-u', '-c', PROCESS_BOOTSTRAP],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE)
+
+        readers = [
+            threading.Thread(target=self._read_pipe,
+                             args=(self._process.stdout, 'info')),
+            threading.Thread(target=self._read_pipe,
+                             args=(self._process.stderr, 'error')),
+        ]
+        for reader in readers:
+            reader.daemon = True
+            reader.start()
+
+        waiter = threading.Thread(target=self._wait_process, args=(readers,))
+        waiter.daemon = True
+        waiter.start()
+
+        try:
+            self._process.stdin.write(marshal.dumps(code))
+            self._process.stdin.close()
+        except OSError:
+            # the process died before reading its code, e.g. cancelled
+            pass
+
+    def _read_pipe(self, pipe, level):
+        for line in iter(pipe.readline, b''):
+            self.output.put((level, line.decode('utf-8', 'replace').rstrip('\r\n')))
+        pipe.close()
+
+    def _wait_process(self, readers):
+        code = self._process.wait()
+        if os.name != 'nt':
+            # the child cpu times are only counted on posix, once reaped
+            times = os.times()
+            self.cpu_time = (times.children_user + times.children_system -
+                             self._start_times.children_user -
+                             self._start_times.children_system)
+        for reader in readers:
+            reader.join()
+        self.success = code == 0 and not self.cancelled
+        self._finish()
+
+
+class ExecutionEngine(QtCore.QObject):
+    """
+    Run commands in the background and relay their output to the GUI thread
+    """
+    output = QtCore.Signal(str, str)
+    finished = QtCore.Signal(object)
+
+    def __init__(self, parent=None):
+        """
+        Initialization
+        """
+        super(ExecutionEngine, self).__init__(parent)
+        self.execution = None
+        self.timeout = None
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(POLL_INTERVAL)
+        self._timer.timeout.connect(self.poll)
+
+    def is_running(self):
+        return self.execution is not None
+
+    def run(self, command, mode=THREAD, timeout=None, namespace=None, tool=None):
+        """
+        Start running a command, unless one is already running
+
+        :param command: str. python source to run
+        :param mode: str. THREAD or PROCESS
+        :param timeout: float. seconds after which the command is cancelled
+        :param namespace: dict. globals of a threaded run, e.g. a
+                          persistent namespace shared by several runs
+        :param tool: profiling.Profiler or profiling.MemoryTracer. tool
+                     profiling a threaded run
+        :return: bool. whether the command started
+        """
+        if self.is_running():
+            return False
+
+        self.timeout = timeout
+        self.execution = Execution(command, mode, namespace, tool)
+        self.execution.start()
+        self._timer.start()
+        return True
+
+    def cancel(self):
+        """
+        Cancel the running command
+        """
+        if self.execution is not None:
+            self.execution.cancel()
+
+    def poll(self):
+        """
+        Relay the streamed output, enforce the timeout and report the end
+        of the running command
+        """
+        execution = self.execution
+        if execution is None:
+            self._timer.stop()
+            return
+
+        if self.timeout and execution.elapsed() > self.timeout:
+            execution.cancel(timed_out=True)
+        execution.check_thread()
+
+        # read the state first so no line written before the end is missed
+        done = execution.is_done()
+        for mtype, line in execution.messages():
+            self.output.emit(line, mtype)
+
+        if done:
+            self._timer.stop()
+            self.execution = None
+            self.finished.emit(execution.result())
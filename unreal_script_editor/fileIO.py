@@ -0,0 +1,169 @@
+"""
+File helpers: per-user data directory, atomic writes and inter-process locks
+"""
+
+import contextlib
+import errno
+import os
+import stat
+import sys
+import tempfile
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+# seconds a FileLock waits for another process before giving up
+LOCK_TIMEOUT = 10.0
+
+# attempts at replacing a file temporarily opened by another process
+REPLACE_ATTEMPTS = 5
+
+# directory name of the runtime data and the variable overriding its path
+DATA_NAME = 'unrealScriptEditor'
+DATA_ENV = 'UNREAL_SCRIPT_EDITOR_DATA'
+
+
+def data_root():
+    """
+    Get the per-user directory of the runtime data (session, logs, caches,
+    profiles...), the data is never written inside the package
+
+    :return: str. UNREAL_SCRIPT_EDITOR_DATA if set, the platform
+             application data directory otherwise
+    """
+    path = os.environ.get(DATA_ENV)
+    if path:
+        return os.path.abspath(os.path.expanduser(path))
+
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.environ.get('APPDATA') or \
+            os.path.join(os.path.expanduser('~'), 'AppData', 'Local')
+    elif sys.platform == 'darwin':
+        base = os.path.join(os.path.expanduser('~'), 'Library', 'Application Support')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or \
+            os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(base, DATA_NAME)
+
+
+def data_path(*parts):
+    """
+    :param parts: str. path components relative to the data directory
+    :return: str. path inside the per-user data directory
+    """
+    return os.path.join(data_root(), *parts)
+
+
+def atomic_write(path, data):
+    """
+    Write a file atomically: the data is written and synced to a temporary
+    file next to the target, which then replaces it. A crash leaves either
+    the previous or the new content, never a truncated file.
+
+    :param path: str. file path
+    :param data: bytes. file content
+    """
+    with atomic_file(path) as f:
+        f.write(data)
+
+
+@contextlib.contextmanager
+def atomic_file(path):
+    """
+    Binary file replacing a file atomically once the block ends, to
+    stream large contents (see atomic_write). The target is left untouched
+    if the block raises.
+
+    :param path: str. file path
+    """
+    directory = os.path.dirname(path) or '.'
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix='.{}.'.format(os.path.basename(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            # the replaced file keeps its permissions
+            if os.path.exists(path):
+                os.chmod(temp_path, stat.S_IMODE(os.stat(path).st_mode))
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def replace(source, target):
+    """
+    Rename a file over another one, retrying while the target is
+    temporarily locked (e.g. read by another process on windows)
+
+    :param source: str. file to rename
+    :param target: str. file to replace
+    """
+    for attempt in range(REPLACE_ATTEMPTS):
+        try:
+            os.replace(source, target)
+            return
+        except PermissionError:
+            if attempt == REPLACE_ATTEMPTS - 1:
+                raise
+            time.sleep(0.05 * (attempt + 1))
+
+
+class FileLock(object):
+    """
+    Exclusive inter-process lock on a file, as a context manager
+    """
+
+    def __init__(self, path, timeout=LOCK_TIMEOUT):
+        """
+        Initialization
+
+        :param path: str. lock file path, created if missing
+        :param timeout: float. seconds to wait for the lock
+        """
+        self.path = path
+        self.timeout = timeout
+        self._file = None
+
+    def __enter__(self):
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        self._file = open(self.path, 'a+b')
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                if fcntl:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                return self
+            except (IOError, OSError) as error:
+                if error.errno not in (errno.EAGAIN, errno.EACCES, errno.EDEADLK):
+                    raise
+                if time.time() > deadline:
+                    self._file.close()
+                    raise RuntimeError('timed out waiting for {}'.format(self.path))
+                time.sleep(0.05)
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        if fcntl:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()
+        self._file = None
@@ -0,0 +1,226 @@
+"""
+Watch the files of the script tabs, and reload their external changes
+
+The changes of a burst, e.g. a checkout touching hundreds of files, are
+reported once the files stay untouched for a while. A reload only replaces
+the line ranges which differ, as a single undo step, so the undo history,
+the scroll position and the highlighting of the other lines are kept.
+
+The folder of each file is watched too: a file replaced by a rename, or
+removed then created again, is no longer watched by Qt and is added back.
+"""
+
+import collections
+import os
+
+from Qt import QtCore, QtGui
+
+
+# milliseconds without change before the changed files are reported
+RELOAD_DELAY = 300
+
+
+def normalize(path):
+    """
+    :param path: str. file path
+    :return: str. absolute and case normalized path, the key of a file
+    """
+    return os.path.normcase(os.path.abspath(path))
+
+
+def file_stat(path):
+    """
+    :param path: str. file path
+    :return: (int, int). modification time in nanoseconds and size of the
+             file, None if it does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def changed_ranges(old, new):
+    """
+    :param old: [str]. lines of the current text
+    :param new: [str]. lines of the new text
+    :return: [(int, int, [str])]. ranges of old lines, start and end, with
+             the lines replacing them, in order
+    """
+    # only needed once a file changed, not imported on startup
+    import difflib
+
+    # the common start and end are skipped before diffing the rest
+    limit = min(len(old), len(new))
+    prefix = 0
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+
+    matcher = difflib.SequenceMatcher(
+        None, old[prefix:len(old) - suffix], new[prefix:len(new) - suffix],
+        autojunk=False)
+    return [(prefix + i1, prefix + i2, new[prefix + j1:prefix + j2])
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal']
+
+
+def block_end(block):
+    """
+    :param block: QTextBlock. block of a document
+    :return: int. position of the end of the block, before its separator
+    """
+    return block.position() + block.length() - 1
+
+
+def apply_ranges(document, ranges):
+    """
+    Replace line ranges of a document, as a single undo step
+
+    :param document: QTextDocument. document, one block per line
+    :param ranges: [(int, int, [str])]. line ranges and their new lines,
+                   see changed_ranges
+    """
+    block_count = document.blockCount()
+    cursor = QtGui.QTextCursor(document)
+    cursor.beginEditBlock()
+    # from the end, the blocks before a range keep their number
+    for start, end, lines in reversed(ranges):
+        if start < end and lines:
+            cursor.setPosition(document.findBlockByNumber(start).position())
+            cursor.setPosition(block_end(document.findBlockByNumber(end - 1)),
+                               QtGui.QTextCursor.KeepAnchor)
+            cursor.insertText('\n'.join(lines))
+        elif start < end:
+            if end < block_count:
+                cursor.setPosition(document.findBlockByNumber(start).position())
+                cursor.setPosition(document.findBlockByNumber(end).position(),
+                                   QtGui.QTextCursor.KeepAnchor)
+            else:
+                # the last lines, removed with the separator before them
+                cursor.setPosition(block_end(document.findBlockByNumber(start - 1)))
+                cursor.setPosition(block_end(document.lastBlock()),
+                                   QtGui.QTextCursor.KeepAnchor)
+            cursor.removeSelectedText()
+        elif start < block_count:
+            cursor.setPosition(document.findBlockByNumber(start).position())
+            cursor.insertText('\n'.join(lines) + '\n')
+        else:
+            cursor.setPosition(block_end(document.lastBlock()))
+            cursor.insertText('\n' + '\n'.join(lines))
+    cursor.endEditBlock()
+
+
+class FileWatcher(QtCore.QObject):
+    """
+    Debounced change notifications of a set of files
+    """
+    # normalized paths of the files changed, created or removed
+    changed = QtCore.Signal(list)
+
+    def __init__(self, parent=None, delay=RELOAD_DELAY):
+        """
+        Initialization
+
+        :param parent: QObject. parent object
+        :param delay: int. milliseconds without change before reporting
+        """
+        super(FileWatcher, self).__init__(parent)
+        # number of tabs of each watched file
+        self._counts = collections.Counter()
+        self._pending = set()
+
+        self._watcher = QtCore.QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self.on_file_changed)
+        self._watcher.directoryChanged.connect(self.on_directory_changed)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay)
+        self._timer.timeout.connect(self.flush)
+
+    def paths(self):
+        """
+        :return: [str]. normalized paths of the watched files
+        """
+        return sorted(self._counts)
+
+    def watch(self, path):
+        """
+        :param path: str. file to watch, once per tab showing it
+        """
+        path = normalize(path)
+        self._counts[path] += 1
+        if self._counts[path] == 1:
+            self.add(path)
+
+    def unwatch(self, path):
+        """
+        :param path: str. file no longer shown by a tab
+        """
+        path = normalize(path)
+        if self._counts[path] > 1:
+            self._counts[path] -= 1
+            return
+
+        self._counts.pop(path, None)
+        self._pending.discard(path)
+        if path in self._watcher.files():
+            self._watcher.removePath(path)
+        directory = os.path.dirname(path)
+        if directory in self._watcher.directories() and not any(
+                os.path.dirname(watched) == directory for watched in self._counts):
+            self._watcher.removePath(directory)
+
+    def add(self, path):
+        """
+        Watch a file and its folder, if they exist
+
+        :param path: str. normalized path of the file
+        """
+        directory = os.path.dirname(path)
+        if directory not in self._watcher.directories() and os.path.isdir(directory):
+            self._watcher.addPath(directory)
+        if path not in self._watcher.files() and os.path.isfile(path):
+            self._watcher.addPath(path)
+
+    def schedule(self, paths):
+        """
+        Report files as changed after the delay, e.g. to check the files
+        restored with a session
+
+        :param paths: [str]. watched files
+        """
+        self._pending.update(normalize(path) for path in paths)
+        self._timer.start()
+
+    def on_file_changed(self, path):
+        if path not in self._counts:
+            return
+        self._pending.add(path)
+        # a file replaced by a rename is no longer watched
+        self.add(path)
+        self._timer.start()
+
+    def on_directory_changed(self, directory):
+        # a removal is reported by the file watch, a creation is not
+        watched = set(self._watcher.files())
+        for path in self._counts:
+            if os.path.dirname(path) == directory and path not in watched and \
+                    os.path.isfile(path):
+                self._pending.add(path)
+                self.add(path)
+                self._timer.start()
+
+    def flush(self):
+        """
+        Report the files changed since the last report
+        """
+        paths = sorted(self._pending)
+        self._pending.clear()
+        for path in paths:
+            self.add(path)
+        if paths:
+            self.changed.emit(paths)
@@ -0,0 +1,347 @@
+"""
+Reload the changed modules of in-house packages before a run
+
+The imported modules whose file is under the configured folders are
+tracked with the modification time and size of their file. Before a run,
+the changed modules are reloaded together with the modules importing them,
+directly or not, dependencies first, so a module importing names from a
+changed one gets the new names.
+
+The import statements of a module are found in its source without parsing
+the whole file, once per version of the file and only once a module
+changed. Nested imports count too, and so do import lines within strings,
+so the dependents are a superset of the modules really affected.
+"""
+
+import ast
+import collections
+import heapq
+import importlib
+import os
+import re
+import sys
+import time
+import tokenize
+import traceback
+
+from . import fileIO
+
+
+ROOTS_PATH = fileIO.data_path('reload_roots.txt')
+
+# the editor itself is never reloaded
+EDITOR_PACKAGE = __name__.rpartition('.')[0]
+
+# import statement at the start of a line, with its parenthesized or
+# backslash continued lines
+IMPORT_STATEMENT = re.compile(
+    r'^[ \t]*((?:from[ \t]+\.*[\w.]*[ \t]+import[ \t]*(?:\([^)]*\)|(?:.*\\\n)*.*))'
+    r'|(?:import[ \t]+(?:.*\\\n)*.*))',
+    re.MULTILINE)
+
+
+TrackedModule = collections.namedtuple(
+    'TrackedModule', ['path', 'mtime', 'size', 'imports'])
+
+
+class ReloadResult(collections.namedtuple(
+        'ReloadResult', ['reloaded', 'failed', 'elapsed'])):
+    """
+    Outcome of a reload
+
+    :param reloaded: [str]. reloaded modules, in reload order
+    :param failed: [(str, str)]. modules whose reload raised, and the error
+    :param elapsed: float. seconds spent scanning and reloading
+    """
+    __slots__ = ()
+
+
+def load_roots(path=None):
+    """
+    :param path: str. file listing the folders, one per line, ROOTS_PATH
+                 if None
+    :return: [str]. folders whose modules are reloaded
+    """
+    try:
+        with open(path or ROOTS_PATH, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()]
+    except (IOError, OSError):
+        return list()
+
+
+def save_roots(roots, path=None):
+    """
+    :param roots: [str]. folders whose modules are reloaded
+    :param path: str. file listing the folders, one per line, ROOTS_PATH
+                 if None
+    """
+    fileIO.atomic_write(path or ROOTS_PATH, ''.join(root + '\n' for root in roots).encode('utf-8'))
+
+
+def module_file(module):
+    """
+    :param module: module. imported module
+    :return: str. source file of the module, None if it has none
+    """
+    path = getattr(module, '__file__', None)
+    if not isinstance(path, str) or not path.endswith('.py'):
+        return None
+    return os.path.normcase(os.path.abspath(path))
+
+
+def read_imports(name, path):
+    """
+    :param name: str. name of the module
+    :param path: str. source file of the module
+    :return: frozenset. (module, names) of each import, names being the
+             imported names of a from-import, empty for an import
+    """
+    try:
+        with tokenize.open(path) as f:
+            source = f.read()
+    except (IOError, OSError, SyntaxError, ValueError):
+        return frozenset()
+
+    if os.path.basename(path) == '__init__.py':
+        package = name
+    else:
+        package = name.rpartition('.')[0]
+
+    nodes = list()
+    for match in IMPORT_STATEMENT.finditer(source):
+        try:
+            nodes.extend(ast.parse(match.group(1)).body)
+        except (SyntaxError, ValueError):
+            # e.g. an import sentence within a docstring
+            continue
+
+    imports = set()
+    for node in nodes:
+        if isinstance(node, ast.Import):
+            imports.update((alias.name, ()) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package.split('.') if package else list()
+                if node.level - 1 > len(base):
+                    continue
+                base = base[:len(base) - node.level + 1]
+                if node.module:
+                    base.append(node.module)
+                origin = '.'.join(base)
+            else:
+                origin = node.module
+            if origin:
+                imports.add((origin, tuple(alias.name for alias in node.names)))
+    return frozenset(imports)
+
+
+def resolve_imports(imports, modules):
+    """
+    :param imports: frozenset. imports of a module, see read_imports
+    :param modules: set. names of the modules to resolve against
+    :return: set. modules the module depends on
+    """
+    dependencies = set()
+    for origin, names in imports:
+        if not names:
+            # import a.b.c binds a, but the code uses a.b.c
+            parts = origin.split('.')
+            dependency = next(('.'.join(parts[:index]) for index in range(len(parts), 0, -1)
+                               if '.'.join(parts[:index]) in modules), None)
+            if dependency is not None:
+                dependencies.add(dependency)
+            continue
+        for imported in names:
+            # from a import b, where b is a submodule or a name of a
+            submodule = '{}.{}'.format(origin, imported)
+            dependencies.add(submodule if submodule in modules else origin)
+    return dependencies & modules
+
+
+def dependents(graph, names):
+    """
+    :param graph: dict. imports of each module, by module name
+    :param names: [str]. modules
+    :return: set. the modules and every module importing them, directly
+             or not
+    """
+    importers = collections.defaultdict(set)
+    for name, imports in graph.items():
+        for imported in imports:
+            importers[imported].add(name)
+
+    found = set(names)
+    stack = list(names)
+    while stack:
+        for importer in importers[stack.pop()]:
+            if importer not in found:
+                found.add(importer)
+                stack.append(importer)
+    return found
+
+
+def reload_order(graph, names):
+    """
+    :param graph: dict. imports of each module, by module name
+    :param names: set. modules to order
+    :return: [str]. the modules, each after the modules it imports, by name
+             when they import each other
+    """
+    imports = {name: graph.get(name, set()) & names for name in names}
+    importers = collections.defaultdict(set)
+    for name, imported in imports.items():
+        for dependency in imported:
+            importers[dependency].add(name)
+
+    remaining = {name: len(imported) for name, imported in imports.items()}
+    ready = [name for name, count in remaining.items() if count == 0]
+    heapq.heapify(ready)
+    order = list()
+    while ready:
+        name = heapq.heappop(ready)
+        order.append(name)
+        del remaining[name]
+        for importer in importers[name]:
+            remaining[importer] -= 1
+            if remaining[importer] == 0:
+                heapq.heappush(ready, importer)
+
+    # import cycles, a package usually imports names from its submodules
+    order.extend(sorted(remaining, key=lambda name: (-name.count('.'), name)))
+    return order
+
+
+class HotReloader(object):
+    """
+    Modification tracking and reload of the modules under some folders
+    """
+
+    def __init__(self, roots=None):
+        """
+        Initialization
+
+        :param roots: [str]. folders whose modules are tracked
+        """
+        self.roots = list()
+        self._tracked = dict()
+        self.set_roots(roots or list())
+
+    def set_roots(self, roots):
+        """
+        Track the modules under other folders, from their current state
+
+        :param roots: [str]. folders whose modules are tracked
+        """
+        self.roots = [os.path.join(os.path.normcase(os.path.abspath(root)), '')
+                      for root in roots]
+        self._tracked = dict()
+        self.scan()
+
+    def is_tracked(self, name, path):
+        """
+        :param name: str. module name
+        :param path: str. normalized source file of the module
+        :return: bool. whether the module is under a folder
+        """
+        if name == EDITOR_PACKAGE or name.startswith(EDITOR_PACKAGE + '.'):
+            return False
+        # the launching script cannot be reloaded by name
+        if name == '__main__':
+            return False
+        return any(path.startswith(root) for root in self.roots)
+
+    def tracked(self):
+        """
+        :return: [str]. names of the tracked modules
+        """
+        return sorted(self._tracked)
+
+    def graph(self):
+        """
+        :return: dict. tracked modules imported by each tracked module
+        """
+        modules = set(self._tracked)
+        graph = dict()
+        for name, module in self._tracked.items():
+            if module.imports is None:
+                module = self._tracked[name] = module._replace(
+                    imports=read_imports(name, module.path))
+            graph[name] = resolve_imports(module.imports, modules)
+        return graph
+
+    def _track(self, name, path, stat):
+        self._tracked[name] = TrackedModule(path, stat.st_mtime_ns, stat.st_size, None)
+
+    def scan(self):
+        """
+        Start tracking the modules imported since the last scan
+
+        :return: [str]. tracked modules whose file changed since they were
+                 imported or reloaded
+        """
+        changed = list()
+        if not self.roots:
+            return changed
+
+        for name, module in list(sys.modules.items()):
+            path = module_file(module)
+            if path is None or not self.is_tracked(name, path):
+                continue
+            # e.g. a module run as a script, importlib.reload needs a spec
+            if getattr(module, '__spec__', None) is None:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            known = self._tracked.get(name)
+            if known is None or known.path != path:
+                self._track(name, path, stat)
+            elif (known.mtime, known.size) != (stat.st_mtime_ns, stat.st_size):
+                changed.append(name)
+
+        for name in list(self._tracked):
+            if name not in sys.modules:
+                del self._tracked[name]
+        return changed
+
+    def plan(self):
+        """
+        :return: [str]. modules a reload would reload, in order
+        """
+        changed = self.scan()
+        if not changed:
+            return list()
+        graph = self.graph()
+        return reload_order(graph, dependents(graph, changed))
+
+    def reload(self):
+        """
+        Reload the changed modules and the modules importing them
+
+        A module whose reload raised keeps its previous version, it is
+        reloaded again once its file changes.
+
+        :return: ReloadResult. reloaded modules and errors
+        """
+        start = time.perf_counter()
+        reloaded = list()
+        failed = list()
+        for name in self.plan():
+            module = sys.modules.get(name)
+            if module is None:
+                continue
+            try:
+                importlib.reload(module)
+                reloaded.append(name)
+            except Exception as error:
+                failed.append((name, ''.join(
+                    traceback.format_exception_only(type(error), error)).strip()))
+            finally:
+                try:
+                    self._track(name, self._tracked[name].path,
+                                os.stat(self._tracked[name].path))
+                except OSError:
+                    pass
+        return ReloadResult(reloaded, failed, time.perf_counter() - start)
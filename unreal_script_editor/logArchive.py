@@ -0,0 +1,242 @@
+"""
+On-disk history of the output log entries evicted from memory
+
+Entries are appended to a rotating text file, one line per entry:
+``timestamp<TAB>level<TAB>text``. The history is read back page by page
+through memory-mapped files, without loading it in memory, and the lines
+are indexed from the end of the files as older ones are requested.
+"""
+
+import logging
+import os
+from array import array
+
+from . import logStore
+
+
+LOGGER = logging.getLogger(__name__)
+
+# size (bytes) of a log file before it is rotated
+MAX_BYTES = 32 * 1024 * 1024
+
+# number of rotated log files kept, e.g. output.log.1 ... output.log.5
+BACKUP_COUNT = 5
+
+# bytes of a mapped file read at once when counting or indexing its lines
+CHUNK_BYTES = 4 * 1024 * 1024
+
+
+class LogArchive(object):
+    """
+    Rotating log file receiving evicted entries
+    """
+
+    def __init__(self, path, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT):
+        """
+        Initialization
+
+        :param path: str. path of the current log file
+        :param max_bytes: int. size of the current file before rotating it
+        :param backup_count: int. number of rotated files kept
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+    def files(self):
+        """
+        :return: [str]. existing log files, from the oldest to the newest
+        """
+        paths = ['{}.{}'.format(self.path, i)
+                 for i in range(self.backup_count, 0, -1)]
+        paths.append(self.path)
+        return [path for path in paths if os.path.exists(path)]
+
+    def write(self, records):
+        """
+        Append entries to the current log file
+
+        :param records: iterable. (timestamp, level code, text) of entries
+        """
+        lines = [
+            '{:.3f}\t{}\t{}\n'.format(timestamp, logStore.LEVELS[level], text)
+            for timestamp, level, text in records
+        ]
+        if not lines:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        with open(self.path, 'ab') as f:
+            f.write(''.join(lines).encode(logStore.ENCODING, 'replace'))
+
+        if os.path.getsize(self.path) > self.max_bytes:
+            self.rotate()
+
+    def rotate(self):
+        """
+        Rename the current log file to the first backup, shifting the older
+        backups and deleting the oldest one
+        """
+        try:
+            for i in range(self.backup_count, 0, -1):
+                source = '{}.{}'.format(self.path, i - 1) if i > 1 else self.path
+                target = '{}.{}'.format(self.path, i)
+                if os.path.exists(source):
+                    if os.path.exists(target):
+                        os.remove(target)
+                    os.rename(source, target)
+        except OSError as error:
+            # e.g. a file still mapped by a history view on windows,
+            # rotation is attempted again on the next write
+            LOGGER.warning('could not rotate %s: %s', self.path, error)
+
+
+def count_lines(mapped):
+    """
+    :param mapped: mmap.mmap. mapped log file
+    :return: int. number of complete lines
+    """
+    count = 0
+    for start in range(0, len(mapped), CHUNK_BYTES):
+        count += mapped[start:start + CHUNK_BYTES].count(b'\n')
+    return count
+
+
+class TailIndex(object):
+    """
+    Start offsets of the complete lines of a mapped file, indexed backwards
+    from the end of the file, a chunk at a time, as older lines are requested
+    """
+
+    def __init__(self, mapped, count):
+        """
+        Initialization
+
+        :param mapped: mmap.mmap. mapped log file
+        :param count: int. number of complete lines of the file
+        """
+        self.mapped = mapped
+        self.count = count
+
+        # offsets of the lines from the last one backwards
+        self._starts = array('Q')
+        # end of the part of the file still to index, the line break
+        # of the last complete line
+        self._end = mapped.rfind(b'\n') if count else 0
+
+    def __len__(self):
+        return self.count
+
+    def start(self, line):
+        """
+        :param line: int. line number in the file, 0 is the oldest
+        :return: int. offset of the start of the line
+        """
+        rank = self.count - 1 - line
+        while len(self._starts) <= rank:
+            self.extend()
+        return self._starts[rank]
+
+    def extend(self):
+        """
+        Index the line starts of the chunk preceding the indexed part
+        """
+        low = max(0, self._end - CHUNK_BYTES)
+        chunk = self.mapped[low:self._end]
+        starts = self._starts
+        end = len(chunk)
+        while True:
+            end = chunk.rfind(b'\n', 0, end)
+            if end < 0:
+                break
+            starts.append(low + end + 1)
+
+        self._end = low
+        if not low:
+            starts.append(0)
+
+
+class ArchivePager(object):
+    """
+    Read-only, line addressed view over the archive files
+
+    Each file is memory-mapped and its lines counted, their offsets are only
+    indexed once a line of the file is requested, from the newest lines
+    backwards, and the text of a line is only decoded when it is requested.
+    """
+
+    def __init__(self, paths):
+        """
+        Initialization
+
+        :param paths: [str]. log files, from the oldest to the newest
+        """
+        # only needed to browse the archive, not imported on startup
+        import mmap
+
+        self._files = list()
+        self._maps = list()
+        self._indexes = list()
+        self._starts = list()
+
+        count = 0
+        for path in paths:
+            if not os.path.getsize(path):
+                continue
+
+            f = open(path, 'rb')
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            index = TailIndex(mapped, count_lines(mapped))
+
+            self._files.append(f)
+            self._maps.append(mapped)
+            self._indexes.append(index)
+            self._starts.append(count)
+            count += len(index)
+
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        """
+        Unmap and close every file
+        """
+        for mapped in self._maps:
+            mapped.close()
+        for f in self._files:
+            f.close()
+
+        self._files = list()
+        self._maps = list()
+        self._indexes = list()
+        self._starts = list()
+        self._count = 0
+
+    def line(self, row):
+        """
+        :param row: int. line number over every file, 0 is the oldest
+        :return: (float, int, str). timestamp, level code and text
+        """
+        file_index = len(self._starts) - 1
+        while self._starts[file_index] > row:
+            file_index -= 1
+
+        mapped = self._maps[file_index]
+        start = self._indexes[file_index].start(row - self._starts[file_index])
+        end = mapped.find(b'\n', start)
+
+        fields = mapped[start:end].decode(logStore.ENCODING, 'replace').split('\t', 2)
+        if len(fields) != 3:
+            return 0.0, logStore.REGULAR, fields[-1]
+
+        timestamp, level, text = fields
+        try:
+            timestamp = float(timestamp)
+        except ValueError:
+            timestamp = 0.0
+        return timestamp, logStore.level_code(level), text
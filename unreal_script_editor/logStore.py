@@ -0,0 +1,268 @@
+"""
+Compact, column based storage of the output log entries
+"""
+
+import bisect
+import time
+from array import array
+
+
+# entry levels, the index is the level code stored per entry
+LEVELS = ('regular', 'info', 'warning', 'error')
+REGULAR, INFO, WARNING, ERROR = range(len(LEVELS))
+
+ENCODING = 'utf-8'
+
+# once a cap is exceeded, the oldest entries are evicted down to this
+# fraction of the cap, so evictions happen in batches
+TRIM_RATIO = 0.75
+
+
+def level_code(mtype):
+    """
+    :param mtype: str. message type, e.g. 'info', 'warning' or 'error'
+    :return: int. level code, unknown types are regular
+    """
+    try:
+        return LEVELS.index(mtype)
+    except ValueError:
+        return REGULAR
+
+
+class LogStore(object):
+    """
+    Append-only log, one entry per line
+
+    The entries are stored in array columns: a timestamp, a level code and
+    the byte offset of the line in a single utf-8 buffer where every line
+    is terminated by a line break. Each level also keeps a sorted array of
+    its entry ids, so level filters need no scan.
+
+    The store can be capped in entries and/or bytes, the oldest entries are
+    then evicted to an optional archive (see ``logArchive.LogArchive``).
+    Entry ids are positions in the store, so they shift on eviction.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, archive=None):
+        """
+        Initialization
+
+        :param max_entries: int. maximum number of entries kept in memory
+        :param max_bytes: int. maximum size of the text kept in memory
+        :param archive: logArchive.LogArchive. archive receiving the
+                        evicted entries, they are dropped if None
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.archive = archive
+        # number of entries removed since creation, by which ids shifted
+        self.evicted = 0
+        self._reset()
+
+    def _reset(self):
+        self.timestamps = array('d')
+        self.levels = bytearray()
+        self.offsets = array('Q')
+        self.data = bytearray()
+        self.level_ids = [array('Q') for _ in LEVELS]
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def clear(self):
+        self.evicted += len(self.offsets)
+        self._reset()
+
+    def append(self, message, level=REGULAR, timestamp=None):
+        """
+        Append a message, split into one entry per line
+
+        :param message: str. message
+        :param level: int. level code
+        :param timestamp: float. time of the message, defaults to now
+        :return: int. number of entries added
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        lines = message.split('\n')
+        ids = self.level_ids[level]
+        for line in lines:
+            ids.append(len(self.offsets))
+            self.offsets.append(len(self.data))
+            self.data += line.encode(ENCODING, 'replace')
+            self.data += b'\n'
+
+        count = len(lines)
+        self.timestamps.extend([timestamp] * count)
+        self.levels += bytes([level]) * count
+        return count
+
+    def text(self, entry_id):
+        """
+        :param entry_id: int. entry id
+        :return: str. text of the entry
+        """
+        start = self.offsets[entry_id]
+        if entry_id + 1 < len(self.offsets):
+            end = self.offsets[entry_id + 1] - 1
+        else:
+            end = len(self.data) - 1
+        return self.data[start:end].decode(ENCODING, 'replace')
+
+    def level(self, entry_id):
+        """
+        :param entry_id: int. entry id
+        :return: int. level code of the entry
+        """
+        return self.levels[entry_id]
+
+    def timestamp(self, entry_id):
+        """
+        :param entry_id: int. entry id
+        :return: float. time the entry was logged
+        """
+        return self.timestamps[entry_id]
+
+    def records(self, start, stop):
+        """
+        Iterate over a range of entries
+
+        :param start: int. first entry id
+        :param stop: int. entry id to stop before
+        :return: generator. (timestamp, level code, text) of the entries
+        """
+        for entry_id in range(start, stop):
+            yield self.timestamps[entry_id], self.levels[entry_id], self.text(entry_id)
+
+    def excess(self):
+        """
+        :return: int. number of oldest entries to evict to get back under
+                 the caps, 0 while the caps are respected
+        """
+        count = 0
+        if self.max_entries and len(self.offsets) > self.max_entries:
+            count = len(self.offsets) - int(self.max_entries * TRIM_RATIO)
+        if self.max_bytes and len(self.data) > self.max_bytes:
+            cut = len(self.data) - int(self.max_bytes * TRIM_RATIO)
+            count = max(count, bisect.bisect_left(self.offsets, cut))
+        return min(count, len(self.offsets))
+
+    def evict(self, count):
+        """
+        Remove the oldest entries, writing them to the archive if any
+
+        :param count: int. number of entries to evict
+        """
+        if count <= 0:
+            return
+
+        if self.archive is not None:
+            self.archive.write(self.records(0, count))
+
+        if count < len(self.offsets):
+            cut = self.offsets[count]
+        else:
+            cut = len(self.data)
+
+        self.evicted += count
+        del self.data[:cut]
+        del self.levels[:count]
+        del self.timestamps[:count]
+        self.offsets = array('Q', [offset - cut for offset in self.offsets[count:]])
+        for level, ids in enumerate(self.level_ids):
+            kept = ids[bisect.bisect_left(ids, count):]
+            self.level_ids[level] = array('Q', [i - count for i in kept])
+
+    def search(self, text, levels=None, start=0, case_sensitive=False):
+        """
+        Find the entries containing a substring
+
+        :param text: str. substring to search for, line breaks are ignored
+        :param levels: [int]. level codes to keep, all levels if None
+        :param start: int. first entry id to search from
+        :param case_sensitive: bool. whether the case has to match
+        :return: array. sorted ids of the matching entries
+        """
+        ids = array('Q')
+        needle = text.replace('\n', '')
+        if not needle or start >= len(self.offsets):
+            return ids
+
+        if case_sensitive:
+            data = self.data
+            needle = needle.encode(ENCODING)
+            position = self.offsets[start]
+            line_break = b'\n'
+        else:
+            # decoded to fold the case of any script, not only ascii,
+            # folding keeps the line breaks so the entry ids are unchanged
+            data = self.data[self.offsets[start]:].decode(
+                ENCODING, 'replace').casefold()
+            needle = needle.casefold()
+            position = 0
+            line_break = '\n'
+
+        # entry ids are counted through the line breaks between hits
+        entry_id = start
+        while True:
+            hit = data.find(needle, position)
+            if hit < 0:
+                break
+
+            entry_id += data.count(line_break, position, hit)
+            if levels is None or self.levels[entry_id] in levels:
+                ids.append(entry_id)
+
+            # continue from the next entry
+            position = data.find(line_break, hit) + 1
+            entry_id += 1
+        return ids
+
+
+class LevelView(object):
+    """
+    Rows of a LogStore restricted to some levels
+
+    The view merges the sorted per-level id arrays on demand, looking a row
+    up is a binary search, so switching levels costs nothing.
+    """
+
+    def __init__(self, store, levels):
+        """
+        Initialization
+
+        :param store: LogStore. log storage
+        :param levels: [int]. level codes shown
+        """
+        self._store = store
+        self._arrays = [store.level_ids[level] for level in sorted(set(levels))]
+
+    def __len__(self):
+        return sum(len(ids) for ids in self._arrays)
+
+    def rank(self, entry_id):
+        """
+        :param entry_id: int. entry id
+        :return: int. number of rows showing an entry before the given one
+        """
+        return sum(bisect.bisect_left(ids, entry_id) for ids in self._arrays)
+
+    def __getitem__(self, row):
+        """
+        :param row: int. row within the view
+        :return: int. entry id of the row
+        """
+        if len(self._arrays) == 1:
+            return self._arrays[0][row]
+
+        # smallest id preceded (inclusively) by row + 1 shown entries
+        low, high = 0, len(self._store) - 1
+        while low < high:
+            middle = (low + high) // 2
+            count = sum(bisect.bisect_right(ids, middle) for ids in self._arrays)
+            if count > row:
+                high = middle
+            else:
+                low = middle + 1
+        return low
@@ -2,7 +2,9 @@
 code for the main script editor window
 """
 
-import ast
+import time
+_IMPORT_START = time.perf_counter()
+
 import logging
 import os
 import sys
@@ -16,12 +18,17 @@ except ImportError:
     RUNNING_IN_UNREAL = False
 
 from Qt import QtWidgets, QtCore, QtGui
-from Qt import _loadUi
 
-from . import outputTextWidget
-from .codeEditor import codeEditor
-from .codeEditor.highlighter import pyHighlight
+# the feature modules (completion, search, snapshots, run history, hot
+# reload, profiling and remote execution) are imported at first use
+from . import (batchQueue, batchWidget, codeCache, executor, fileIO, fileWatch,
+               outlineWidget, outputTextWidget, scriptFile, scriptTab, searchWidget,
+               sessionStore, uiCache)
+from .startupTrace import TRACE
+
 
+# seconds spent importing this module and its dependencies
+IMPORT_TIME = time.perf_counter() - _IMPORT_START
 
 LOGGER = logging.getLogger(__name__)
 
@@ -32,12 +39,18 @@ MODULE_PATH = os.path.dirname(os.path.abspath(__file__))
 MODULE_NAME = os.path.basename(MODULE_PATH)
 UI_PATH = os.path.join(MODULE_PATH, 'ui', 'script_editor.ui')
 CONFIG_PATH = os.path.join(MODULE_PATH, 'config.txt')
+SESSION_PATH = fileIO.data_path('session')
+SNAPSHOT_PATH = fileIO.data_path('logs', 'snapshots')
+
+# delay (ms) between the last edit and the background autosave
+AUTOSAVE_DELAY = 2000
 
 ICONS_PATH = os.path.join(MODULE_PATH, 'icons')
 QtCore.QDir.addSearchPath("ICONS", ICONS_PATH)
 
 
-class TabConfig(namedtuple('TabConfig', ['index', 'label', 'active', 'command'])):
+class TabConfig(namedtuple('TabConfig', ['index', 'label', 'active', 'command', 'tab_id',
+                                         'path', 'encoding', 'newline', 'modified'])):
     """
     Dataclass to store python script information in the tabs
 
@@ -46,21 +59,46 @@ class TabConfig(namedtuple('TabConfig', ['index', 'label', 'active', 'command'])
     :param active: bool. whether this tab is set to active (current)
                    only one tab is allowed to be active
     :param command: str. script in the tab
+    :param tab_id: str. unique id of the tab within the session,
+                   a new id is assigned if None
+    :param path: str. file of the tab, None if it has none
+    :param encoding: str. encoding of the file
+    :param newline: str. line ending of the file
+    :param modified: bool. whether the tab has edits not saved to its file
     """
     __slots__ = ()
 
 
+TabConfig.__new__.__defaults__ = (None, None, None, None, False)
+
+
+def new_tool(tool):
+    """
+    :param tool: str. profiling.PROFILE or profiling.MEMORY, None for a
+                 plain run
+    :return: profiling.Profiler or profiling.MemoryTracer. new tool, None
+             for a plain run
+    """
+    if not tool:
+        return None
+    from . import profiling
+    return profiling.new_tool(tool)
+
+
 class ScriptEditorWindow(QtWidgets.QMainWindow):
     """
     Script Editor main window
     """
+    # error of a background session save
+    session_save_failed = QtCore.Signal(str)
 
     def __init__(self, parent=None):
         """
         Initialization
         """
         super(ScriptEditorWindow, self).__init__(parent)
-        _loadUi(UI_PATH, self)
+        with TRACE.phase('ui load'):
+            uiCache.load_ui(UI_PATH, self)
         splitter = QtWidgets.QSplitter()
         splitter.setOrientation(QtCore.Qt.Vertical)
         self.centralwidget.layout().addWidget(splitter)
@@ -68,8 +106,86 @@ class ScriptEditorWindow(QtWidgets.QMainWindow):
         splitter.addWidget(self.ui_log_edit)
         splitter.addWidget(self.ui_tab_widget)
 
+        # symbols of the current tab
+        self.ui_outline = outlineWidget.OutlineWidget()
+        self.ui_outline_dock = QtWidgets.QDockWidget('Outline', self)
+        self.ui_outline_dock.setObjectName('ui_outline_dock')
+        self.ui_outline_dock.setWidget(self.ui_outline)
+        self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self.ui_outline_dock)
+        self.ui_outline_dock.hide()
+        self._symbol_dialog = None
+
+        # find and replace across the tabs
+        self.ui_search = searchWidget.SearchPanel()
+        self.ui_search_dock = QtWidgets.QDockWidget('Find', self)
+        self.ui_search_dock.setObjectName('ui_search_dock')
+        self.ui_search_dock.setWidget(self.ui_search)
+        self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self.ui_search_dock)
+        self.ui_search_dock.hide()
+
+        # scripts run one after another
+        self.ui_batch = batchWidget.BatchPanel()
+        self.ui_batch_dock = QtWidgets.QDockWidget('Batch', self)
+        self.ui_batch_dock.setObjectName('ui_batch_dock')
+        self.ui_batch_dock.setWidget(self.ui_batch)
+        self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self.ui_batch_dock)
+        self.ui_batch_dock.hide()
+        self.batch = None
+
         self.ui_tabs = list()
-        self.ui_tab_highlighters = list()
+
+        # files of the tabs, reloaded when changed by another program
+        self.file_watcher = fileWatch.FileWatcher(self)
+        self.file_watcher.changed.connect(self.on_files_changed)
+
+        # background execution, when running outside Unreal
+        self.execution_mode = executor.THREAD
+        self.execution_timeout = None
+        self.namespace = executor.new_namespace()
+        self.engine = executor.ExecutionEngine(self)
+        self.engine.output.connect(self.ui_log_edit.update_logger)
+        self.engine.finished.connect(self.on_execution_finished)
+
+        self.ui_stop_btn.setIcon(
+            self.style().standardIcon(QtWidgets.QStyle.SP_MediaStop))
+        self.ui_stop_btn.setEnabled(False)
+        self.ui_stop_btn.setVisible(not RUNNING_IN_UNREAL)
+
+        # commands sent to a running Unreal editor, when standalone
+        self.remote = None
+        self.ui_remote_action.setVisible(not RUNNING_IN_UNREAL)
+        self.ui_remote_node_menu.menuAction().setVisible(not RUNNING_IN_UNREAL)
+        self.ui_remote_node_menu.setEnabled(False)
+
+        profile_menu = QtWidgets.QMenu(self.ui_profile_btn)
+        profile_menu.addActions([
+            self.ui_profile_all_action, self.ui_profile_sel_action,
+            self.ui_trace_all_action, self.ui_trace_sel_action])
+        self.ui_profile_btn.setMenu(profile_menu)
+
+        # session persistence, only changed tabs are written
+        self.session = sessionStore.SessionStore(SESSION_PATH)
+        self._dirty_tabs = set()
+        self._autosave_timer = QtCore.QTimer(self)
+        self._autosave_timer.setSingleShot(True)
+        self._autosave_timer.setInterval(AUTOSAVE_DELAY)
+        self._autosave_timer.timeout.connect(self.autosave)
+        self.session_save_failed.connect(self.on_session_save_failed)
+
+        # earlier versions of the tabs, taken with each save
+        self._snapshots = None
+        self._snapshot_dialog = None
+
+        # timing and resources of every run, per tab and source
+        self._run_history = None
+        self._run_source = None
+        self._run_history_dialog = None
+
+        # modules of in-house packages reloaded before a run once changed
+        self.hot_reload = None
+
+        # the unreal api is indexed on the first completion
+        self._completion = None
 
         self.register_traceback()
         self.load_configs()
@@ -77,15 +193,40 @@ class ScriptEditorWindow(QtWidgets.QMainWindow):
         #
         self.ui_run_all_btn.clicked.connect(self.execute)
         self.ui_run_sel_btn.clicked.connect(self.execute_sel)
+        self.ui_stop_btn.clicked.connect(self.cancel_execution)
         self.ui_clear_log_btn.clicked.connect(self.clear_log)
         self.ui_clear_script_btn.clicked.connect(self.clear_script)
         self.ui_clear_both_btn.clicked.connect(self.clear_all)
 
         self.ui_save_action.triggered.connect(self.save_script)
         self.ui_open_action.triggered.connect(self.open_script)
+        self.ui_reset_namespace_action.triggered.connect(self.reset_namespace)
+        self.ui_remote_action.toggled.connect(self.set_remote_execution)
+        self.ui_remote_node_menu.aboutToShow.connect(self.fill_remote_nodes)
+        self.ui_hot_reload_action.toggled.connect(self.set_hot_reload)
+        self.ui_reload_roots_action.triggered.connect(self.edit_reload_roots)
+        for action in (self.ui_profile_all_action, self.ui_profile_sel_action,
+                       self.ui_trace_all_action, self.ui_trace_sel_action):
+            action.triggered.connect(self.execute_profiled)
+        self.ui_batch_tabs_action.triggered.connect(self.run_tabs_batch)
+        self.ui_batch_folder_action.triggered.connect(self.run_folder_batch)
+        self.ui_run_history_action.triggered.connect(self.show_run_history)
+        self.ui_tab_history_action.triggered.connect(self.show_tab_history)
+        self.ui_goto_definition_action.triggered.connect(self.go_to_definition)
+        self.ui_goto_symbol_action.triggered.connect(self.show_symbol_search)
+        self.ui_outline_action.toggled.connect(self.ui_outline_dock.setVisible)
+        self.ui_outline_dock.visibilityChanged.connect(self.ui_outline_action.setChecked)
+        self.ui_outline.symbol_activated.connect(
+            lambda symbol: self.go_to_symbol(self.ui_tab_widget.currentWidget(), symbol))
+        self.ui_find_action.triggered.connect(self.show_search)
+        self.ui_search.search_requested.connect(self.find_all)
+        self.ui_search.replace_requested.connect(self.replace_all)
+        self.ui_search.hit_activated.connect(self.go_to_hit)
 
         self.ui_tab_widget.tabBarClicked.connect(self.add_tab)
         self.ui_tab_widget.tabCloseRequested.connect(self.remove_tab)
+        self.ui_tab_widget.currentChanged.connect(self.activate_tab)
+        self.ui_tab_widget.currentChanged.connect(self.schedule_autosave)
 
     # region Overrides
     def closeEvent(self, event):
@@ -93,6 +234,14 @@ class ScriptEditorWindow(QtWidgets.QMainWindow):
         Override: close the tool automatically saves out the script configs
         """
         self.save_configs()
+        if self._completion is not None:
+            self._completion.save()
+        self.ui_remote_action.setChecked(False)
+        for script_tab in self.script_tabs():
+            if script_tab.loader is not None:
+                script_tab.loader.cancel()
+        if self._snapshots is not None:
+            self._snapshots.wait()
         super(ScriptEditorWindow, self).closeEvent(event)
 
     def register_traceback(self):
@@ -110,37 +259,209 @@ class ScriptEditorWindow(QtWidgets.QMainWindow):
         sys.excepthook = custom_traceback
     # endregion
 
+    # region Features
+    @property
+    def snapshots(self):
+        """
+        :return: snapshotStore.SnapshotStore. history of the tab texts,
+                 opened on first use
+        """
+        if self._snapshots is None:
+            from . import snapshotStore
+            self._snapshots = snapshotStore.SnapshotStore(SNAPSHOT_PATH)
+        return self._snapshots
+
+    @property
+    def run_history(self):
+        """
+        :return: runHistory.RunHistory. records of the runs, opened on
+                 first use
+        """
+        if self._run_history is None:
+            from . import runHistory
+            self._run_history = runHistory.RunHistory()
+        return self._run_history
+
+    def complete(self, document, text):
+        """
+        Completion provider of the code editors, built on the first
+        completion
+
+        :param document: QTextDocument. script document
+        :param text: str. text of the line before the cursor
+        :return: (str, [(str, str)]). partial name being completed and
+                 candidate names and kinds
+        """
+        if self._completion is None:
+            from . import completion
+            self._completion = completion.CompletionProvider()
+        return self._completion(document, text)
+    # endregion
+
     # region Config
     def save_configs(self):
         """
-        Save all current python tabs' config
+        Save all current python tabs' config, waiting for the write
         """
-        configs = list()
-        active_index = self.ui_tab_widget.currentIndex()
+        self._autosave_timer.stop()
+        self.session.wait()
+        entries, texts = self.collect_session()
+        self.take_snapshots(entries, texts)
+        if not self.session.writable:
+            return
+        try:
+            self.session.save(entries, texts)
+        except Exception as error:
+            self.ui_log_edit.update_logger(
+                '# Failed to save the session: {}'.format(error), 'error')
+            return
+        self._dirty_tabs.clear()
 
-        for i in range(self.ui_tab_widget.count()-1):
-            self.ui_tab_widget.setCurrentIndex(i)
-            script_tab = self.ui_tab_widget.currentWidget()
-            label = self.ui_tab_widget.tabText(i)
-            active = active_index == i
+    def autosave(self):
+        """
+        Save the changed python tabs in the background
+        """
+        entries, texts = self.collect_session()
+        self.take_snapshots(entries, texts)
+        if not self.session.writable:
+            return
+        self._dirty_tabs.clear()
+        self.session.save_async(entries, texts).add_done_callback(self.check_session_save)
 
-            config = TabConfig(i, label, active, script_tab.toPlainText())
-            configs.append(config)
+    def check_session_save(self, future):
+        """
+        Called from the save thread, the failure is reported from the GUI thread
 
-        # go back to the previous active tab
-        self.ui_tab_widget.setCurrentIndex(active_index)
+        :param future: concurrent.futures.Future. background save
+        """
+        error = future.exception()
+        if error is not None:
+            self.session_save_failed.emit(str(error))
+
+    def on_session_save_failed(self, message):
+        """
+        Report a background save which failed, the texts are written again
+        with the next save
+
+        :param message: str. error of the save
+        """
+        self.ui_log_edit.update_logger(
+            '# Failed to save the session: {}'.format(message), 'error')
 
-        with open(CONFIG_PATH, 'w') as f:
-            string = [config._asdict() for config in configs]
-            f.write(str(string))
+    def take_snapshots(self, entries, texts):
+        """
+        Add the saved texts to the tab history, in the background
+
+        :param entries: [dict]. tab entries in order
+        :param texts: dict. {tab_id: text} of the changed tabs
+        """
+        labels = {entry['tab_id']: entry['label'] for entry in entries}
+        for tab_id, text in texts.items():
+            if text:
+                self.snapshots.add_async(tab_id, labels.get(tab_id, ''), text)
+
+    def snapshot_tab(self, script_tab, reason):
+        """
+        Add the text of a tab to the tab history, before it is replaced
+
+        :param script_tab: ScriptTab. tab about to change
+        :param reason: str. what replaces the text, e.g. snapshotStore.CLEAR
+        """
+        text = script_tab.toPlainText()
+        if text:
+            label = self.ui_tab_widget.tabText(self.ui_tab_widget.indexOf(script_tab))
+            self.snapshots.add_async(script_tab.tab_id, label, text, reason)
+
+    def schedule_autosave(self):
+        """
+        (Re)start the autosave delay, so bursts of changes are saved once
+        """
+        self._autosave_timer.start()
+
+    def mark_dirty(self, script_tab):
+        """
+        Flag a python tab whose text changed since the last save
+
+        :param script_tab: ScriptTab. changed tab
+        """
+        self._dirty_tabs.add(script_tab.tab_id)
+        self.schedule_autosave()
+
+    def collect_session(self):
+        """
+        Gather the tab entries and the texts of the tabs to write,
+        without switching the current tab
+
+        :return: ([dict], dict). tab entries in order and {tab_id: text}
+        """
+        entries = list()
+        active_index = self.ui_tab_widget.currentIndex()
+        for i in range(self.ui_tab_widget.count()-1):
+            script_tab = self.ui_tab_widget.widget(i)
+            if script_tab.loader is not None:
+                # saved once loaded, a partial file is never saved
+                continue
+            entry = {
+                'tab_id': script_tab.tab_id,
+                'label': self.ui_tab_widget.tabText(i),
+                'active': active_index == i,
+            }
+            if script_tab.path is not None:
+                entry.update({
+                    'path': script_tab.path,
+                    'encoding': script_tab.encoding,
+                    'newline': script_tab.newline,
+                    'modified': script_tab.is_modified(),
+                })
+            entries.append(entry)
+
+        tab_ids = [entry['tab_id'] for entry in entries]
+        write_ids = self._dirty_tabs.union(self.session.missing(tab_ids))
+
+        tabs = {script_tab.tab_id: script_tab for script_tab in self.script_tabs()}
+        texts = dict()
+        for tab_id in tab_ids:
+            if tab_id in write_ids:
+                texts[tab_id] = tabs[tab_id].toPlainText()
+        return entries, texts
 
     def load_configs(self):
         """
-        During startup, load python script config file and initialize tab gui
+        During startup, load python script session and initialize tab gui
         """
-        if not os.path.exists(CONFIG_PATH):
+        if self.session.exists():
+            try:
+                with TRACE.phase('config load'):
+                    tab_configs = [
+                        TabConfig(i, tab['label'], tab['active'], tab['command'],
+                                  tab['tab_id'], tab.get('path'), tab.get('encoding'),
+                                  tab.get('newline'), tab.get('modified', False))
+                        for i, tab in enumerate(self.session.load())
+                    ]
+            except (IOError, OSError, ValueError, KeyError, RuntimeError) as error:
+                LOGGER.exception('failed to load the session, starting empty')
+                tab_configs = None
+                backup = self.session.move_aside()
+                if backup:
+                    message = 'it was moved to {}'.format(backup)
+                else:
+                    message = 'it will not be saved until the editor restarts'
+                self.ui_log_edit.update_logger(
+                    '# Failed to load the session ({}), {}'.format(error, message),
+                    'error')
+
+            self.load_tabs(tab_configs)
+        elif os.path.exists(CONFIG_PATH):
+            self.load_legacy_configs()
+        else:
             self.load_tabs()
-            return
+
+    def load_legacy_configs(self):
+        """
+        Load the tabs saved by older versions as a single config file,
+        they are written to the session on the next save
+        """
+        import ast
 
         with open(CONFIG_PATH, 'r') as f:
             tab_configs = list()
@@ -160,100 +481,768 @@ class ScriptEditorWindow(QtWidgets.QMainWindow):
         if not tab_configs:
             tab_configs = [TabConfig(0, 'Python', True, '')]
 
-        active_index = 0
-        for tab_config in tab_configs:
-            self.insert_tab(tab_config.index, tab_config.command, tab_config.label)
-            if tab_config.active:
-                active_index = tab_config.index
-
-        self.ui_tab_widget.setCurrentIndex(active_index)
-
-    def insert_tab(self, index, command, label):
+        # tabs are restored as text only, the current one is materialized
+        with TRACE.phase('tab creation'):
+            active_index = 0
+            for tab_config in tab_configs:
+                self.insert_tab(tab_config.index, tab_config.command,
+                                tab_config.label, tab_config.tab_id,
+                                activate=False)
+                if tab_config.active:
+                    active_index = tab_config.index
+                if tab_config.path:
+                    script_tab = self.ui_tab_widget.widget(tab_config.index)
+                    script_tab.encoding = tab_config.encoding or script_tab.encoding
+                    script_tab.newline = tab_config.newline
+                    script_tab.set_modified(tab_config.modified)
+                    self.bind_file(script_tab, tab_config.path)
+                    # compared with the restored text
+                    script_tab.file_stat = None
+
+            # the files may have changed while the editor was closed
+            self.file_watcher.schedule(self.file_watcher.paths())
+
+            self.ui_tab_widget.setCurrentIndex(active_index)
+            self.activate_tab(active_index)
+
+    def insert_tab(self, index, command, label, tab_id=None, activate=True):
         """
         Insert a python tab into the tab widget
 
         :param index: int. tab index to insert
         :param command: str. python script command to add to the inserted tab
         :param label: str. title/label of the tab inserted
+        :param tab_id: str. session id of the tab, a new one if None
+        :param activate: bool. whether to set the inserted tab as current
         """
-        script_edit = codeEditor.CodeEditor()
-        script_edit.setPlainText(command)
-        highlight = pyHighlight.PythonHighlighter(
-            script_edit.document())
+        script_tab = scriptTab.ScriptTab(command, tab_id, self.complete)
+        script_tab.changed.connect(self.mark_dirty)
+        script_tab.outline_changed.connect(self.on_outline_changed)
 
-        self.ui_tab_widget.insertTab(index, script_edit, label)
-        self.ui_tab_highlighters.append(highlight)
-        self.ui_tabs.append(script_edit)
+        self.ui_tab_widget.insertTab(index, script_tab, label)
+        self.ui_tabs.append(script_tab)
 
-        self.ui_tab_widget.setCurrentIndex(index)
+        if activate:
+            self.ui_tab_widget.setCurrentIndex(index)
+
+    def activate_tab(self, index):
+        """
+        Build the editor of the current tab and release the editors of
+        the tabs unused for a while
+
+        :param index: int. current tab index
+        """
+        script_tab = self.ui_tab_widget.widget(index)
+        if not isinstance(script_tab, scriptTab.ScriptTab):
+            return
+
+        script_tab.materialize()
+        self.ui_outline.set_outline(script_tab.outline)
+        scriptTab.trim(self.script_tabs(), keep=script_tab)
+
+    def script_tabs(self):
+        """
+        :return: [ScriptTab]. python tabs in order
+        """
+        return [self.ui_tab_widget.widget(i)
+                for i in range(self.ui_tab_widget.count()-1)]
+    # endregion
+
+    # region Navigation
+    def on_outline_changed(self, script_tab):
+        """
+        Refresh the outline panel and the symbol search with the new
+        symbols of a tab
+
+        :param script_tab: ScriptTab. tab whose outline changed
+        """
+        if script_tab is self.ui_tab_widget.currentWidget():
+            self.ui_outline.set_outline(script_tab.outline)
+        if self._symbol_dialog is not None and self._symbol_dialog.isVisible():
+            self._symbol_dialog.set_entries(self.symbol_entries())
+
+    def symbol_entries(self):
+        """
+        :return: [(str, ScriptTab, outline.Symbol)]. tab label, tab and
+                 symbol of the symbols of every tab with an outline
+        """
+        entries = list()
+        for i, script_tab in enumerate(self.script_tabs()):
+            if script_tab.outline is None:
+                continue
+            label = self.ui_tab_widget.tabText(i)
+            entries.extend((label, script_tab, symbol)
+                           for symbol in script_tab.outline.symbols)
+        return entries
+
+    def go_to_symbol(self, script_tab, symbol):
+        """
+        Show the definition of a symbol
+
+        :param script_tab: ScriptTab. tab defining the symbol
+        :param symbol: outline.Symbol. symbol to show
+        """
+        self.ui_tab_widget.setCurrentWidget(script_tab)
+        script_tab.go_to_line(symbol.line)
+
+    def go_to_definition(self):
+        """
+        Jump to the definition of the name under the cursor, looked up in
+        the current tab first, then in the other tabs
+        """
+        current_tab = self.ui_tab_widget.currentWidget()
+        if not isinstance(current_tab, scriptTab.ScriptTab):
+            return
+
+        editor = current_tab.editor()
+        cursor = editor.textCursor()
+        cursor.select(QtGui.QTextCursor.WordUnderCursor)
+        name = cursor.selectedText()
+        if not name:
+            return
+
+        tabs = [current_tab] + [
+            script_tab for script_tab in self.script_tabs()
+            if script_tab is not current_tab]
+        for script_tab in tabs:
+            if script_tab.outline is None:
+                script_tab.request_outline()
+                continue
+
+            line = cursor.blockNumber() if script_tab is current_tab else None
+            symbol = script_tab.outline.definition(name, line)
+            if symbol is not None:
+                self.go_to_symbol(script_tab, symbol)
+                return
+
+        self.ui_log_edit.update_logger(
+            '# No definition found for {}'.format(name), 'warning')
+
+    def show_symbol_search(self):
+        """
+        Open the search of the symbols of every tab, the outline of the
+        tabs not opened yet is parsed in the background
+        """
+        if self._symbol_dialog is None:
+            self._symbol_dialog = outlineWidget.SymbolDialog(self)
+            self._symbol_dialog.symbol_activated.connect(self.go_to_symbol)
+
+        for script_tab in self.script_tabs():
+            script_tab.request_outline()
+
+        self._symbol_dialog.set_entries(self.symbol_entries())
+        self._symbol_dialog.ui_filter_edit.clear()
+        self._symbol_dialog.show()
+        self._symbol_dialog.ui_filter_edit.setFocus()
+    # endregion
+
+    # region Search
+    def show_search(self):
+        """
+        Open the find panel, searching the selection of the current tab
+        """
+        current_tab = self.ui_tab_widget.currentWidget()
+        if isinstance(current_tab, scriptTab.ScriptTab) and current_tab.is_materialized():
+            selection = current_tab.editor().textCursor().selectedText()
+            if selection and scriptTab.codeEditor.PARAGRAPH_SEPARATOR not in selection:
+                self.ui_search.ui_find_edit.setText(selection)
+
+        self.ui_search_dock.show()
+        self.ui_search_dock.raise_()
+        self.ui_search.ui_find_edit.setFocus()
+        self.ui_search.ui_find_edit.selectAll()
+
+    def search_sources(self, include_log=True):
+        """
+        :param include_log: bool. whether to search the output log
+        :return: [search.TextSource or search.LogSource]. every loaded tab,
+                 in order, then the output log
+        """
+        from . import search
+
+        sources = [
+            search.TextSource(script_tab, self.ui_tab_widget.tabText(i),
+                              script_tab.toPlainText)
+            for i, script_tab in enumerate(self.script_tabs())
+            if script_tab.loader is None]
+        if include_log:
+            self.ui_log_edit.flush()
+            sources.append(search.LogSource(
+                self.ui_log_edit, 'Output', self.ui_log_edit.store))
+        return sources
+
+    def find_all(self):
+        """
+        Search every tab, and the output log, in the background
+        """
+        query = self.ui_search.query()
+        if query is None:
+            return
+
+        from . import search
+        task = search.SearchTask(
+            query, self.search_sources(self.ui_search.include_log()), parent=self)
+        task.finished.connect(task.deleteLater)
+        self.ui_search.run(task)
+
+    def replace_all(self):
+        """
+        Replace the matches of every tab, as one undo step per tab
+        """
+        query = self.ui_search.query()
+        if query is None:
+            return
+
+        from . import search
+        task = search.SearchTask(
+            query, self.search_sources(include_log=False),
+            self.ui_search.replacement(), parent=self)
+        task.source_done.connect(lambda source: self.apply_replacements(task, source))
+        task.finished.connect(lambda completed: self.report_replacements(task))
+        task.finished.connect(task.deleteLater)
+        self.ui_search.run(task)
+
+    def apply_replacements(self, task, source):
+        """
+        Replace the matches of a scanned tab
+
+        :param task: search.SearchTask. running replace-all
+        :param source: search.TextSource. scanned tab
+        """
+        hits = task.results[source]
+        if hits and not source.key.replace_hits(source.text, hits):
+            self.ui_log_edit.update_logger(
+                '# {} changed during the replace, skipped'.format(source.label),
+                'warning')
+            del hits[:]
+
+    def report_replacements(self, task):
+        """
+        :param task: search.SearchTask. finished replace-all
+        """
+        replaced = [hits for hits in task.results.values() if hits]
+        self.ui_log_edit.update_logger('# Replaced {} matches in {} tabs'.format(
+            sum(len(hits) for hits in replaced), len(replaced)))
+
+    def go_to_hit(self, source, hit):
+        """
+        Show a search hit
+
+        :param source: search.TextSource or search.LogSource. source of the hit
+        :param hit: search.Hit. hit to show
+        """
+        from . import search
+
+        if isinstance(source, search.LogSource):
+            entry_id = source.entry_id(hit)
+            if entry_id is not None:
+                self.ui_log_edit.show_entry(entry_id)
+            return
+
+        if self.ui_tab_widget.indexOf(source.key) < 0:
+            return
+        self.ui_tab_widget.setCurrentWidget(source.key)
+        source.key.select_text(hit.line, hit.column, hit.length)
     # endregion
 
     # region Execution
-    def execute(self):
+    def execute(self, tool=None):
         """
         Send all command in script area for maya to execute
+
+        :param tool: str. profiling.PROFILE or profiling.MEMORY to run
+                     the command with a profiling tool
         """
         command = self.ui_tab_widget.currentWidget().toPlainText()
-        if RUNNING_IN_UNREAL:
-            output = unreal.PythonScriptLibrary.execute_python_command_ex(
-                python_command=command,
-                execution_mode=unreal.PythonCommandExecutionMode.EXECUTE_FILE,
-                file_execution_scope=unreal.PythonFileExecutionScope.PUBLIC
-            )
+        self.run_command(command, tool)
 
-            if not output:
-                return
+    def execute_sel(self, tool=None):
+        """
+        Send selected command in script area for maya to execute
+
+        :param tool: str. profiling.PROFILE or profiling.MEMORY to run
+                     the command with a profiling tool
+        """
+        script_edit = self.ui_tab_widget.currentWidget().editor()
+        command = script_edit.textCursor().selection().toPlainText()
+        self.run_command(command, tool)
+
+    def execute_profiled(self):
+        """
+        Run the script, or the selection, with the profiling tool of the
+        triggered profile menu action
+        """
+        from . import profiling
+
+        action = self.sender()
+        tool = profiling.PROFILE if action in (
+            self.ui_profile_all_action, self.ui_profile_sel_action) else profiling.MEMORY
+        if action in (self.ui_profile_all_action, self.ui_trace_all_action):
+            self.execute(tool)
+        else:
+            self.execute_sel(tool)
+
+    def run_command(self, command, tool=None):
+        """
+        Execute a command in Unreal, or in the background execution engine
+        when running standalone
+
+        :param command: str. python command to execute
+        :param tool: str. profiling.PROFILE or profiling.MEMORY to run
+                     the command with a profiling tool
+        """
+        if self.batch is not None and self.batch.is_running():
+            self.ui_log_edit.update_logger('# A batch is running', 'warning')
+            return
+
+        standalone = not RUNNING_IN_UNREAL and self.remote is None
+        if standalone and self.engine.is_running():
+            self.ui_log_edit.update_logger(
+                '# A command is already running', 'warning')
+            return
+
+        persistent = self.ui_persistent_action.isChecked()
+        in_process = RUNNING_IN_UNREAL or standalone and (
+            persistent or tool or self.execution_mode != executor.PROCESS)
+        if self.hot_reload is not None and in_process:
+            # a subprocess or a remote editor imports the modules afresh
+            self.reload_modules()
+
+        if RUNNING_IN_UNREAL and (persistent or tool):
+            # profiled within this interpreter, on the game thread
+            self._run_source = self.run_source(command)
+            self.run_inline(command, tool)
+        elif RUNNING_IN_UNREAL:
+            self._run_source = self.run_source(command)
+            result, messages = self.execute_in_unreal(command)
+            self.record_run(result)
+            self.track_modules()
 
             self.ui_log_edit.update_logger(
                 "# Command executed: \n"
                 "{}\n"
                 "# Command execution ended".format(command)
             )
-            self.send_formatted_output(output)
+            for mtype, line in messages:
+                self.ui_log_edit.update_logger(line, mtype)
+        elif self.remote is not None:
+            if tool:
+                self.ui_log_edit.update_logger(
+                    '# Profiled runs are not available in a remote editor', 'warning')
+                return
+            self.run_remote(command)
         else:
-            # todo this wont get any output, fix it
-            output = None
-            exec(command)
+            self.ui_log_edit.update_logger(
+                "# Command executed: \n"
+                "{}".format(command)
+            )
+            self._run_source = self.run_source(command)
+            self.engine.run(
+                command,
+                # a shared namespace and the profiling tools only live
+                # in this interpreter
+                mode=executor.THREAD if persistent or tool else self.execution_mode,
+                timeout=self.execution_timeout,
+                namespace=self.namespace if persistent else None,
+                tool=new_tool(tool)
+            )
+            self.ui_stop_btn.setEnabled(True)
 
-    def execute_sel(self):
+    def execute_in_unreal(self, command):
         """
-        Send selected command in script area for maya to execute
+        Execute a command as a file with the Unreal python library, on
+        the game thread
+
+        :param command: str. python command to execute
+        :return: (executor.ExecutionResult, [(str, str)]). outcome of the
+                 command, and the type and text of its output lines
         """
-        command = self.ui_tab_widget.currentWidget().textCursor().selection().toPlainText()
-        if RUNNING_IN_UNREAL:
-            output = unreal.PythonScriptLibrary.execute_python_command_ex(
-                python_command=command,
-                execution_mode=unreal.PythonCommandExecutionMode.EXECUTE_FILE,
-                file_execution_scope=unreal.PythonFileExecutionScope.PUBLIC
-            )
+        start, start_cpu = time.perf_counter(), time.process_time()
+        start_peak = executor.peak_rss()
+        output = unreal.PythonScriptLibrary.execute_python_command_ex(
+            python_command=command,
+            execution_mode=unreal.PythonCommandExecutionMode.EXECUTE_FILE,
+            file_execution_scope=unreal.PythonFileExecutionScope.PUBLIC
+        )
+        end_peak = executor.peak_rss()
+
+        log_entries = output[1] if output else list()
+        messages = [
+            ('info' if entry.type == unreal.PythonLogOutputType.INFO else 'error',
+             entry.output) for entry in log_entries]
+        errors = sum(1 for mtype, _ in messages if mtype == 'error')
+        result = executor.ExecutionResult(
+            errors == 0, False, False, time.perf_counter() - start,
+            cpu_time=time.process_time() - start_cpu,
+            peak_rss_delta=None if start_peak is None or end_peak is None
+            else end_peak - start_peak,
+            line_count=len(messages), error_line_count=errors)
+        return result, messages
+
+    def run_inline(self, command, tool=None):
+        """
+        Execute a pre-compiled command synchronously on the current (game)
+        thread, in the persistent namespace if enabled
 
-            if not output:
+        :param command: str. python command to execute
+        :param tool: str. profiling.PROFILE or profiling.MEMORY to run
+                     the command with a profiling tool
+        """
+        self.ui_log_edit.update_logger(
+            "# Command executed: \n"
+            "{}".format(command)
+        )
+        namespace = self.namespace if self.ui_persistent_action.isChecked() else None
+        execution = executor.Execution(
+            command, executor.INLINE, namespace,
+            new_tool(tool))
+        execution.start()
+        for mtype, line in execution.messages():
+            self.ui_log_edit.update_logger(line, mtype)
+        self.on_execution_finished(execution.result())
+
+    def set_remote_execution(self, enabled):
+        """
+        Send the commands to a running Unreal editor, rather than run them
+        in the background, when standalone
+
+        :param enabled: bool. whether to execute remotely
+        """
+        if enabled and self.remote is None:
+            from . import remoteExecution
+            remote = remoteExecution.RemoteEngine(parent=self)
+            try:
+                remote.start()
+            except OSError as error:
+                self.ui_log_edit.update_logger(
+                    '# Remote execution unavailable: {}'.format(error), 'error')
+                remote.deleteLater()
+                self.ui_remote_action.setChecked(False)
                 return
+            remote.finished.connect(self.on_remote_finished)
+            self.remote = remote
+        elif not enabled and self.remote is not None:
+            self.remote.stop()
+            self.remote.deleteLater()
+            self.remote = None
+        self.ui_remote_node_menu.setEnabled(self.remote is not None)
+
+    def fill_remote_nodes(self):
+        """
+        List the remote editors found, to choose the one running the commands
+        """
+        menu = self.ui_remote_node_menu
+        menu.clear()
+        if self.remote is None:
+            return
+
+        group = QtWidgets.QActionGroup(menu)
+        for node in [None] + self.remote.nodes():
+            if node is None:
+                node_id, label = None, 'First Found'
+            else:
+                node_id = node['node_id']
+                label = '{} ({})'.format(node.get('project_name'), node.get('machine'))
+            action = menu.addAction(label)
+            action.setCheckable(True)
+            action.setChecked(node_id == self.remote.node_id)
+            action.setActionGroup(group)
+            action.triggered.connect(
+                lambda checked=False, node_id=node_id: self.select_remote_node(node_id))
+
+    def select_remote_node(self, node_id):
+        """
+        :param node_id: str. id of the remote editor running the commands,
+                        the first found if None
+        """
+        if self.remote is not None:
+            self.remote.node_id = node_id
+
+    def run_remote(self, command):
+        """
+        Send a command to the remote editor, the commands sent while it
+        runs are queued on the same connection
+
+        :param command: str. python command to execute
+        """
+        self.ui_log_edit.update_logger(
+            "# Command sent to the remote editor: \n"
+            "{}".format(command)
+        )
+        self.remote.execute(command, self.run_source(command))
+
+    def on_remote_finished(self, run_source, result, messages):
+        """
+        Report the output of a remote command
+
+        :param run_source: (str, str). tab id and hash of the command
+        :param result: executor.ExecutionResult. outcome of the command
+        :param messages: [(str, str)]. type and text of its output lines
+        """
+        for mtype, line in messages:
+            self.ui_log_edit.update_logger(line, mtype)
+        self._run_source = run_source
+        self.on_execution_finished(result)
+
+    def reset_namespace(self):
+        """
+        Discard the variables defined in the persistent namespace
+        """
+        self.namespace = executor.new_namespace()
+        self.ui_log_edit.update_logger('# Persistent namespace reset')
 
+    def cancel_execution(self):
+        """
+        Cancel the command running in the background execution engine
+        """
+        self.engine.cancel()
+
+    def on_execution_finished(self, result):
+        """
+        Report the end of a background execution
+
+        :param result: executor.ExecutionResult. outcome of the command
+        """
+        self.ui_stop_btn.setEnabled(False)
+
+        if result.timed_out:
+            status, mtype = 'timed out', 'error'
+        elif result.cancelled:
+            status, mtype = 'cancelled', 'warning'
+        elif not result.success:
+            status, mtype = 'failed', 'error'
+        else:
+            status, mtype = 'ended', None
+
+        self.ui_log_edit.update_logger(
+            '# Command execution {} ({:.3f}s)'.format(status, result.wall_time),
+            mtype
+        )
+        self.record_run(result)
+        self.track_modules()
+        if result.tool is not None and result.tool.has_result():
+            self.show_report(result.tool)
+
+    def set_hot_reload(self, enabled):
+        """
+        :param enabled: bool. whether to reload the changed modules of the
+                        hot reload folders before a run
+        """
+        if not enabled:
+            self.hot_reload = None
+            return
+
+        from . import hotReload
+
+        roots = hotReload.load_roots()
+        if not roots:
+            roots = self.edit_reload_roots()
+        if not roots:
+            self.ui_hot_reload_action.setChecked(False)
+            return
+        # the modules imported so far are tracked from their current state
+        self.hot_reload = hotReload.HotReloader(roots)
+
+    def edit_reload_roots(self):
+        """
+        Edit the folders whose modules are reloaded when changed
+
+        :return: [str]. folders, None if cancelled
+        """
+        from . import hotReload
+
+        text, accepted = QtWidgets.QInputDialog.getMultiLineText(
+            self, 'Hot Reload Folders',
+            'Folders of the packages to reload when changed, one per line:',
+            '\n'.join(hotReload.load_roots()))
+        if not accepted:
+            return None
+
+        roots = [line.strip() for line in text.splitlines() if line.strip()]
+        try:
+            hotReload.save_roots(roots)
+        except (IOError, OSError):
+            LOGGER.exception('failed to save the hot reload folders')
+        if self.hot_reload is not None:
+            self.hot_reload.set_roots(roots)
+        return roots
+
+    def reload_modules(self):
+        """
+        Reload the changed modules of the hot reload folders, and the
+        modules importing them
+        """
+        result = self.hot_reload.reload()
+        if result.reloaded:
             self.ui_log_edit.update_logger(
-                "# Command executed: \n"
-                "{}\n"
-                "# Command execution ended".format(command)
-            )
-            self.send_formatted_output(output)
+                '# Reloaded {} modules in {:.1f} ms: {}'.format(
+                    len(result.reloaded), result.elapsed * 1000,
+                    ', '.join(result.reloaded)))
+        for name, error in result.failed:
+            self.ui_log_edit.update_logger(
+                '# Failed to reload {}: {}'.format(name, error), 'error')
+
+    def track_modules(self):
+        """
+        Track the modules imported by the last run, so a change made
+        before the next run is reloaded
+        """
+        if self.hot_reload is not None:
+            self.hot_reload.scan()
+
+    def run_source(self, command):
+        """
+        :param command: str. python command about to run
+        :return: (str, str). session id of the current tab and hash of the
+                 command, identifying the run in the history
+        """
+        return self.ui_tab_widget.currentWidget().tab_id, codeCache.source_hash(command)
+
+    def record_run(self, result):
+        """
+        Append a finished run to the history, and warn if it got slower
+        than the previous runs of the same source
+
+        :param result: executor.ExecutionResult. outcome of the command
+        """
+        if self._run_source is None:
+            return
+        tab_id, source_hash = self._run_source
+        self._run_source = None
+
+        if result.timed_out:
+            status = 'timed out'
+        elif result.cancelled:
+            status = 'cancelled'
         else:
-            # todo this wont get any output, fix it
-            output = None
-            exec(command)
+            status = 'ok' if result.success else 'failed'
+
+        from . import runHistory
+        record = runHistory.RunRecord(
+            time.time(), result.wall_time, result.cpu_time,
+            result.peak_rss_delta, result.line_count, result.error_line_count,
+            status, source_hash, tab_id)
+        try:
+            self.run_history.append(record)
+        except (IOError, OSError, RuntimeError):
+            LOGGER.exception('failed to record the run')
+            return
+
+        ratio = runHistory.regression(self.run_history.runs(source_hash=source_hash))
+        if ratio is not None:
+            self.ui_log_edit.update_logger(
+                '# This run took {:.2f}x the median of the previous runs of '
+                'this script'.format(ratio), 'warning')
 
-    def send_formatted_output(self, output):
+    def show_run_history(self):
         """
-        Update ui field with messages
+        Open the statistics of the runs of the current tab
         """
-        if not output:
+        current_tab = self.ui_tab_widget.currentWidget()
+        if not isinstance(current_tab, scriptTab.ScriptTab):
             return
 
-        result, log_entries = output
-        for entry in log_entries:
-            if entry.type != unreal.PythonLogOutputType.INFO:
-                self.ui_log_edit.update_logger(entry.output, 'error')
-            else:
-                self.ui_log_edit.update_logger(entry.output, 'info')
+        if self._run_history_dialog is None:
+            from . import runHistoryWidget
+            self._run_history_dialog = runHistoryWidget.RunHistoryDialog(
+                self.run_history, self)
+        self._run_history_dialog.set_script(
+            current_tab.tab_id, codeCache.source_hash(current_tab.toPlainText()))
+        self._run_history_dialog.show()
+        self._run_history_dialog.raise_()
+
+    def show_tab_history(self):
+        """
+        Open the timeline of the snapshots of the current tab
+        """
+        current_tab = self.ui_tab_widget.currentWidget()
+        if not isinstance(current_tab, scriptTab.ScriptTab):
+            return
+
+        if self._snapshot_dialog is None:
+            from . import snapshotWidget
+            self._snapshot_dialog = snapshotWidget.SnapshotDialog(
+                self.snapshots, self.tab_text, self)
+            self._snapshot_dialog.restore_requested.connect(self.restore_snapshot)
+            self._snapshot_dialog.open_requested.connect(self.open_snapshot)
+        # the pending snapshots are listed too
+        self.snapshots.wait()
+        self._snapshot_dialog.set_tab(current_tab.tab_id)
+        self._snapshot_dialog.show()
+        self._snapshot_dialog.raise_()
+
+    def tab_text(self, tab_id):
+        """
+        :param tab_id: str. session id of a tab
+        :return: str. current text of the tab, None if it is closed
+        """
+        for script_tab in self.script_tabs():
+            if script_tab.tab_id == tab_id:
+                return script_tab.toPlainText()
+        return None
+
+    def restore_snapshot(self, snapshot):
+        """
+        Replace the text of a tab by one of its snapshots, as one undo
+        step, the tab of a closed tab is reopened
+
+        :param snapshot: snapshotStore.Snapshot. version to restore
+        """
+        script_tab = next((script_tab for script_tab in self.script_tabs()
+                           if script_tab.tab_id == snapshot.tab_id), None)
+        if script_tab is None:
+            self.open_snapshot(snapshot)
+            return
+        if script_tab.loader is not None:
+            self.ui_log_edit.update_logger('# The tab is still loading', 'warning')
+            return
+
+        try:
+            text = self.snapshots.text(snapshot)
+        except (IOError, OSError, ValueError) as error:
+            self.ui_log_edit.update_logger(
+                '# Failed to read the snapshot: {}'.format(error), 'error')
+            return
+        from . import snapshotStore
+        self.snapshot_tab(script_tab, snapshotStore.RESTORE)
+        script_tab.replace_text(text)
+        self.ui_tab_widget.setCurrentWidget(script_tab)
+
+    def open_snapshot(self, snapshot):
+        """
+        Open a snapshot in a new tab
+
+        :param snapshot: snapshotStore.Snapshot. version to open
+        """
+        try:
+            text = self.snapshots.text(snapshot)
+        except (IOError, OSError, ValueError) as error:
+            self.ui_log_edit.update_logger(
+                '# Failed to read the snapshot: {}'.format(error), 'error')
+            return
+        label = '{} ({})'.format(
+            snapshot.label, time.strftime('%H:%M', time.localtime(snapshot.timestamp)))
+        self.insert_tab(self.ui_tab_widget.count() - 1, text, label)
+
+    def show_report(self, tool):
+        """
+        Save the raw result of a profiled run and show its report table
+
+        :param tool: profiling.Profiler or profiling.MemoryTracer. tool
+                     which profiled the run
+        """
+        try:
+            report = tool.report()
+        except (IOError, OSError):
+            LOGGER.exception('failed to save the profile')
+            report = tool.report(save=False)
+
+        self.ui_log_edit.update_logger(
+            '# {}: {}{}'.format(
+                report.title, report.summary,
+                ', saved to {}'.format(report.path) if report.path else ''),
+            'info')
+        self.ui_log_edit.show_report(report)
 
     def clear_log(self):
         """
@@ -262,13 +1251,137 @@ class ScriptEditorWindow(QtWidgets.QMainWindow):
         self.ui_log_edit.clear()
 
     def clear_script(self):
-        self.ui_tab_widget.currentWidget().setPlainText('')
+        script_tab = self.ui_tab_widget.currentWidget()
+        from . import snapshotStore
+        self.snapshot_tab(script_tab, snapshotStore.CLEAR)
+        script_tab.setPlainText('')
 
     def clear_all(self):
         self.clear_script()
         self.clear_log()
     # endregion
 
+    # region Batch
+    def run_tabs_batch(self):
+        """
+        Run the chosen tabs one after another
+        """
+        script_tabs = self.script_tabs()
+        labels = [self.ui_tab_widget.tabText(index) for index in range(len(script_tabs))]
+        chosen = batchWidget.pick_items(self, 'Run Tabs in Batch', labels)
+        self.run_batch([
+            batchQueue.BatchItem(labels[index], script_tabs[index].toPlainText,
+                                 script_tabs[index].tab_id)
+            for index in chosen])
+
+    def run_folder_batch(self):
+        """
+        Run the python files of a folder one after another, by name
+        """
+        folder = QtWidgets.QFileDialog.getExistingDirectory(
+            None, "Run Folder in Batch", MODULE_PATH)
+        if not folder:
+            return
+
+        paths = batchQueue.folder_scripts(folder)
+        if not paths:
+            self.ui_log_edit.update_logger(
+                '# No python file in {}'.format(folder), 'warning')
+            return
+        self.run_batch([batchQueue.file_item(path) for path in paths])
+
+    def run_batch(self, items):
+        """
+        Run scripts one after another, in the background when running
+        standalone, in the persistent namespace if enabled
+
+        :param items: [batchQueue.BatchItem]. scripts to run, in order
+        """
+        if not items:
+            return
+        if self.engine.is_running() or (self.batch is not None and self.batch.is_running()):
+            self.ui_log_edit.update_logger(
+                '# A command is already running', 'warning')
+            return
+
+        persistent = self.ui_persistent_action.isChecked()
+        queue = batchQueue.BatchQueue(
+            items,
+            run_sync=self.run_batch_item if RUNNING_IN_UNREAL else None,
+            mode=executor.THREAD if persistent else self.execution_mode,
+            timeout=self.execution_timeout,
+            namespace=self.namespace if persistent else None,
+            stop_on_error=self.ui_batch.stop_on_error(),
+            parent=self)
+        queue.output.connect(self.ui_log_edit.update_logger)
+        queue.item_started.connect(lambda index: self.on_batch_item_started(queue, index))
+        queue.item_finished.connect(lambda index: self.on_batch_item_finished(queue, index))
+        queue.finished.connect(lambda completed: self.on_batch_finished(queue, completed))
+
+        if self.batch is not None:
+            self.batch.deleteLater()
+        self.batch = queue
+        self.ui_batch_dock.show()
+        self.ui_batch_dock.raise_()
+        self.ui_batch.run(queue)
+
+    def run_batch_item(self, command):
+        """
+        Execute a batch item synchronously, on the Unreal game thread
+
+        :param command: str. python command to execute
+        :return: (executor.ExecutionResult, [(str, str)]). outcome of the
+                 command, and the type and text of its output lines
+        """
+        if not self.ui_persistent_action.isChecked():
+            return self.execute_in_unreal(command)
+
+        execution = executor.Execution(command, executor.INLINE, self.namespace)
+        execution.start()
+        messages = execution.messages()
+        return execution.result(), messages
+
+    def on_batch_item_started(self, queue, index):
+        """
+        :param queue: batchQueue.BatchQueue. running batch
+        :param index: int. index of the started item
+        """
+        self.ui_log_edit.update_logger('# Batch {}/{}: {}'.format(
+            index + 1, len(queue.items), queue.items[index].label))
+
+    def on_batch_item_finished(self, queue, index):
+        """
+        Report a finished batch item and record its run
+
+        :param queue: batchQueue.BatchQueue. running batch
+        :param index: int. index of the finished item
+        """
+        item = queue.items[index]
+        mtype = None if item.status == batchQueue.OK else 'error'
+        if item.status == batchQueue.CANCELLED:
+            mtype = 'warning'
+        self.ui_log_edit.update_logger('# {} {} ({:.3f}s)'.format(
+            item.label, item.status, item.result.wall_time), mtype)
+
+        if item.command is not None:
+            self._run_source = item.tab_id, codeCache.source_hash(item.command)
+            self.record_run(item.result)
+
+    def on_batch_finished(self, queue, completed):
+        """
+        :param queue: batchQueue.BatchQueue. finished batch
+        :param completed: bool. whether every item ran
+        """
+        counts = queue.counts()
+        self.ui_log_edit.update_logger(
+            '# Batch {}: {} ok, {} failed, {} skipped ({:.3f}s)'.format(
+                'ended' if completed else 'stopped', counts[batchQueue.OK],
+                counts[batchQueue.FAILED] + counts[batchQueue.TIMED_OUT] +
+                counts[batchQueue.CANCELLED], counts[batchQueue.SKIPPED],
+                queue.elapsed),
+            None if completed and counts[batchQueue.OK] == len(queue.items) else 'warning')
+    # endregion
+
     # region Tab Operation
     def add_tab(self, index):
         """
@@ -293,8 +1406,30 @@ class ScriptEditorWindow(QtWidgets.QMainWindow):
         usr_choice = msg_box.exec()
         if usr_choice == QtWidgets.QMessageBox.Yes:
             if index != self.ui_tab_widget.count() - 1:
-                self.ui_tab_widget.removeTab(index)
-                self.ui_tab_widget.setCurrentIndex(index-1)
+                script_tab = self.ui_tab_widget.widget(index)
+                if script_tab.loader is not None:
+                    script_tab.loader.cancel()
+                else:
+                    from . import snapshotStore
+                    self.snapshot_tab(script_tab, snapshotStore.CLOSE)
+                self.discard_tab(script_tab)
+
+    def discard_tab(self, script_tab):
+        """
+        Remove a python tab without confirmation
+
+        :param script_tab: ScriptTab. tab to remove, ignored if already removed
+        """
+        index = self.ui_tab_widget.indexOf(script_tab)
+        if index < 0:
+            return
+        if script_tab.path is not None:
+            self.file_watcher.unwatch(script_tab.path)
+        self.ui_tab_widget.removeTab(index)
+        self.ui_tabs.remove(script_tab)
+        script_tab.deleteLater()
+        self.ui_tab_widget.setCurrentIndex(index-1)
+        self.schedule_autosave()
     # endregion
 
     # region File IO
@@ -310,29 +1445,152 @@ class ScriptEditorWindow(QtWidgets.QMainWindow):
 
         if not path:
             return
+        self.open_file(path)
+
+    def open_file(self, path):
+        """
+        Stream a python file into a new tab, with a progress dialog and
+        cancel for the files slow to load
 
-        with open(path, 'r') as f:
-            file_name = os.path.basename(path)
-            output = f.read()
-            index = self.ui_tab_widget.count() - 1
-            self.insert_tab(index, output, file_name)
+        :param path: str. script file
+        """
+        loader = scriptFile.ScriptLoader(path, self)
+        try:
+            loader.start()
+        except (IOError, OSError) as error:
+            self.ui_log_edit.update_logger(
+                '# Failed to open {}: {}'.format(path, error), 'error')
+            loader.deleteLater()
+            return
+
+        index = self.ui_tab_widget.count() - 1
+        file_name = os.path.basename(path)
+        self.insert_tab(index, '', file_name, activate=False)
+        script_tab = self.ui_tab_widget.widget(index)
+        script_tab.load(loader)
+        self.ui_tab_widget.setCurrentIndex(index)
+
+        # only shown if the file takes a while
+        progress = QtWidgets.QProgressDialog(
+            'Opening {}...'.format(file_name), 'Cancel', 0, 1000, self)
+        progress.setWindowTitle('Open Script')
+        progress.setMinimumDuration(500)
+        progress.setAutoReset(False)
+        progress.canceled.connect(loader.cancel)
+        loader.progress.connect(lambda fraction: progress.setValue(int(fraction * 1000)))
+        loader.finished.connect(
+            lambda completed: self.on_file_loaded(script_tab, loader, progress, completed))
+
+    def on_file_loaded(self, script_tab, loader, progress, completed):
+        """
+        :param script_tab: ScriptTab. tab the file was loaded into
+        :param loader: scriptFile.ScriptLoader. finished load
+        :param progress: QProgressDialog. progress of the load
+        :param completed: bool. whether the whole file was loaded
+        """
+        progress.canceled.disconnect(loader.cancel)
+        progress.deleteLater()
+        loader.deleteLater()
+        if loader.error:
+            self.ui_log_edit.update_logger(
+                '# Failed to open {}: {}'.format(loader.path, loader.error), 'error')
+        if not completed:
+            self.discard_tab(script_tab)
+        else:
+            self.bind_file(script_tab, loader.path)
 
     def save_script(self):
         """
         Save script edit area as a python file
         """
+        script_tab = self.ui_tab_widget.currentWidget()
+        if script_tab.loader is not None:
+            self.ui_log_edit.update_logger('# The tab is still loading', 'warning')
+            return
+
         path = QtWidgets.QFileDialog.getSaveFileName(
             None,
             "Save Script As...",
-            MODULE_PATH,
+            script_tab.path or MODULE_PATH,
             filter="*.py")[0]
 
         if not path:
             return
 
-        command = self.ui_tab_widget.currentWidget().toPlainText()
-        with open(path, 'w') as f:
-            f.write(command)
+        try:
+            scriptFile.write_script(
+                path, script_tab.toPlainText(), script_tab.encoding, script_tab.newline)
+        except (IOError, OSError, UnicodeEncodeError) as error:
+            self.ui_log_edit.update_logger(
+                '# Failed to save {}: {}'.format(path, error), 'error')
+            return
+
+        script_tab.set_modified(False)
+        self.bind_file(script_tab, path)
+        self.ui_tab_widget.setTabText(
+            self.ui_tab_widget.indexOf(script_tab), os.path.basename(path))
+        self.schedule_autosave()
+
+    def bind_file(self, script_tab, path):
+        """
+        Link a tab to its file, watched for changes made by other programs
+
+        :param script_tab: ScriptTab. tab showing the file
+        :param path: str. script file
+        """
+        path = os.path.abspath(path)
+        if script_tab.path is not None:
+            self.file_watcher.unwatch(script_tab.path)
+        script_tab.path = path
+        script_tab.file_stat = fileWatch.file_stat(path)
+        self.file_watcher.watch(path)
+
+    def on_files_changed(self, paths):
+        """
+        :param paths: [str]. normalized paths of the files changed on disk
+        """
+        paths = set(paths)
+        for script_tab in self.script_tabs():
+            if script_tab.path is not None and script_tab.loader is None and \
+                    fileWatch.normalize(script_tab.path) in paths:
+                self.reload_file(script_tab)
+
+    def reload_file(self, script_tab):
+        """
+        Apply the changes of a tab file to the tab, unless the tab has
+        edits of its own
+
+        :param script_tab: ScriptTab. tab showing the file
+        """
+        stat = fileWatch.file_stat(script_tab.path)
+        if stat is not None and stat == script_tab.file_stat:
+            # e.g. saved by the editor itself
+            return
+        script_tab.file_stat = stat
+        label = self.ui_tab_widget.tabText(self.ui_tab_widget.indexOf(script_tab))
+
+        try:
+            text, encoding, newline = scriptFile.read_script(script_tab.path)
+        except (IOError, OSError):
+            self.ui_log_edit.update_logger(
+                '# {} was removed from disk, its tab is kept'.format(script_tab.path),
+                'warning')
+            return
+
+        if text == script_tab.toPlainText():
+            script_tab.set_modified(False)
+        elif script_tab.is_modified():
+            self.ui_log_edit.update_logger(
+                '# {} changed on disk, the unsaved edits of tab {} are kept'.format(
+                    script_tab.path, label), 'warning')
+            return
+        else:
+            from . import snapshotStore
+            self.snapshot_tab(script_tab, snapshotStore.RELOAD)
+            script_tab.reload_text(text)
+            self.ui_log_edit.update_logger('# Reloaded {} from disk'.format(label))
+        script_tab.encoding = encoding
+        script_tab.newline = newline
     # endregion
 
 
@@ -340,19 +1598,34 @@ def show():
     global APP
     global WINDOW
 
-    APP = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
-
-    try:
-        import unreal_stylesheet
-        unreal_stylesheet.setup()
-    except ImportError:
-        LOGGER.warning("unreal_stylesheet module not found, "
-                       "please run `pip install unreal-stylesheet`")
-
     # handles existing instance
-    WINDOW = WINDOW or ScriptEditorWindow()
-    WINDOW.show()
-
+    if WINDOW:
+        WINDOW.show()
+    else:
+        TRACE.start()
+        TRACE.add('imports', IMPORT_TIME)
+
+        with TRACE.phase('application'):
+            APP = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+        # the stylesheet is application wide, it is applied once
+        with TRACE.phase('stylesheet'):
+            try:
+                import unreal_stylesheet
+                unreal_stylesheet.setup()
+            except ImportError:
+                LOGGER.warning("unreal_stylesheet module not found, "
+                               "please run `pip install unreal-stylesheet`")
+
+        with TRACE.phase('window'):
+            WINDOW = ScriptEditorWindow()
+        with TRACE.phase('show'):
+            WINDOW.show()
+
+        TRACE.stop()
+        TRACE.log()
+
+    # an existing window is parented to slate again too, e.g. once reopened
     if RUNNING_IN_UNREAL:
         unreal.parent_external_window_to_slate(int(WINDOW.winId()))
 
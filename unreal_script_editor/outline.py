@@ -0,0 +1,229 @@
+"""
+Symbol outline of the scripts: classes, functions and top-level assignments
+
+A script is split into its top-level statements, each parsed on its own
+and cached by its text, so a refresh after an edit only parses the
+statements that changed, and the worker thread parsing it releases the
+GIL between statements. A statement which does not parse is merged with
+the next ones (e.g. a bracket spanning column 0 lines), or skipped if it
+is invalid, so a typo does not empty the outline.
+"""
+
+import ast
+import collections
+import threading
+
+from .codeEditor import symbolIndex
+
+
+# maximum number of cached top-level statements
+MAX_CHUNKS = 20000
+
+# maximum number of statements merged with one which does not parse
+MAX_MERGE = 8
+
+TRIPLE_QUOTES = ('"""', "'''")
+
+# column 0 lines continuing the previous statement
+CONTINUATIONS = ('else', 'elif', 'except', 'finally', ')', ']', '}')
+
+_CHUNKS = collections.OrderedDict()
+_CHUNKS_LOCK = threading.Lock()
+
+
+class Symbol(collections.namedtuple(
+        'Symbol', ['name', 'qualname', 'kind', 'line'])):
+    """
+    Definition found in a script
+
+    :param name: str. defined name
+    :param qualname: str. dotted name within the script, e.g. 'Class.method'
+    :param kind: str. symbolIndex kind, CLASS, FUNCTION or VARIABLE
+    :param line: int. line (block) number of the definition, 0 based
+    """
+    __slots__ = ()
+
+
+class Outline(object):
+    """
+    Symbols of a script, indexed by name
+    """
+
+    def __init__(self, symbols):
+        """
+        Initialization
+
+        :param symbols: [Symbol]. symbols in line order
+        """
+        self.symbols = list(symbols)
+        self.by_name = dict()
+        for symbol in self.symbols:
+            self.by_name.setdefault(symbol.name, list()).append(symbol)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __eq__(self, other):
+        return isinstance(other, Outline) and self.symbols == other.symbols
+
+    def __ne__(self, other):
+        return not self == other
+
+    def definition(self, name, line=None):
+        """
+        :param name: str. defined name
+        :param line: int. line the name is used at, the closest definition
+                     above it is preferred
+        :return: Symbol. definition of the name, None if not defined
+        """
+        symbols = self.by_name.get(name)
+        if not symbols:
+            return None
+        if line is not None:
+            above = [symbol for symbol in symbols if symbol.line <= line]
+            if above:
+                return above[-1]
+        return symbols[0]
+
+
+def triple_quote(line, quote=None):
+    """
+    Track the triple quoted strings of a line, approximately: quotes in
+    comments or other strings are not ignored
+
+    :param line: str. script line
+    :param quote: str. delimiter of the string open before the line
+    :return: str. delimiter of the string still open after the line
+    """
+    position = 0
+    while True:
+        if quote is None:
+            found = [(line.find(delimiter, position), delimiter)
+                     for delimiter in TRIPLE_QUOTES]
+            found = [(index, delimiter) for index, delimiter in found if index >= 0]
+            if not found:
+                return None
+            position, quote = min(found)
+        else:
+            position = line.find(quote, position)
+            if position < 0:
+                return quote
+            quote = None
+        position += 3
+
+
+def split_statements(lines):
+    """
+    Split a script into its top-level statements
+
+    :param lines: [str]. script lines
+    :return: [(int, int)]. start and end line of each statement
+    """
+    chunks = list()
+    start = 0
+    decorated = False
+    quote = None
+    for number, line in enumerate(lines):
+        in_string = quote is not None
+        if '"""' in line or "'''" in line:
+            quote = triple_quote(line, quote)
+
+        if in_string or not line or line[0] in ' \t#' or \
+                line.startswith(CONTINUATIONS):
+            continue
+        # a decorator starts the statement of its definition
+        if number > start and not decorated:
+            chunks.append((start, number))
+            start = number
+        decorated = line.startswith('@')
+    chunks.append((start, len(lines)))
+    return chunks
+
+
+def node_symbols(nodes, prefix='', top=True):
+    """
+    Collect the symbols defined by ast nodes
+
+    :param nodes: [ast.AST]. statements
+    :param prefix: str. qualified name of their owner, with a trailing dot
+    :param top: bool. whether the statements are at the script top-level,
+                only their assignments are collected
+    :return: [(str, str, str, int)]. name, qualname, kind and 1 based line
+    """
+    symbols = list()
+    for node in nodes:
+        if isinstance(node, ast.ClassDef):
+            qualname = prefix + node.name
+            symbols.append((node.name, qualname, symbolIndex.CLASS, node.lineno))
+            symbols.extend(node_symbols(node.body, qualname + '.', False))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            qualname = prefix + node.name
+            symbols.append((node.name, qualname, symbolIndex.FUNCTION, node.lineno))
+            symbols.extend(node_symbols(node.body, qualname + '.', False))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)) and top:
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                names = target.elts if isinstance(target, ast.Tuple) else [target]
+                for name in names:
+                    if isinstance(name, ast.Name):
+                        symbols.append((name.id, prefix + name.id,
+                                        symbolIndex.VARIABLE, node.lineno))
+        elif isinstance(node, (ast.If, ast.For, ast.While, ast.With, ast.Try)):
+            # e.g. definitions under 'if __name__' or 'try: import'
+            for field in ('body', 'orelse', 'finalbody'):
+                symbols.extend(node_symbols(getattr(node, field, []), prefix, top))
+            for handler in getattr(node, 'handlers', []):
+                symbols.extend(node_symbols(handler.body, prefix, top))
+    return symbols
+
+
+def statement_symbols(text):
+    """
+    Get the symbols of a top-level statement, cached by its text
+
+    :param text: str. statement source
+    :return: [(str, str, str, int)]. symbols, None if it does not parse
+    """
+    with _CHUNKS_LOCK:
+        if text in _CHUNKS:
+            _CHUNKS.move_to_end(text)
+            return _CHUNKS[text]
+
+    try:
+        symbols = node_symbols(ast.parse(text).body)
+    except (SyntaxError, ValueError):
+        symbols = None
+
+    with _CHUNKS_LOCK:
+        _CHUNKS[text] = symbols
+        while len(_CHUNKS) > MAX_CHUNKS:
+            _CHUNKS.popitem(last=False)
+    return symbols
+
+
+def parse_symbols(source):
+    """
+    Get the symbols of a script
+
+    :param source: str. python source
+    :return: [Symbol]. symbols in line order, those of the statements
+             which do not parse are missing
+    """
+    lines = source.split('\n')
+    chunks = split_statements(lines)
+    symbols = list()
+    index = 0
+    while index < len(chunks):
+        start = chunks[index][0]
+        for merged in range(index, min(index + MAX_MERGE, len(chunks))):
+            end = chunks[merged][1]
+            chunk = statement_symbols('\n'.join(lines[start:end]))
+            if chunk is not None:
+                symbols.extend(Symbol(name, qualname, kind, start + line - 1)
+                               for name, qualname, kind, line in chunk)
+                index = merged + 1
+                break
+        else:
+            # an invalid statement, e.g. being typed
+            index += 1
+    return symbols
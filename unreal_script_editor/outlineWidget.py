@@ -0,0 +1,167 @@
+"""
+Outline panel of the current tab and symbol search across all tabs
+"""
+
+from Qt import QtWidgets, QtCore
+
+from .codeEditor import symbolIndex
+
+
+# role storing the symbol index of an item
+SYMBOL_ROLE = QtCore.Qt.UserRole
+
+KIND_PREFIXES = {
+    symbolIndex.CLASS: 'class ',
+    symbolIndex.FUNCTION: 'def ',
+    symbolIndex.VARIABLE: '',
+}
+
+# maximum number of symbols listed by the symbol search
+SEARCH_LIMIT = 500
+
+
+class OutlineWidget(QtWidgets.QTreeWidget):
+    """
+    Tree of the classes, functions and assignments of a script
+    """
+    symbol_activated = QtCore.Signal(object)
+
+    def __init__(self, parent=None):
+        """
+        Initialization
+        """
+        super(OutlineWidget, self).__init__(parent)
+        self.setHeaderHidden(True)
+        self.setUniformRowHeights(True)
+        self.outline = None
+        # qualnames of the collapsed items, kept across refreshes
+        self._collapsed = set()
+
+        self.itemActivated.connect(self.on_item_activated)
+        self.itemClicked.connect(self.on_item_activated)
+        self.itemCollapsed.connect(
+            lambda item: self._collapsed.add(self.symbol(item).qualname))
+        self.itemExpanded.connect(
+            lambda item: self._collapsed.discard(self.symbol(item).qualname))
+
+    def symbol(self, item):
+        """
+        :param item: QTreeWidgetItem. tree item
+        :return: outline.Symbol. symbol of the item
+        """
+        return self.outline.symbols[item.data(0, SYMBOL_ROLE)]
+
+    def set_outline(self, outline):
+        """
+        Show the symbols of a script
+
+        :param outline: outline.Outline. symbols of the script, None to
+                        clear the tree
+        """
+        if outline is self.outline:
+            return
+        self.outline = outline
+
+        self.setUpdatesEnabled(False)
+        self.blockSignals(True)
+        self.clear()
+        items = dict()
+        for index, symbol in enumerate(outline.symbols if outline else list()):
+            item = QtWidgets.QTreeWidgetItem(
+                [KIND_PREFIXES.get(symbol.kind, '') + symbol.name])
+            item.setData(0, SYMBOL_ROLE, index)
+            item.setToolTip(0, '{} (line {})'.format(symbol.qualname, symbol.line + 1))
+
+            parent = items.get(symbol.qualname.rpartition('.')[0])
+            if parent is None:
+                self.addTopLevelItem(item)
+            else:
+                parent.addChild(item)
+            items[symbol.qualname] = item
+
+        for qualname, item in items.items():
+            if item.childCount():
+                item.setExpanded(qualname not in self._collapsed)
+        self.blockSignals(False)
+        self.setUpdatesEnabled(True)
+
+    def on_item_activated(self, item):
+        self.symbol_activated.emit(self.symbol(item))
+
+
+class SymbolDialog(QtWidgets.QDialog):
+    """
+    Search of the symbols of every tab, by name
+    """
+    symbol_activated = QtCore.Signal(object, object)
+
+    def __init__(self, parent=None):
+        """
+        Initialization
+        """
+        super(SymbolDialog, self).__init__(parent)
+        self.setWindowTitle('Go to Symbol')
+        self.resize(480, 360)
+
+        self.ui_filter_edit = QtWidgets.QLineEdit()
+        self.ui_filter_edit.setPlaceholderText('symbol name')
+        self.ui_symbol_list = QtWidgets.QListWidget()
+        self.ui_symbol_list.setUniformItemSizes(True)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self.ui_filter_edit)
+        layout.addWidget(self.ui_symbol_list)
+
+        # [(tab label, tab, symbol)]
+        self.entries = list()
+        self._matches = list()
+
+        self.ui_filter_edit.textChanged.connect(self.refresh)
+        self.ui_filter_edit.returnPressed.connect(self.activate_current)
+        self.ui_symbol_list.itemActivated.connect(self.activate_item)
+
+    def set_entries(self, entries):
+        """
+        :param entries: [(str, object, outline.Symbol)]. tab label, tab and
+                        symbol of every searchable symbol
+        """
+        self.entries = entries
+        self.refresh()
+
+    def refresh(self):
+        """
+        List the symbols matching the filter, the names starting with it
+        first
+        """
+        query = self.ui_filter_edit.text().lower()
+        matches = [entry for entry in self.entries
+                   if query in entry[2].qualname.lower()]
+        matches.sort(key=lambda entry: (
+            not entry[2].name.lower().startswith(query), entry[2].name.lower()))
+
+        self.ui_symbol_list.clear()
+        for index, (label, _, symbol) in enumerate(matches[:SEARCH_LIMIT]):
+            item = QtWidgets.QListWidgetItem(
+                '{}    {}:{}'.format(symbol.qualname, label, symbol.line + 1))
+            item.setData(SYMBOL_ROLE, index)
+            self.ui_symbol_list.addItem(item)
+        self._matches = matches
+        if matches:
+            self.ui_symbol_list.setCurrentRow(0)
+
+    def activate_current(self):
+        item = self.ui_symbol_list.currentItem()
+        if item is not None:
+            self.activate_item(item)
+
+    def activate_item(self, item):
+        _, tab, symbol = self._matches[item.data(SYMBOL_ROLE)]
+        self.accept()
+        self.symbol_activated.emit(tab, symbol)
+
+    def keyPressEvent(self, event):
+        # browse the list while typing in the filter
+        if event.key() in (QtCore.Qt.Key_Up, QtCore.Qt.Key_Down):
+            QtWidgets.QApplication.sendEvent(self.ui_symbol_list, event)
+            return
+        super(SymbolDialog, self).keyPressEvent(event)
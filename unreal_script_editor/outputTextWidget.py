@@ -2,15 +2,26 @@
 code for the main output text widget
 """
 
+import bisect
+import html
 import os
+import time
+from array import array
 
 from Qt import QtWidgets, QtCore, QtGui
-from Qt import _loadUi
+
+from . import fileIO, logArchive, logStore, reportTable, uiCache
+from .startupTrace import TRACE
 
 
 MODULE_PATH = os.path.dirname(os.path.abspath(__file__))
 MODULE_NAME = os.path.basename(MODULE_PATH)
 UI_PATH = os.path.join(MODULE_PATH, 'ui', 'output_text_widget.ui')
+ARCHIVE_PATH = fileIO.data_path('logs', 'output.log')
+
+# in-memory scrollback caps, older lines are moved to the archive
+SCROLLBACK_LINES = 200000
+SCROLLBACK_BYTES = 32 * 1024 * 1024
 
 # display text formatting
 ERROR_FORMAT = QtGui.QTextCharFormat()
@@ -25,55 +36,638 @@ INFO_FORMAT.setForeground(QtGui.QBrush(QtGui.QColor('#6897bb')))
 REGULAR_FORMAT = QtGui.QTextCharFormat()
 REGULAR_FORMAT.setForeground(QtGui.QBrush(QtGui.QColor(200, 200, 200)))
 
+LEVEL_FORMATS = {
+    'info': INFO_FORMAT,
+    'warning': WARNING_FORMAT,
+    'error': ERROR_FORMAT,
+}
+
+# text colour per level code of logStore.LEVELS
+LEVEL_BRUSHES = [
+    REGULAR_FORMAT.foreground(),
+    INFO_FORMAT.foreground(),
+    WARNING_FORMAT.foreground(),
+    ERROR_FORMAT.foreground(),
+]
+
+# html of the entries logged as html, None for the plain entries
+HTML_ROLE = QtCore.Qt.UserRole + 1
+
+# line break within a block of a QTextDocument, e.g. from a <br>
+LINE_SEPARATOR = u'\u2028'
+
+# delay (ms) before queued messages are written to the display
+FLUSH_INTERVAL = 30
+
+# delay (ms) between the last filter keystroke and the filtering
+FILTER_DELAY = 150
+
+
+def format_style(char_format):
+    """
+    :param char_format: QTextCharFormat. format of a span of text
+    :return: str. css of the colours and the font style set by the format
+    """
+    styles = list()
+    if char_format.hasProperty(QtGui.QTextFormat.ForegroundBrush):
+        styles.append('color:{}'.format(char_format.foreground().color().name()))
+    if char_format.hasProperty(QtGui.QTextFormat.BackgroundBrush):
+        styles.append('background-color:{}'.format(
+            char_format.background().color().name()))
+    font = char_format.font()
+    if font.bold():
+        styles.append('font-weight:bold')
+    if font.italic():
+        styles.append('font-style:italic')
+    if font.underline():
+        styles.append('text-decoration:underline')
+    return ';'.join(styles)
+
+
+def html_lines(message):
+    """
+    Split an html message into lines, keeping the colours and the font
+    style of their text
+
+    :param message: str. message as html
+    :return: [(str, str)]. plain text and html of each line
+    """
+    document = QtGui.QTextDocument()
+    document.setHtml(message)
+
+    lines = list()
+    block = document.begin()
+    while block.isValid():
+        # the format ranges count utf-16 code units
+        units = block.text().encode('utf-16-le', 'surrogatepass')
+        ranges = [(format_range.start, format_range.start + format_range.length,
+                   format_style(format_range.format))
+                  for format_range in block.textFormats()]
+
+        start = 0
+        for line in block.text().split(LINE_SEPARATOR):
+            end = start + len(line.encode('utf-16-le', 'surrogatepass')) // 2
+            pieces = list()
+            for range_start, range_end, style in ranges:
+                text = units[2 * max(start, range_start):2 * min(end, range_end)].decode(
+                    'utf-16-le', 'surrogatepass')
+                if not text:
+                    continue
+                # the spaces of a log line are kept as is
+                text = html.escape(text, quote=False).replace(' ', '&nbsp;')
+                pieces.append('<span style="{}">{}</span>'.format(style, text)
+                              if style else text)
+            lines.append((line, ''.join(pieces)))
+            start = end + 1
+        block = block.next()
+    return lines
+
+
+class LogDelegate(QtWidgets.QStyledItemDelegate):
+    """
+    Draw the entries logged as html with their formatting, and the plain
+    entries as usual
+    """
+
+    def paint(self, painter, option, index):
+        """
+        Override: render the html of the entry, if any
+        """
+        line_html = index.data(HTML_ROLE)
+        if line_html is None:
+            super(LogDelegate, self).paint(painter, option, index)
+            return
+
+        option = QtWidgets.QStyleOptionViewItem(option)
+        self.initStyleOption(option, index)
+        option.text = ''
+        widget = option.widget
+        style = widget.style() if widget else QtWidgets.QApplication.style()
+        # background and selection
+        style.drawControl(QtWidgets.QStyle.CE_ItemViewItem, option, painter, widget)
+
+        document = QtGui.QTextDocument()
+        document.setDefaultFont(option.font)
+        document.setDocumentMargin(0)
+        document.setHtml(line_html)
+
+        # the spans without colour take the colour of the entry level
+        palette = QtGui.QPalette(option.palette)
+        if option.state & QtWidgets.QStyle.State_Selected:
+            palette.setColor(QtGui.QPalette.Text,
+                             option.palette.color(QtGui.QPalette.HighlightedText))
+        context = QtGui.QAbstractTextDocumentLayout.PaintContext()
+        context.palette = palette
+
+        rect = style.subElementRect(
+            QtWidgets.QStyle.SE_ItemViewItemText, option, widget)
+        painter.save()
+        painter.translate(
+            rect.left(), rect.top() + (rect.height() - document.size().height()) / 2)
+        painter.setClipRect(QtCore.QRectF(0, 0, rect.width(), document.size().height()))
+        document.documentLayout().draw(painter, context)
+        painter.restore()
+
+
+class LogModel(QtCore.QAbstractListModel):
+    """
+    List model exposing the entries of a LogStore, one row per line,
+    optionally filtered by level and substring
+    """
+
+    def __init__(self, store, parent=None):
+        """
+        Initialization
+
+        :param store: logStore.LogStore. log storage
+        """
+        super(LogModel, self).__init__(parent)
+        self._store = store
+        self._levels = set(range(len(logStore.LEVELS)))
+        self._text = ''
+
+        # maps rows to entry ids, None when every entry is shown
+        self._view = None
+        self._count = 0
+
+        # {entry id + evicted count: html} of the entries logged as html
+        self._html = dict()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        """
+        Override: number of shown entries
+        """
+        if parent.isValid():
+            return 0
+        return self._count
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        """
+        Override: entry text, colour and timestamp
+        """
+        if not index.isValid():
+            return None
+
+        entry_id = self.entry_id(index.row())
+        if role == QtCore.Qt.DisplayRole:
+            return self._store.text(entry_id)
+        elif role == QtCore.Qt.ForegroundRole:
+            return LEVEL_BRUSHES[self._store.level(entry_id)]
+        elif role == QtCore.Qt.ToolTipRole:
+            return time.strftime(
+                '%Y-%m-%d %H:%M:%S',
+                time.localtime(self._store.timestamp(entry_id)))
+        elif role == HTML_ROLE:
+            if not self._html:
+                return None
+            return self._html.get(self._store.evicted + entry_id)
+        return None
+
+    def entry_id(self, row):
+        """
+        :param row: int. model row
+        :return: int. id of the entry shown on the row
+        """
+        if self._view is None:
+            return row
+        return self._view[row]
+
+    def row(self, entry_id):
+        """
+        :param entry_id: int. entry id
+        :return: int. model row showing the entry, None if filtered out
+        """
+        if self._view is None:
+            return entry_id if entry_id < self._count else None
+        if isinstance(self._view, logStore.LevelView):
+            if self._store.level(entry_id) not in self._levels:
+                return None
+            return self._view.rank(entry_id)
+
+        row = bisect.bisect_left(self._view, entry_id)
+        if row < len(self._view) and self._view[row] == entry_id:
+            return row
+        return None
+
+    def build_view(self):
+        """
+        :return: sequence. entry ids of the shown rows, None for all entries
+        """
+        all_levels = len(self._levels) == len(logStore.LEVELS)
+        if self._text:
+            return self._store.search(
+                self._text, None if all_levels else self._levels)
+        if all_levels:
+            return None
+        return logStore.LevelView(self._store, self._levels)
+
+    def set_filter(self, levels, text=''):
+        """
+        Only show the entries of some levels containing a substring
+
+        :param levels: [int]. level codes to show
+        :param text: str. substring to filter, case insensitive
+        """
+        self.beginResetModel()
+        self._levels = set(levels)
+        self._text = text
+        self._view = self.build_view()
+        self._count = len(self._store if self._view is None else self._view)
+        self.endResetModel()
+
+    def append_messages(self, messages):
+        """
+        Append messages to the store and insert the shown ones as rows
+
+        :param messages: [(str, int, float, [str])]. message, level code,
+                         timestamp and html of each line, None if plain
+        """
+        first_id = len(self._store)
+        for message, level, timestamp, lines in messages:
+            if lines is not None:
+                key = self._store.evicted + len(self._store)
+                self._html.update(enumerate(lines, key))
+            self._store.append(message, level, timestamp)
+
+        if self._text:
+            self._view.extend(self._store.search(
+                self._text, self._levels, start=first_id))
+
+        count = len(self._store if self._view is None else self._view)
+        if count > self._count:
+            self.beginInsertRows(QtCore.QModelIndex(), self._count, count - 1)
+            self._count = count
+            self.endInsertRows()
+
+        self.evict(self._store.excess())
+
+    def evict(self, count):
+        """
+        Evict the oldest entries from the store, removing their rows
+
+        :param count: int. number of entries to evict
+        """
+        if count <= 0:
+            return
+
+        if self._view is None:
+            rows = count
+        elif isinstance(self._view, logStore.LevelView):
+            rows = self._view.rank(count)
+        else:
+            rows = bisect.bisect_left(self._view, count)
+
+        if rows:
+            self.beginRemoveRows(QtCore.QModelIndex(), 0, rows - 1)
+
+        self._store.evict(count)
+        if self._html:
+            evicted = self._store.evicted
+            self._html = {key: value for key, value in self._html.items()
+                          if key >= evicted}
+        if isinstance(self._view, logStore.LevelView):
+            self._view = self.build_view()
+        elif self._view is not None:
+            self._view = array(
+                'Q', [i - count for i in self._view[rows:]])
+        self._count -= rows
+
+        if rows:
+            self.endRemoveRows()
+
+    def clear(self):
+        """
+        Remove every entry
+        """
+        self.beginResetModel()
+        self._store.clear()
+        self._html.clear()
+        self._view = self.build_view()
+        self._count = 0
+        self.endResetModel()
+
+
+class HistoryModel(QtCore.QAbstractListModel):
+    """
+    List model exposing the archived entries of a LogArchive
+    """
+
+    def __init__(self, archive, parent=None):
+        """
+        Initialization
+
+        :param archive: logArchive.LogArchive. archive to browse
+        """
+        super(HistoryModel, self).__init__(parent)
+        self._archive = archive
+        self._pager = logArchive.ArchivePager([])
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        """
+        Override: number of archived entries
+        """
+        if parent.isValid():
+            return 0
+        return len(self._pager)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        """
+        Override: entry text and colour, read from the mapped files
+        """
+        if not index.isValid():
+            return None
+
+        if role == QtCore.Qt.DisplayRole:
+            timestamp, _, text = self._pager.line(index.row())
+            return '{}  {}'.format(
+                time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp)),
+                text)
+        elif role == QtCore.Qt.ForegroundRole:
+            return LEVEL_BRUSHES[self._pager.line(index.row())[1]]
+        return None
+
+    def refresh(self):
+        """
+        Map the archive files again, to include newly evicted entries
+        """
+        self.beginResetModel()
+        self._pager.close()
+        self._pager = logArchive.ArchivePager(self._archive.files())
+        self.endResetModel()
+
+    def close(self):
+        """
+        Unmap the archive files
+        """
+        self.beginResetModel()
+        self._pager.close()
+        self.endResetModel()
+
+
+class HistoryDialog(QtWidgets.QDialog):
+    """
+    Dialog browsing the log history archived on disk
+    """
+
+    def __init__(self, archive, parent=None):
+        """
+        Initialization
+
+        :param archive: logArchive.LogArchive. archive to browse
+        """
+        super(HistoryDialog, self).__init__(parent)
+        self.setWindowTitle('Log History')
+        self.resize(800, 500)
+
+        self.model = HistoryModel(archive, self)
+
+        self.ui_history_view = QtWidgets.QListView()
+        self.ui_history_view.setUniformItemSizes(True)
+        self.ui_history_view.setModel(self.model)
+
+        self.ui_refresh_btn = QtWidgets.QPushButton('Refresh')
+        self.ui_refresh_btn.clicked.connect(self.refresh)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self.ui_history_view)
+        layout.addWidget(self.ui_refresh_btn)
+
+    def refresh(self):
+        """
+        Reload the archive and show the latest entries
+        """
+        self.model.refresh()
+        self.ui_history_view.scrollToBottom()
+
+    def showEvent(self, event):
+        """
+        Override: map the archive when shown
+        """
+        super(HistoryDialog, self).showEvent(event)
+        self.refresh()
+
+    def hideEvent(self, event):
+        """
+        Override: release the mapped files, so the archive can rotate
+        """
+        self.model.close()
+        super(HistoryDialog, self).hideEvent(event)
+
 
 class OutputTextWidget(QtWidgets.QWidget):
     """
     Text Widget to display output information from Unreal command execution
+
+    The log is a virtualized list view, only the visible lines are laid out.
+    Lines beyond the scrollback caps are moved to a rotating archive file,
+    browsable from the history dialog.
     """
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, max_lines=SCROLLBACK_LINES,
+                 max_bytes=SCROLLBACK_BYTES, archive_path=ARCHIVE_PATH):
         """
         Initialization
+
+        :param max_lines: int. maximum number of lines kept in memory
+        :param max_bytes: int. maximum size of the text kept in memory
+        :param archive_path: str. log file receiving the evicted lines,
+                             they are dropped if None
         """
         super(OutputTextWidget, self).__init__(parent)
-        _loadUi(UI_PATH, self)
+        with TRACE.phase('ui load'):
+            uiCache.load_ui(UI_PATH, self)
+
+        self.archive = None
+        if archive_path:
+            self.archive = logArchive.LogArchive(archive_path)
+        self._history_dialog = None
+
+        self.store = logStore.LogStore(max_lines, max_bytes, self.archive)
+        self.model = LogModel(self.store, self)
+        self.ui_log_view.setModel(self.model)
+        self.ui_log_view.setItemDelegate(LogDelegate(self.ui_log_view))
+
+        self._pending = list()
+        self._flush_timer = QtCore.QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(FLUSH_INTERVAL)
+        self._flush_timer.timeout.connect(self.flush)
+
+        self._filter_timer = QtCore.QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(FILTER_DELAY)
+        self._filter_timer.timeout.connect(self.apply_filter)
+
+        self.ui_filter_edit.textChanged.connect(self._filter_timer.start)
+        self.ui_info_btn.toggled.connect(self.apply_filter)
+        self.ui_warning_btn.toggled.connect(self.apply_filter)
+        self.ui_error_btn.toggled.connect(self.apply_filter)
+        self.ui_history_btn.clicked.connect(self.show_history)
+        self.ui_history_btn.setEnabled(self.archive is not None)
+
+        # reports open as closable tabs next to the log
+        log_tab = self.ui_view_tabs.indexOf(self.ui_log_page)
+        for side in (QtWidgets.QTabBar.LeftSide, QtWidgets.QTabBar.RightSide):
+            self.ui_view_tabs.tabBar().setTabButton(log_tab, side, None)
+        self.ui_view_tabs.tabCloseRequested.connect(self.close_report)
+
+        copy_action = QtWidgets.QAction(self.ui_log_view)
+        copy_action.setShortcut(QtGui.QKeySequence.Copy)
+        copy_action.setShortcutContext(QtCore.Qt.WidgetShortcut)
+        copy_action.triggered.connect(self.copy_selection)
+        self.ui_log_view.addAction(copy_action)
 
     def clear(self):
         """
         Clear the all text
         """
-        self.ui_log_edit.clear()
+        self._pending = list()
+        self.model.clear()
+
+    def set_scrollback(self, max_lines=None, max_bytes=None):
+        """
+        Change the in-memory scrollback caps, evicting lines beyond them
+
+        :param max_lines: int. maximum number of lines, None for no limit
+        :param max_bytes: int. maximum size of the text, None for no limit
+        """
+        self.flush()
+        self.store.max_entries = max_lines
+        self.store.max_bytes = max_bytes
+        self.model.evict(self.store.excess())
+
+    def show_history(self):
+        """
+        Open the dialog browsing the lines archived on disk
+        """
+        if self.archive is None:
+            return
+
+        self.flush()
+        if self._history_dialog is None:
+            self._history_dialog = HistoryDialog(self.archive, self)
+        self._history_dialog.show()
+        self._history_dialog.raise_()
+
+    def show_report(self, report):
+        """
+        Open a profiling report as a sortable table next to the log
+
+        :param report: profiling.Report. report to show
+        """
+        table = reportTable.ReportTable(report)
+        label = '{} {}'.format(report.title, time.strftime('%H:%M:%S'))
+        self.ui_view_tabs.setCurrentIndex(self.ui_view_tabs.addTab(table, label))
+
+    def close_report(self, index):
+        """
+        :param index: int. tab index of the report to close
+        """
+        widget = self.ui_view_tabs.widget(index)
+        if widget is self.ui_log_page:
+            return
+        self.ui_view_tabs.removeTab(index)
+        widget.deleteLater()
+
+    def apply_filter(self):
+        """
+        Filter the displayed lines from the level buttons and filter text
+        """
+        levels = list()
+        if self.ui_info_btn.isChecked():
+            levels.extend([logStore.REGULAR, logStore.INFO])
+        if self.ui_warning_btn.isChecked():
+            levels.append(logStore.WARNING)
+        if self.ui_error_btn.isChecked():
+            levels.append(logStore.ERROR)
+
+        self.flush()
+        self.model.set_filter(levels, self.ui_filter_edit.text())
+        self.ui_log_view.scrollToBottom()
+
+    def show_entry(self, entry_id):
+        """
+        Select and scroll to an entry, clearing the filter if it hides it
+
+        :param entry_id: int. entry id
+        """
+        self.flush()
+        if not 0 <= entry_id < len(self.store):
+            return
+
+        row = self.model.row(entry_id)
+        if row is None:
+            for button in (self.ui_info_btn, self.ui_warning_btn, self.ui_error_btn):
+                button.blockSignals(True)
+                button.setChecked(True)
+                button.blockSignals(False)
+            self.ui_filter_edit.blockSignals(True)
+            self.ui_filter_edit.clear()
+            self.ui_filter_edit.blockSignals(False)
+            self.apply_filter()
+            row = entry_id
+
+        index = self.model.index(row)
+        self.ui_log_view.setCurrentIndex(index)
+        self.ui_log_view.scrollTo(index, QtWidgets.QAbstractItemView.PositionAtCenter)
+
+    def copy_selection(self):
+        """
+        Copy the selected lines to the clipboard
+        """
+        rows = sorted(index.row() for index in
+                      self.ui_log_view.selectionModel().selectedRows())
+        text = '\n'.join(
+            self.store.text(self.model.entry_id(row)) for row in rows)
+        QtWidgets.QApplication.clipboard().setText(text)
 
     def update_logger(self, message, mtype=None):
         """
-        Append plain message to display text widget
+        Queue plain message to be appended to display text widget
 
         :param message: str. message
         :param mtype: str. message type, this determines the message format/style
         """
-        if mtype == 'info':
-            self.ui_log_edit.setCurrentCharFormat(INFO_FORMAT)
-        elif mtype == 'warning':
-            self.ui_log_edit.setCurrentCharFormat(WARNING_FORMAT)
-        elif mtype == 'error':
-            self.ui_log_edit.setCurrentCharFormat(ERROR_FORMAT)
-        else:
-            self.ui_log_edit.setCurrentCharFormat(REGULAR_FORMAT)
+        self._pending.append((message, logStore.level_code(mtype), time.time(), None))
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """
+        Append every queued message to display text widget at once
+        """
+        self._flush_timer.stop()
+        if not self._pending:
+            return
+
+        pending = self._pending
+        self._pending = list()
+
+        # only follow the output if the view is already at the latest line
+        scroll = self.ui_log_view.verticalScrollBar()
+        follow = scroll.value() == scroll.maximum()
 
-        self.ui_log_edit.insertPlainText(message)
-        self.ui_log_edit.insertPlainText('\n')
+        self.model.append_messages(pending)
 
-        scroll = self.ui_log_edit.verticalScrollBar()
-        scroll.setValue(scroll.maximum())
+        if follow:
+            self.scroll_to_end()
 
     def update_logger_html(self, html):
         """
-        Append html message to display text widget
+        Queue html message to be appended to display text widget, its lines
+        keep their colours and font style, and are searched as plain text
 
         :param html: str. message as html
         """
-        self.ui_log_edit.insertHtml(html)
-        self.ui_log_edit.insertHtml('<br>')
+        lines = html_lines(html)
+        self._pending.append((
+            '\n'.join(text for text, _ in lines), logStore.REGULAR, time.time(),
+            [line_html for _, line_html in lines]))
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
 
-        scroll = self.ui_log_edit.verticalScrollBar()
-        scroll.setValue(scroll.maximum())
+    def scroll_to_end(self):
+        """
+        Scroll display text widget to the latest message
+        """
+        self.ui_log_view.scrollToBottom()
@@ -0,0 +1,227 @@
+"""
+Profiled runs of the script tabs, with cProfile or tracemalloc
+
+A tool is started and stopped around the command by ``executor.Execution``,
+in the thread running it, and turned into a report table once the command
+finished. The raw profile, or the tracemalloc snapshot, is saved to
+PROFILE_PATH, to be compared with later runs, e.g. with pstats or
+``tracemalloc.Snapshot.load``.
+"""
+
+import collections
+import os
+import time
+
+from . import executor, fileIO
+
+
+PROFILE_PATH = fileIO.data_path('profiles')
+
+PROFILE = 'profile'
+MEMORY = 'memory'
+
+# maximum number of rows of a report
+MAX_ROWS = 500
+
+# frames stored per allocation by tracemalloc
+TRACE_FRAMES = 10
+
+
+class Report(collections.namedtuple(
+        'Report', ['title', 'headers', 'rows', 'sort_column', 'summary', 'path'])):
+    """
+    Result table of a profiled run
+
+    :param title: str. name of the report, e.g. its tab label
+    :param headers: [str]. column names
+    :param rows: [tuple]. rows, numbers are sorted numerically
+    :param sort_column: int. column the rows are sorted by, descending
+    :param summary: str. one line summary of the run
+    :param path: str. file the raw result was saved to, None if not saved
+    """
+    __slots__ = ()
+
+
+def function_label(key):
+    """
+    :param key: (str, int, str). pstats function key: file, line and name
+    :return: (str, str). function name and its location
+    """
+    filename, line, name = key
+    if filename == '~':
+        # built-in functions
+        return name, ''
+    return name, '{}:{}'.format(os.path.basename(filename), line)
+
+
+def save_path(tool, extension):
+    """
+    :param tool: str. PROFILE or MEMORY
+    :param extension: str. file extension
+    :return: str. new timestamped file of PROFILE_PATH
+    """
+    if not os.path.isdir(PROFILE_PATH):
+        os.makedirs(PROFILE_PATH)
+    name = '{}_{}{}'.format(tool, time.strftime('%Y%m%d_%H%M%S'), extension)
+    path = os.path.join(PROFILE_PATH, name)
+    index = 1
+    while os.path.exists(path):
+        index += 1
+        path = os.path.join(PROFILE_PATH, '{}_{}{}'.format(
+            os.path.splitext(name)[0], index, extension))
+    return path
+
+
+class Profiler(object):
+    """
+    Deterministic profile of the functions called by a command
+    """
+    tool = PROFILE
+
+    def __init__(self):
+        self._profile = None
+        self._start = None
+        self.wall_time = 0.0
+
+    def start(self):
+        # only needed by profiled runs, not imported on startup
+        import cProfile
+
+        self._profile = cProfile.Profile()
+        self._start = time.perf_counter()
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+        self.wall_time = time.perf_counter() - self._start
+
+    def has_result(self):
+        return self._start is not None
+
+    def report(self, save=True):
+        """
+        :param save: bool. whether to save the raw profile
+        :return: Report. functions by cumulative time
+        """
+        import pstats
+
+        path = None
+        if save:
+            path = save_path(self.tool, '.prof')
+            self._profile.dump_stats(path)
+
+        stats = pstats.Stats(self._profile).stats
+        rows = list()
+        for key, (_, calls, total, cumulative, _) in stats.items():
+            # the profiler calls stopping it
+            if key[0] == __file__ or \
+                    key[2] == "<method 'disable' of '_lsprof.Profiler' objects>":
+                continue
+            name, location = function_label(key)
+            rows.append((name, location, calls, total,
+                         total / calls if calls else 0.0, cumulative))
+        rows.sort(key=lambda row: row[-1], reverse=True)
+
+        return Report(
+            'Profile',
+            ['Function', 'Location', 'Calls', 'Total (s)', 'Per call (s)',
+             'Cumulative (s)'],
+            rows[:MAX_ROWS],
+            5,
+            '{} function calls in {:.3f}s'.format(
+                sum(row[2] for row in rows), self.wall_time),
+            path)
+
+
+class MemoryTracer(object):
+    """
+    Memory allocated by a command, per source line, with tracemalloc
+
+    The report lists the lines whose allocations grew the most during the
+    run, still allocated at its end, and the peak traced memory. tracemalloc
+    traces every thread, the allocations of the GUI during a threaded run
+    are listed too.
+    """
+    tool = MEMORY
+
+    def __init__(self):
+        self._before = None
+        self._after = None
+        self._started = False
+        self.peak = 0
+
+    def start(self):
+        import tracemalloc
+
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start(TRACE_FRAMES)
+        self._before = tracemalloc.take_snapshot()
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+
+    def stop(self):
+        import tracemalloc
+
+        self._after = tracemalloc.take_snapshot()
+        self.peak = tracemalloc.get_traced_memory()[1]
+        if self._started:
+            tracemalloc.stop()
+
+    def has_result(self):
+        return self._after is not None
+
+    def report(self, save=True):
+        """
+        :param save: bool. whether to save the raw snapshot
+        :return: Report. source lines by allocated size
+        """
+        import tracemalloc
+
+        path = None
+        if save:
+            path = save_path(self.tool, '.tracemalloc')
+            self._after.dump(path)
+
+        # allocations of tracemalloc itself and of the execution machinery
+        ignored = [tracemalloc.Filter(False, tracemalloc.__file__),
+                   tracemalloc.Filter(False, executor.__file__),
+                   tracemalloc.Filter(False, __file__)]
+        after = self._after.filter_traces(ignored)
+        before = self._before.filter_traces(ignored)
+
+        rows = list()
+        for stat in after.compare_to(before, 'lineno'):
+            if stat.size_diff <= 0:
+                continue
+            frame = stat.traceback[0]
+            rows.append((
+                '{}:{}'.format(os.path.basename(frame.filename), frame.lineno),
+                frame.filename,
+                stat.size_diff / 1024.0,
+                stat.count_diff,
+                stat.size_diff / stat.count_diff if stat.count_diff > 0 else 0.0))
+        rows.sort(key=lambda row: row[2], reverse=True)
+
+        return Report(
+            'Memory',
+            ['Line', 'File', 'Size (KiB)', 'Blocks', 'Average (B)'],
+            rows[:MAX_ROWS],
+            2,
+            '{:.1f} KiB allocated, peak {:.1f} KiB'.format(
+                sum(row[2] for row in rows), self.peak / 1024.0),
+            path)
+
+
+TOOLS = {
+    PROFILE: Profiler,
+    MEMORY: MemoryTracer,
+}
+
+
+def new_tool(tool):
+    """
+    :param tool: str. PROFILE or MEMORY
+    :return: Profiler or MemoryTracer. tool to pass to an execution
+    """
+    return TOOLS[tool]()
@@ -0,0 +1,663 @@
+"""
+Client of the Unreal python remote execution protocol
+
+An Unreal editor with 'Enable Remote Execution' in its Python plugin
+settings is a node answering the pings multicast over UDP. To run commands
+on a node, the client listens on a TCP command endpoint and asks the node,
+over UDP, to connect to it; commands and their results are then JSON
+messages sent over that connection.
+
+The connection to a node is opened once and kept for the next commands.
+The commands queued on it are sent as soon as the previous result is
+received, from the reading thread, so a queue of commands does not wait
+for the GUI between two commands. ``tests/fakeRemote.py`` is a stand-in node
+speaking the same protocol.
+"""
+
+import codecs
+import collections
+import json
+import socket
+import threading
+import time
+import uuid
+from concurrent import futures
+
+from Qt import QtCore
+
+from . import executor
+
+
+PROTOCOL_VERSION = 1
+PROTOCOL_MAGIC = 'ue_py'
+
+TYPE_PING = 'ping'
+TYPE_PONG = 'pong'
+TYPE_OPEN_CONNECTION = 'open_connection'
+TYPE_CLOSE_CONNECTION = 'close_connection'
+TYPE_COMMAND = 'command'
+TYPE_COMMAND_RESULT = 'command_result'
+
+EXECUTE_FILE = 'ExecuteFile'
+EXECUTE_STATEMENT = 'ExecuteStatement'
+EVALUATE_STATEMENT = 'EvaluateStatement'
+
+# defaults of the Unreal python plugin settings
+MULTICAST_GROUP = ('239.0.0.1', 6766)
+MULTICAST_BIND_ADDRESS = '0.0.0.0'
+MULTICAST_TTL = 0
+COMMAND_ENDPOINT = ('127.0.0.1', 6776)
+
+# seconds between two pings, and after which a silent node is dropped
+PING_INTERVAL = 1.0
+NODE_TIMEOUT = 5.0
+# seconds waited for a node to answer the first ping, or to connect
+DISCOVERY_TIMEOUT = 3.0
+CONNECT_TIMEOUT = 5.0
+
+RECEIVE_SIZE = 65536
+
+# commands sent before their previous result is received, Unreal reads
+# one message at a time from the command connection
+MAX_IN_FLIGHT = 1
+
+# log entry types of the command results, by message type of the log
+OUTPUT_TYPES = {
+    'Info': 'info',
+    'Warning': 'warning',
+    'Error': 'error',
+}
+
+
+def encode(message_type, source, dest=None, data=None):
+    """
+    :param message_type: str. one of the TYPE constants
+    :param source: str. id of the sending node
+    :param dest: str. id of the receiving node, None for every node
+    :param data: dict. content of the message
+    :return: bytes. message
+    """
+    message = {
+        'version': PROTOCOL_VERSION,
+        'magic': PROTOCOL_MAGIC,
+        'type': message_type,
+        'source': source,
+    }
+    if dest is not None:
+        message['dest'] = dest
+    if data is not None:
+        message['data'] = data
+    return json.dumps(message, ensure_ascii=False).encode('utf-8')
+
+
+def is_message(message):
+    """
+    :param message: object. decoded json value
+    :return: bool. whether it is a message of the protocol
+    """
+    return (isinstance(message, dict) and
+            message.get('version') == PROTOCOL_VERSION and
+            message.get('magic') == PROTOCOL_MAGIC and
+            'type' in message and 'source' in message)
+
+
+def decode(data):
+    """
+    :param data: bytes. datagram
+    :return: dict. message, None if it is not one of the protocol
+    """
+    try:
+        message = json.loads(data.decode('utf-8'))
+    except ValueError:
+        return None
+    return message if is_message(message) else None
+
+
+class MessageReader(object):
+    """
+    Split the stream of a command connection into messages, a message
+    being received in several parts or several in one
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        self._json = json.JSONDecoder()
+        self._text = ''
+
+    def feed(self, data):
+        """
+        :param data: bytes. received data
+        :return: [dict]. messages completed by the data
+        """
+        self._text += self._decoder.decode(data)
+        messages = list()
+        while True:
+            text = self._text.lstrip()
+            if not text:
+                self._text = ''
+                break
+            try:
+                message, end = self._json.raw_decode(text)
+            except ValueError:
+                # incomplete
+                self._text = text
+                break
+            self._text = text[end:]
+            if is_message(message):
+                messages.append(message)
+        return messages
+
+
+def multicast_socket(group=MULTICAST_GROUP, bind_address=MULTICAST_BIND_ADDRESS,
+                     ttl=MULTICAST_TTL):
+    """
+    :param group: (str, int). multicast group address and port
+    :param bind_address: str. address of the interface joining the group
+    :param ttl: int. time to live of the sent datagrams, 0 for this host
+    :return: socket.socket. UDP socket member of the group
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if hasattr(socket, 'SO_REUSEPORT'):
+        # several nodes or clients on this host, on macOS
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        except OSError:
+            pass
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF,
+                    socket.inet_aton(bind_address))
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP,
+                    socket.inet_aton(group[0]) + socket.inet_aton(bind_address))
+    sock.bind((bind_address, group[1]))
+    return sock
+
+
+class Discovery(object):
+    """
+    Ping the multicast group and keep track of the nodes answering
+    """
+
+    def __init__(self, node_id, group=MULTICAST_GROUP,
+                 bind_address=MULTICAST_BIND_ADDRESS, ttl=MULTICAST_TTL):
+        """
+        Initialization
+
+        :param node_id: str. id of this client
+        :param group: (str, int). multicast group address and port
+        :param bind_address: str. address of the interface joining the group
+        :param ttl: int. time to live of the sent datagrams
+        """
+        self.node_id = node_id
+        self.group = group
+        self.bind_address = bind_address
+        self.ttl = ttl
+
+        # node id: (pong data, time of the last pong)
+        self._nodes = dict()
+        self._found = threading.Condition()
+        self._stopping = threading.Event()
+        self._socket = None
+        self._thread = None
+
+    def start(self):
+        """
+        :raise OSError: if the multicast group cannot be joined
+        """
+        self._socket = multicast_socket(self.group, self.bind_address, self.ttl)
+        self._socket.settimeout(PING_INTERVAL / 4)
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def send(self, message_type, dest=None, data=None):
+        """
+        Multicast a message to the nodes
+
+        :param message_type: str. one of the TYPE constants
+        :param dest: str. id of the receiving node, None for every node
+        :param data: dict. content of the message
+        """
+        self._socket.sendto(encode(message_type, self.node_id, dest, data), self.group)
+
+    def nodes(self):
+        """
+        :return: [dict]. pong data of the nodes answering, e.g. their
+                 'project_name' and 'machine', with their 'node_id'
+        """
+        now = time.time()
+        with self._found:
+            return [dict(data, node_id=node_id)
+                    for node_id, (data, seen) in sorted(self._nodes.items())
+                    if now - seen < NODE_TIMEOUT]
+
+    def forget(self, node_id):
+        """
+        Drop a node until it answers a ping again, e.g. one which did not
+        connect
+
+        :param node_id: str. id of the node
+        """
+        with self._found:
+            self._nodes.pop(node_id, None)
+
+    def wait_for_node(self, timeout=DISCOVERY_TIMEOUT):
+        """
+        :param timeout: float. maximum seconds to wait
+        :return: [dict]. nodes answering, empty if none answered in time
+        """
+        deadline = time.time() + timeout
+        with self._found:
+            while not self.nodes() and time.time() < deadline:
+                self._found.wait(deadline - time.time())
+        return self.nodes()
+
+    def _run(self):
+        next_ping = 0
+        while not self._stopping.is_set():
+            if time.time() >= next_ping:
+                try:
+                    self.send(TYPE_PING)
+                except OSError:
+                    pass
+                next_ping = time.time() + PING_INTERVAL
+
+            try:
+                data = self._socket.recv(RECEIVE_SIZE)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            message = decode(data)
+            if message is None or message['type'] != TYPE_PONG or \
+                    message.get('dest') != self.node_id:
+                continue
+            with self._found:
+                self._nodes[message['source']] = (message.get('data') or dict(), time.time())
+                self._found.notify_all()
+
+
+class RemoteCommand(object):
+    """
+    Command sent to a node, and its result once received
+    """
+
+    def __init__(self, command, exec_mode=EXECUTE_FILE, callback=None):
+        """
+        Initialization
+
+        :param command: str. python source to run
+        :param exec_mode: str. EXECUTE_FILE, EXECUTE_STATEMENT or
+                          EVALUATE_STATEMENT
+        :param callback: callable. called with the command once completed,
+                         from the thread receiving its result
+        """
+        self.command = command
+        self.exec_mode = exec_mode
+        self.callback = callback
+
+        self.success = False
+        self.result = None
+        self.output = list()
+        # reason the command did not run, e.g. a lost connection
+        self.error = None
+        self.wall_time = 0.0
+
+        self._sent = None
+        self._done = threading.Event()
+
+    def sent(self):
+        self._sent = time.perf_counter()
+
+    def complete(self, data=None, error=None):
+        """
+        :param data: dict. data of the command result message
+        :param error: str. reason the command did not run, if it did not
+        """
+        if self._done.is_set():
+            return
+        if self._sent is not None:
+            self.wall_time = time.perf_counter() - self._sent
+        data = data or dict()
+        self.success = bool(data.get('success')) and error is None
+        self.result = data.get('result')
+        self.output = data.get('output') or list()
+        self.error = error
+        self._done.set()
+        if self.callback is not None:
+            self.callback(self)
+
+    def is_done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """
+        :param timeout: float. maximum seconds to wait
+        :return: bool. whether the command completed
+        """
+        return self._done.wait(timeout)
+
+    def messages(self):
+        """
+        :return: [(str, str)]. message type and line of the output
+        """
+        messages = list()
+        for entry in self.output:
+            mtype = OUTPUT_TYPES.get(entry.get('type'), 'info')
+            for line in str(entry.get('output', '')).rstrip('\n').split('\n'):
+                messages.append((mtype, line))
+        if self.exec_mode == EVALUATE_STATEMENT and self.result is not None:
+            messages.append(('info', self.result))
+        if self.error:
+            messages.append(('error', self.error))
+        return messages
+
+    def execution_result(self):
+        """
+        :return: executor.ExecutionResult. outcome of the command, its
+                 resources are unknown
+        """
+        messages = self.messages()
+        return executor.ExecutionResult(
+            self.success, False, False, self.wall_time, None,
+            line_count=len(messages),
+            error_line_count=sum(1 for mtype, _ in messages if mtype == 'error'))
+
+
+class CommandConnection(object):
+    """
+    Persistent TCP command connection to a node
+    """
+
+    def __init__(self, discovery, node_id, endpoint=COMMAND_ENDPOINT,
+                 max_in_flight=MAX_IN_FLIGHT):
+        """
+        Initialization
+
+        :param discovery: Discovery. multicast messaging of the client
+        :param node_id: str. id of the node
+        :param endpoint: (str, int). address the node connects to, another
+                         port is used if this one is taken
+        :param max_in_flight: int. commands sent before the previous
+                              results are received
+        """
+        self.discovery = discovery
+        self.node_id = node_id
+        self.endpoint = endpoint
+        self.max_in_flight = max_in_flight
+
+        self._socket = None
+        self._open = False
+        self._lock = threading.Lock()
+        self._queued = collections.deque()
+        self._in_flight = collections.deque()
+
+    def is_open(self):
+        return self._open
+
+    def open(self, timeout=CONNECT_TIMEOUT):
+        """
+        Ask the node to connect to the command endpoint
+
+        :param timeout: float. maximum seconds to wait for the node
+        :raise ConnectionError: if the node did not connect in time
+        """
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            try:
+                server.bind(self.endpoint)
+            except OSError:
+                server.bind((self.endpoint[0], 0))
+            server.listen(1)
+            server.settimeout(timeout)
+            address, port = server.getsockname()
+            self.discovery.send(TYPE_OPEN_CONNECTION, self.node_id, {
+                'command_ip': address, 'command_port': port})
+            try:
+                self._socket, _ = server.accept()
+            except socket.timeout:
+                raise ConnectionError('the remote node did not connect')
+        finally:
+            server.close()
+
+        self._socket.settimeout(None)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._open = True
+        reader = threading.Thread(target=self._read)
+        reader.daemon = True
+        reader.start()
+
+    def close(self):
+        """
+        Close the connection, the pending commands fail
+        """
+        if not self._open:
+            return
+        try:
+            self.discovery.send(TYPE_CLOSE_CONNECTION, self.node_id)
+        except OSError:
+            pass
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+        self._fail('the connection was closed')
+
+    def send(self, remote_command):
+        """
+        Queue a command, sent once the commands before it are answered
+
+        :param remote_command: RemoteCommand. command to run on the node
+        :raise ConnectionError: if the connection is closed
+        """
+        with self._lock:
+            if not self._open:
+                raise ConnectionError('the connection is closed')
+            self._queued.append(remote_command)
+        self._dispatch()
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._queued) + len(self._in_flight)
+
+    def _dispatch(self):
+        while True:
+            with self._lock:
+                if not self._open or not self._queued or \
+                        len(self._in_flight) >= self.max_in_flight:
+                    return
+                remote_command = self._queued.popleft()
+                self._in_flight.append(remote_command)
+                data = encode(TYPE_COMMAND, self.discovery.node_id, self.node_id, {
+                    'command': remote_command.command,
+                    'unattended': True,
+                    'exec_mode': remote_command.exec_mode,
+                })
+                remote_command.sent()
+                try:
+                    self._socket.sendall(data)
+                except OSError:
+                    break
+        self._fail('the connection was lost')
+
+    def _read(self):
+        reader = MessageReader()
+        while True:
+            try:
+                data = self._socket.recv(RECEIVE_SIZE)
+            except OSError:
+                data = b''
+            if not data:
+                break
+
+            for message in reader.feed(data):
+                if message['type'] != TYPE_COMMAND_RESULT:
+                    continue
+                with self._lock:
+                    remote_command = self._in_flight.popleft() if self._in_flight else None
+                if remote_command is not None:
+                    remote_command.complete(message.get('data'))
+            self._dispatch()
+        self._fail('the connection was lost')
+
+    def _fail(self, reason):
+        with self._lock:
+            self._open = False
+            pending = list(self._in_flight) + list(self._queued)
+            self._in_flight.clear()
+            self._queued.clear()
+        for remote_command in pending:
+            remote_command.complete(error=reason)
+
+
+class RemoteClient(object):
+    """
+    Node discovery and a pool of persistent connections, one per node
+    """
+
+    def __init__(self, group=MULTICAST_GROUP, bind_address=MULTICAST_BIND_ADDRESS,
+                 endpoint=COMMAND_ENDPOINT, max_in_flight=MAX_IN_FLIGHT):
+        """
+        Initialization
+
+        :param group: (str, int). multicast group address and port
+        :param bind_address: str. address of the interface joining the group
+        :param endpoint: (str, int). command endpoint the nodes connect to
+        :param max_in_flight: int. commands sent to a node before the
+                              previous results are received
+        """
+        self.node_id = str(uuid.uuid4())
+        self.discovery = Discovery(self.node_id, group, bind_address)
+        self.endpoint = endpoint
+        self.max_in_flight = max_in_flight
+        self._connections = dict()
+        self._lock = threading.Lock()
+
+    def start(self):
+        self.discovery.start()
+
+    def stop(self):
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for connection in connections:
+            connection.close()
+        self.discovery.stop()
+
+    def nodes(self):
+        return self.discovery.nodes()
+
+    def connection(self, node_id=None):
+        """
+        :param node_id: str. id of the node, the first node found if None
+        :return: CommandConnection. open connection to the node, reused
+                 by the next commands
+        :raise ConnectionError: if there is no node or it did not connect
+        """
+        with self._lock:
+            if node_id is None:
+                node_id = next((key for key, connection in self._connections.items()
+                                if connection.is_open()), None)
+            if node_id is None:
+                nodes = self.discovery.wait_for_node()
+                if not nodes:
+                    raise ConnectionError('no remote Unreal editor found')
+                node_id = nodes[0]['node_id']
+
+            connection = self._connections.get(node_id)
+            if connection is None or not connection.is_open():
+                connection = CommandConnection(
+                    self.discovery, node_id, self.endpoint, self.max_in_flight)
+                try:
+                    connection.open()
+                except OSError:
+                    self.discovery.forget(node_id)
+                    raise
+                self._connections[node_id] = connection
+            return connection
+
+    def execute(self, command, exec_mode=EXECUTE_FILE, node_id=None, callback=None):
+        """
+        Queue a command on a node
+
+        :param command: str. python source to run
+        :param exec_mode: str. EXECUTE_FILE, EXECUTE_STATEMENT or
+                          EVALUATE_STATEMENT
+        :param node_id: str. id of the node, the first node found if None
+        :param callback: callable. called with the command once completed
+        :return: RemoteCommand. queued command
+        :raise ConnectionError: if there is no node or it did not connect
+        """
+        remote_command = RemoteCommand(command, exec_mode, callback)
+        self.connection(node_id).send(remote_command)
+        return remote_command
+
+
+class RemoteEngine(QtCore.QObject):
+    """
+    Send commands to a remote node without blocking the GUI thread, and
+    report their results to it
+    """
+    finished = QtCore.Signal(object, object, object)
+
+    def __init__(self, client=None, parent=None):
+        """
+        Initialization
+
+        :param client: RemoteClient. client of the nodes, with the default
+                       settings if None
+        :param parent: QObject. parent object
+        """
+        super(RemoteEngine, self).__init__(parent)
+        self.client = client or RemoteClient()
+        # node the commands run on, the first node found if None
+        self.node_id = None
+        # connecting to a node may wait for it, the commands are queued
+        # in order from a single thread
+        self._worker = futures.ThreadPoolExecutor(max_workers=1)
+
+    def start(self):
+        """
+        :raise OSError: if the multicast group cannot be joined
+        """
+        self.client.start()
+
+    def stop(self):
+        self._worker.shutdown(wait=False)
+        self.client.stop()
+
+    def nodes(self):
+        return self.client.nodes()
+
+    def execute(self, command, tag=None, exec_mode=EXECUTE_FILE):
+        """
+        Queue a command, finished is emitted with the tag, the
+        executor.ExecutionResult and the output lines once it completed
+
+        :param command: str. python source to run
+        :param tag: object. passed back with the result
+        :param exec_mode: str. EXECUTE_FILE, EXECUTE_STATEMENT or
+                          EVALUATE_STATEMENT
+        """
+        self._worker.submit(self._send, command, tag, exec_mode)
+
+    def _send(self, command, tag, exec_mode):
+        callback = lambda remote_command: self.finished.emit(
+            tag, remote_command.execution_result(), remote_command.messages())
+        try:
+            self.client.execute(command, exec_mode, self.node_id, callback)
+        except OSError as error:
+            RemoteCommand(command, exec_mode, callback).complete(error=str(error))
@@ -0,0 +1,62 @@
+"""
+Sortable tables of numbers, e.g. the profiling reports and run statistics
+"""
+
+from Qt import QtWidgets, QtCore
+
+
+class NumberItem(QtWidgets.QTableWidgetItem):
+    """
+    Table item sorted by its number rather than its text
+    """
+
+    def __init__(self, number, text):
+        """
+        Initialization
+
+        :param number: int or float. sorted value
+        :param text: str. displayed value
+        """
+        super(NumberItem, self).__init__(text)
+        self.number = number
+        self.setTextAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+
+    def __lt__(self, other):
+        if isinstance(other, NumberItem):
+            return self.number < other.number
+        return super(NumberItem, self).__lt__(other)
+
+
+class ReportTable(QtWidgets.QTableWidget):
+    """
+    Sortable table of a profiling report
+    """
+
+    def __init__(self, report, parent=None):
+        """
+        Initialization
+
+        :param report: profiling.Report. report to show
+        """
+        super(ReportTable, self).__init__(len(report.rows), len(report.headers), parent)
+        self.report = report
+        self.setHorizontalHeaderLabels(report.headers)
+        self.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.verticalHeader().hide()
+        self.setToolTip('{}\n{}'.format(report.summary, report.path or 'not saved'))
+
+        for row, values in enumerate(report.rows):
+            for column, value in enumerate(values):
+                if isinstance(value, float):
+                    item = NumberItem(value, '{:.4f}'.format(value))
+                elif isinstance(value, int):
+                    item = NumberItem(value, str(value))
+                else:
+                    item = QtWidgets.QTableWidgetItem(value)
+                self.setItem(row, column, item)
+
+        self.resizeColumnsToContents()
+        self.horizontalHeader().setSortIndicator(
+            report.sort_column, QtCore.Qt.DescendingOrder)
+        self.setSortingEnabled(True)
@@ -0,0 +1,265 @@
+"""
+Append-only history of the script runs, with their timing and resources
+
+Each run is a fixed size binary record appended to a single file, so
+recording a run is one small write, and the records written since the
+last read, e.g. by another editor instance, are read incrementally.
+The history is compacted to its latest MAX_RECORDS runs once it grows
+past a quarter above it.
+"""
+
+import collections
+import os
+import struct
+
+from . import fileIO
+
+
+HISTORY_PATH = fileIO.data_path('logs', 'runs.bin')
+
+MAGIC = b'USERUNS1'
+
+# timestamp, wall time, cpu time, peak rss delta, output lines, error
+# lines, status, sha1 of the source, tab id
+RECORD = struct.Struct('<dddqIIB20s16s')
+
+STATUSES = ('ok', 'failed', 'cancelled', 'timed out')
+
+# number of runs kept by a compaction
+MAX_RECORDS = 100000
+
+# previous runs of a source compared with its latest run
+REGRESSION_WINDOW = 20
+# minimum number of previous runs before a run is compared
+REGRESSION_MIN_RUNS = 3
+# ratio to the median above which a run is a regression
+REGRESSION_RATIO = 1.25
+# seconds below which a slowdown is noise
+REGRESSION_MIN_DELTA = 0.01
+
+SPARKS = u'▁▂▃▄▅▆▇█'
+
+
+class RunRecord(collections.namedtuple('RunRecord', [
+        'timestamp', 'wall_time', 'cpu_time', 'peak_rss_delta', 'line_count',
+        'error_line_count', 'status', 'source_hash', 'tab_id'])):
+    """
+    Measures of a single run
+
+    :param timestamp: float. time the run ended
+    :param wall_time: float. seconds the run took
+    :param cpu_time: float. cpu seconds used by the run, None if unknown
+    :param peak_rss_delta: int. bytes the peak resident memory grew by,
+                           None if unknown
+    :param line_count: int. number of output lines
+    :param error_line_count: int. number of error lines
+    :param status: str. one of STATUSES
+    :param source_hash: str. sha1 hex digest of the run source
+    :param tab_id: str. session id of the tab the source ran from
+    """
+    __slots__ = ()
+
+    def pack(self):
+        """
+        :return: bytes. binary record
+        """
+        return RECORD.pack(
+            self.timestamp, self.wall_time,
+            -1.0 if self.cpu_time is None else self.cpu_time,
+            -1 if self.peak_rss_delta is None else self.peak_rss_delta,
+            self.line_count, self.error_line_count, STATUSES.index(self.status),
+            bytes.fromhex(self.source_hash), bytes.fromhex(self.tab_id))
+
+    @classmethod
+    def unpack(cls, values):
+        """
+        :param values: tuple. fields unpacked from a binary record
+        :return: RunRecord. record
+        """
+        (timestamp, wall_time, cpu_time, peak_rss_delta, line_count,
+         error_line_count, status, source_hash, tab_id) = values
+        return cls(
+            timestamp, wall_time, None if cpu_time < 0 else cpu_time,
+            None if peak_rss_delta < 0 else peak_rss_delta,
+            line_count, error_line_count, STATUSES[min(status, len(STATUSES) - 1)],
+            source_hash.hex(), tab_id.hex())
+
+
+class RunHistory(object):
+    """
+    Run records of a history file, indexed by source and by tab
+    """
+
+    def __init__(self, path=None, max_records=MAX_RECORDS):
+        """
+        Initialization
+
+        :param path: str. history file, HISTORY_PATH if None
+        :param max_records: int. number of runs kept by a compaction
+        """
+        self.path = path or HISTORY_PATH
+        self.max_records = max_records
+        self._reset()
+
+    def _reset(self):
+        self._records = list()
+        self._by_source = dict()
+        self._by_tab = dict()
+        # bytes of the file already read
+        self._offset = 0
+
+    def _lock(self):
+        return fileIO.FileLock(self.path + '.lock')
+
+    def _index(self, record):
+        index = len(self._records)
+        self._records.append(record)
+        self._by_source.setdefault(record.source_hash, list()).append(index)
+        self._by_tab.setdefault(record.tab_id, list()).append(index)
+
+    def refresh(self):
+        """
+        Read the records appended to the file since the last read
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size < self._offset:
+            # compacted by another instance
+            self._reset()
+        if size == self._offset:
+            return
+
+        with open(self.path, 'rb') as f:
+            if self._offset == 0:
+                if f.read(len(MAGIC)) != MAGIC:
+                    return
+                self._offset = len(MAGIC)
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+
+        # a record being written is read once complete
+        count = len(data) // RECORD.size
+        for values in RECORD.iter_unpack(data[:count * RECORD.size]):
+            self._index(RunRecord.unpack(values))
+        self._offset += count * RECORD.size
+
+    def records(self):
+        """
+        :return: [RunRecord]. every run, oldest first
+        """
+        self.refresh()
+        return list(self._records)
+
+    def runs(self, source_hash=None, tab_id=None):
+        """
+        :param source_hash: str. only the runs of this source
+        :param tab_id: str. only the runs from this tab
+        :return: [RunRecord]. runs, oldest first
+        """
+        self.refresh()
+        if source_hash is not None:
+            indexes = self._by_source.get(source_hash, list())
+        elif tab_id is not None:
+            indexes = self._by_tab.get(tab_id, list())
+        else:
+            return list(self._records)
+        return [self._records[index] for index in indexes
+                if tab_id is None or self._records[index].tab_id == tab_id]
+
+    def append(self, record):
+        """
+        Append a run to the file
+
+        :param record: RunRecord. run to append
+        """
+        with self._lock():
+            with open(self.path, 'ab') as f:
+                size = f.tell()
+                if size < len(MAGIC):
+                    f.truncate(0)
+                    f.write(MAGIC)
+                elif (size - len(MAGIC)) % RECORD.size:
+                    # a write interrupted by a crash
+                    f.truncate(size - (size - len(MAGIC)) % RECORD.size)
+                f.write(record.pack())
+
+            self.refresh()
+            if len(self._records) > self.max_records * 1.25:
+                self._compact()
+
+    def _compact(self):
+        """
+        Keep the latest runs only, the history lock being held
+        """
+        kept = self._records[-self.max_records:]
+        fileIO.atomic_write(
+            self.path, MAGIC + b''.join(record.pack() for record in kept))
+        self._reset()
+        self.refresh()
+
+
+RunStats = collections.namedtuple(
+    'RunStats', ['count', 'p50', 'p90', 'p95', 'best', 'worst', 'mean'])
+
+
+def percentile(values, fraction):
+    """
+    :param values: [float]. sorted values
+    :param fraction: float. percentile between 0 and 1
+    :return: float. interpolated percentile, None if there is no value
+    """
+    if not values:
+        return None
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def summarize(records):
+    """
+    :param records: [RunRecord]. runs
+    :return: RunStats. wall time statistics of the successful runs, None if
+             there is none
+    """
+    values = sorted(record.wall_time for record in records if record.status == 'ok')
+    if not values:
+        return None
+    return RunStats(
+        len(values), percentile(values, 0.5), percentile(values, 0.9),
+        percentile(values, 0.95), values[0], values[-1],
+        sum(values) / len(values))
+
+
+def regression(records, window=REGRESSION_WINDOW):
+    """
+    Compare the last run of a source with the previous ones
+
+    :param records: [RunRecord]. runs of a source, oldest first
+    :param window: int. number of previous runs compared with
+    :return: float. ratio of the last run wall time to the median of the
+             previous ones, None if it is not a regression
+    """
+    runs = [record for record in records if record.status == 'ok']
+    if len(runs) <= REGRESSION_MIN_RUNS or runs[-1] is not records[-1]:
+        return None
+
+    median = percentile(sorted(record.wall_time for record in runs[-window - 1:-1]), 0.5)
+    last = runs[-1].wall_time
+    if last - median < REGRESSION_MIN_DELTA or last < median * REGRESSION_RATIO:
+        return None
+    return last / median if median else float('inf')
+
+
+def sparkline(values):
+    """
+    :param values: [float]. values in order
+    :return: str. one bar character per value, scaled to their range
+    """
+    if not values:
+        return ''
+    low, high = min(values), max(values)
+    scale = (len(SPARKS) - 1) / (high - low) if high > low else 0
+    return ''.join(SPARKS[int((value - low) * scale)] for value in values)
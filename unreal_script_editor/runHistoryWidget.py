@@ -0,0 +1,156 @@
+"""
+Statistics of the past runs of a script tab
+"""
+
+import time
+
+from Qt import QtWidgets, QtCore, QtGui
+
+from . import runHistory
+from .reportTable import NumberItem
+
+
+# maximum number of runs listed, the latest ones
+MAX_LISTED = 500
+
+# number of latest runs drawn by the trend line
+TREND_RUNS = 40
+
+TAB_SCOPE = 'Runs of this tab'
+SOURCE_SCOPE = 'Runs of this exact source, from any tab'
+
+REGRESSION_BRUSH = QtGui.QBrush(QtGui.QColor(220, 90, 90))
+
+
+def format_seconds(value):
+    return '-' if value is None else '{:.4f}'.format(value)
+
+
+class RunHistoryDialog(QtWidgets.QDialog):
+    """
+    Percentiles, trend and list of the runs of a tab or of a source
+    """
+    HEADERS = ['Time', 'Wall (s)', 'CPU (s)', 'Peak RSS +(MiB)', 'Lines',
+               'Error Lines', 'Status', 'Source']
+
+    def __init__(self, history, parent=None):
+        """
+        Initialization
+
+        :param history: runHistory.RunHistory. recorded runs
+        """
+        super(RunHistoryDialog, self).__init__(parent)
+        self.setWindowTitle('Run History')
+        self.resize(760, 480)
+        self.history = history
+        self.tab_id = None
+        self.source_hash = None
+
+        self.ui_scope_combo = QtWidgets.QComboBox()
+        self.ui_scope_combo.addItems([TAB_SCOPE, SOURCE_SCOPE])
+        self.ui_stats_label = QtWidgets.QLabel()
+        self.ui_stats_label.setTextInteractionFlags(QtCore.Qt.TextSelectableByMouse)
+        self.ui_run_table = QtWidgets.QTableWidget(0, len(self.HEADERS))
+        self.ui_run_table.setHorizontalHeaderLabels(self.HEADERS)
+        self.ui_run_table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.ui_run_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.ui_run_table.verticalHeader().hide()
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self.ui_scope_combo)
+        layout.addWidget(self.ui_stats_label)
+        layout.addWidget(self.ui_run_table)
+
+        self.ui_scope_combo.currentIndexChanged.connect(self.refresh)
+
+    def set_script(self, tab_id, source_hash):
+        """
+        :param tab_id: str. session id of the tab
+        :param source_hash: str. hash of the current source of the tab
+        """
+        self.tab_id = tab_id
+        self.source_hash = source_hash
+        self.refresh()
+
+    def refresh(self):
+        """
+        Reload the history and show the runs of the chosen scope
+        """
+        if self.ui_scope_combo.currentText() == SOURCE_SCOPE:
+            runs = self.history.runs(source_hash=self.source_hash)
+        else:
+            runs = self.history.runs(tab_id=self.tab_id)
+        source_runs = self.history.runs(source_hash=self.source_hash)
+
+        self.ui_stats_label.setText('\n'.join(self.stats_lines(runs, source_runs)))
+        self.fill_table(runs)
+
+    def stats_lines(self, runs, source_runs):
+        """
+        :param runs: [runHistory.RunRecord]. runs of the chosen scope
+        :param source_runs: [runHistory.RunRecord]. runs of the current source
+        :return: [str]. summary lines
+        """
+        lines = ['{} runs, {} of the current source'.format(len(runs), len(source_runs))]
+        stats = runHistory.summarize(runs)
+        if stats is not None:
+            lines.append(
+                'Wall time of the {} successful runs: p50 {:.4f}s  p90 {:.4f}s  '
+                'p95 {:.4f}s  best {:.4f}s  worst {:.4f}s'.format(
+                    stats.count, stats.p50, stats.p90, stats.p95,
+                    stats.best, stats.worst))
+
+        trend = [run.wall_time for run in runs if run.status == 'ok'][-TREND_RUNS:]
+        if len(trend) > 1:
+            lines.append(u'Trend of the last {} runs: {}'.format(
+                len(trend), runHistory.sparkline(trend)))
+
+        ratio = runHistory.regression(source_runs)
+        if ratio is not None:
+            lines.append('Regression: the last run of the current source took '
+                         '{:.2f}x the median of the previous runs'.format(ratio))
+        return lines
+
+    def fill_table(self, runs):
+        """
+        :param runs: [runHistory.RunRecord]. runs to list, the latest first
+        """
+        table = self.ui_run_table
+        table.setSortingEnabled(False)
+        listed = runs[-MAX_LISTED:][::-1]
+        table.setRowCount(len(listed))
+
+        # runs slower than the median of the previous runs of their source
+        medians = dict()
+        for row, run in enumerate(listed):
+            if run.source_hash not in medians:
+                stats = runHistory.summarize(self.history.runs(source_hash=run.source_hash))
+                medians[run.source_hash] = stats.p50 if stats else None
+            median = medians[run.source_hash]
+
+            peak = run.peak_rss_delta
+            items = [
+                NumberItem(run.timestamp, time.strftime(
+                    '%Y-%m-%d %H:%M:%S', time.localtime(run.timestamp))),
+                NumberItem(run.wall_time, format_seconds(run.wall_time)),
+                NumberItem(run.cpu_time if run.cpu_time is not None else -1.0,
+                           format_seconds(run.cpu_time)),
+                NumberItem(peak if peak is not None else -1,
+                           '-' if peak is None else '{:.1f}'.format(peak / 1048576.0)),
+                NumberItem(run.line_count, str(run.line_count)),
+                NumberItem(run.error_line_count, str(run.error_line_count)),
+                QtWidgets.QTableWidgetItem(run.status),
+                QtWidgets.QTableWidgetItem(
+                    run.source_hash[:8] + (' (current)' if run.source_hash == self.source_hash else '')),
+            ]
+            slow = median is not None and run.status == 'ok' and \
+                run.wall_time > median * runHistory.REGRESSION_RATIO and \
+                run.wall_time - median > runHistory.REGRESSION_MIN_DELTA
+            for column, item in enumerate(items):
+                if slow:
+                    item.setForeground(REGRESSION_BRUSH)
+                table.setItem(row, column, item)
+
+        table.resizeColumnsToContents()
+        table.horizontalHeader().setSortIndicator(0, QtCore.Qt.DescendingOrder)
+        table.setSortingEnabled(True)
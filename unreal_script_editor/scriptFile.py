@@ -0,0 +1,282 @@
+"""
+Streamed reading and atomic writing of script files
+
+A script is decoded in chunks, each appended to the document of its tab,
+as many per event loop iteration as fit in a time budget. Appending to the
+document costs far more than decoding, so the chunks are small. The window
+keeps responding while a file of hundreds of megabytes opens, and its
+whole text is never held twice. Large files are
+memory mapped rather than read into memory.
+
+The encoding is found from a byte order mark, then from a PEP 263 coding
+comment, then by decoding the start of the file as utf-8. A file which
+turns out not to be utf-8 further on is loaded again as latin-1, which
+decodes any byte.
+"""
+
+import codecs
+import io
+import os
+import re
+import time
+
+from Qt import QtCore
+
+from . import fileIO
+
+
+# number of bytes decoded, or characters encoded, at once
+CHUNK_SIZE = 128 * 1024
+
+# seconds of loading per event loop iteration
+SLICE_TIME = 0.015
+
+# size from which a file is memory mapped
+MMAP_THRESHOLD = 32 * 1024 * 1024
+
+# number of bytes the encoding is detected from
+SAMPLE_SIZE = 64 * 1024
+
+DEFAULT_ENCODING = 'utf-8'
+FALLBACK_ENCODING = 'latin-1'
+
+# longest first, utf-32 little endian starts with the utf-16 one
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+CODING_COOKIE = re.compile(br'^[ \t\f]*#.*?coding[:=][ \t]*([-\w.]+)')
+
+
+def detect_encoding(head):
+    """
+    :param head: bytes. start of a file
+    :return: str. encoding of the file
+    """
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+
+    for line in head.splitlines()[:2]:
+        match = CODING_COOKIE.match(line)
+        if match:
+            try:
+                return codecs.lookup(match.group(1).decode('ascii')).name
+            except LookupError:
+                break
+
+    try:
+        # a multi-byte sequence may be cut at the end of the sample
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+    return DEFAULT_ENCODING
+
+
+def line_ending(newlines):
+    """
+    :param newlines: str or tuple. line endings found by an
+                     io.IncrementalNewlineDecoder
+    :return: str. line ending to save the file with, None if it has a
+             single line
+    """
+    if isinstance(newlines, tuple):
+        # mixed line endings are saved as one of them
+        return '\r\n' if '\r\n' in newlines else '\n'
+    return newlines
+
+
+def read_script(path):
+    """
+    Read a whole script, e.g. to reload a file already opened
+
+    :param path: str. script file
+    :return: (str, str, str). text with '\n' line endings, encoding and
+             line ending of the file
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    encoding = detect_encoding(data[:SAMPLE_SIZE])
+    try:
+        decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder(encoding)(), translate=True)
+        text = decoder.decode(data, final=True)
+    except UnicodeDecodeError:
+        encoding = FALLBACK_ENCODING
+        decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder(encoding)(), translate=True)
+        text = decoder.decode(data, final=True)
+    return text, encoding, line_ending(decoder.newlines)
+
+
+def write_script(path, text, encoding=DEFAULT_ENCODING, newline=None):
+    """
+    Write a script atomically, encoded chunk by chunk into a temporary file
+    which then replaces the target
+
+    :param path: str. file path
+    :param text: str. script, with '\\n' line endings
+    :param encoding: str. encoding of the file
+    :param newline: str. line ending of the file, the platform one if None
+    """
+    newline = newline or os.linesep
+    encoder = codecs.getincrementalencoder(encoding)()
+    with fileIO.atomic_file(path) as f:
+        for start in range(0, len(text), CHUNK_SIZE):
+            chunk = text[start:start + CHUNK_SIZE]
+            if newline != '\n':
+                chunk = chunk.replace('\n', newline)
+            f.write(encoder.encode(chunk))
+        f.write(encoder.encode('', final=True))
+
+
+class ScriptLoader(QtCore.QObject):
+    """
+    Progressive decoding of a script file, one time slice per event loop
+    iteration
+    """
+    loaded = QtCore.Signal(str)
+    # fraction of the file loaded
+    progress = QtCore.Signal(float)
+    # the text loaded so far is discarded, the file loads again
+    restarted = QtCore.Signal()
+    finished = QtCore.Signal(bool)
+
+    def __init__(self, path, parent=None):
+        """
+        Initialization
+
+        :param path: str. script file
+        :param parent: QObject. parent object
+        """
+        super(ScriptLoader, self).__init__(parent)
+        self.path = path
+        self.size = 0
+        self.position = 0
+        self.encoding = None
+        # line ending of the file, None if it has a single line
+        self.newline = None
+        # message of the error which stopped the load
+        self.error = None
+        self.elapsed = 0.0
+
+        self._file = None
+        self._map = None
+        self._decoder = None
+        self._done = False
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.step)
+
+    def start(self):
+        """
+        Open the file and detect its encoding, the text is then loaded
+        from the event loop
+
+        :raise IOError: if the file cannot be opened
+        """
+        self._file = open(self.path, 'rb')
+        try:
+            self.size = os.fstat(self._file.fileno()).st_size
+            if self.size >= MMAP_THRESHOLD:
+                import mmap
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                head = self._map[:SAMPLE_SIZE]
+            else:
+                head = self._file.read(SAMPLE_SIZE)
+                self._file.seek(0)
+        except BaseException:
+            self.close()
+            raise
+
+        self.reset(detect_encoding(head))
+        self._timer.start()
+
+    def reset(self, encoding):
+        """
+        :param encoding: str. encoding to decode the file with, from its start
+        """
+        self.encoding = encoding
+        self.position = 0
+        if self._map is None:
+            self._file.seek(0)
+        # universal newlines, a '\r\n' may be cut between two chunks
+        self._decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder(encoding)(), translate=True)
+
+    def is_running(self):
+        return self._file is not None and not self._done
+
+    def cancel(self):
+        """
+        Stop the load, the text loaded so far is incomplete
+        """
+        if not self._done:
+            self.finish(False)
+
+    def read_chunk(self):
+        """
+        :return: bytes. next chunk of the file, empty at its end
+        """
+        if self._map is not None:
+            chunk = self._map[self.position:self.position + CHUNK_SIZE]
+        else:
+            chunk = self._file.read(CHUNK_SIZE)
+        self.position += len(chunk)
+        return chunk
+
+    def step(self):
+        """
+        Decode and report chunks until the slice budget is spent
+        """
+        started = time.perf_counter()
+        deadline = started + SLICE_TIME
+        completed = False
+        try:
+            while time.perf_counter() < deadline:
+                chunk = self.read_chunk()
+                text = self._decoder.decode(chunk, final=not chunk)
+                if text:
+                    self.loaded.emit(text)
+                if not chunk:
+                    completed = True
+                    break
+        except UnicodeDecodeError:
+            self.elapsed += time.perf_counter() - started
+            if self.encoding == FALLBACK_ENCODING:
+                raise
+            self.reset(FALLBACK_ENCODING)
+            self.restarted.emit()
+            return
+        except (IOError, OSError, ValueError) as error:
+            self.error = str(error)
+            self.elapsed += time.perf_counter() - started
+            self.finish(False)
+            return
+
+        self.elapsed += time.perf_counter() - started
+        if completed:
+            self.newline = line_ending(self._decoder.newlines)
+            self.finish(True)
+        else:
+            self.progress.emit(float(self.position) / self.size if self.size else 1.0)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def finish(self, completed):
+        self._timer.stop()
+        self._done = True
+        self.close()
+        self.finished.emit(completed)
@@ -0,0 +1,412 @@
+"""
+Lazily materialized python script tab
+
+A restored tab only holds its text until it is first shown, the code
+editor and its highlighter are built on activation. Tabs not used for a
+while are turned back into plain text to keep the editor memory under a
+budget (see ``trim``).
+"""
+
+import time
+
+from Qt import QtCore, QtGui, QtWidgets
+
+# the outline, the syntax checker and the search are imported at first use
+from . import fileWatch, scriptFile, sessionStore
+from .codeEditor import codeEditor
+from .codeEditor.highlighter import pyHighlight, lazyHighlight
+
+
+# maximum number of tabs holding a code editor at once
+MAX_MATERIALIZED = 8
+
+# maximum total number of characters held by materialized tabs
+MAX_MATERIALIZED_CHARS = 8 * 1024 * 1024
+
+
+class ScriptTab(QtWidgets.QWidget):
+    """
+    Tab page holding either the text of a script or its code editor
+
+    The symbol outline of the tab is kept when its editor is released.
+    """
+    changed = QtCore.Signal(object)
+    outline_changed = QtCore.Signal(object)
+    # symbols parsed in the worker thread, queued to the GUI thread
+    outlined = QtCore.Signal(object)
+
+    def __init__(self, command='', tab_id=None, completion=None, parent=None):
+        """
+        Initialization
+
+        :param command: str. python script of the tab
+        :param tab_id: str. session id of the tab, a new one if None
+        :param completion: callable. completion provider of the editor
+        :param parent: QWidget. parent widget
+        """
+        super(ScriptTab, self).__init__(parent)
+        self.tab_id = tab_id or sessionStore.new_tab_id()
+        self.completion = completion
+        self.last_used = 0.0
+
+        # file of the tab, its format, and its stat when last loaded or saved
+        self.path = None
+        self.file_stat = None
+        self.encoding = scriptFile.DEFAULT_ENCODING
+        self.newline = None
+        # streamed file, the tab is read-only until it is loaded
+        self.loader = None
+
+        self._text = command
+        # whether the text was edited since the file was loaded or saved
+        self._modified = False
+        self._editor = None
+        self._highlighter = None
+        self._checker = None
+
+        self.outline = None
+        self._outline_pending = False
+        self.outlined.connect(self.set_symbols)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+    def is_materialized(self):
+        return self._editor is not None
+
+    def editor(self):
+        """
+        :return: CodeEditor. code editor of the tab, built if needed
+        """
+        self.materialize()
+        return self._editor
+
+    def materialize(self):
+        """
+        Build the code editor and highlighter from the tab text
+        """
+        self.last_used = time.time()
+        if self._editor is not None:
+            return
+
+        editor = codeEditor.CodeEditor()
+        editor.setPlainText(self._text)
+        editor.document().setModified(self._modified)
+        self.layout().addWidget(editor)
+        self._editor = editor
+        self._text = None
+        self.attach_tools()
+
+    def attach_tools(self):
+        """
+        Track the changes of the editor, and build its highlighter and
+        syntax checker
+        """
+        editor = self._editor
+        editor.document().contentsChanged.connect(
+            lambda: self.changed.emit(self))
+        if self.completion is not None:
+            editor.set_completion_provider(self.completion)
+
+        # large documents are highlighted from the viewport outwards,
+        # tokenized in a worker thread
+        if editor.blockCount() > lazyHighlight.BLOCK_THRESHOLD:
+            self._highlighter = lazyHighlight.ThreadedPythonHighlighter(editor)
+        else:
+            self._highlighter = pyHighlight.PythonHighlighter(editor.document())
+
+        from . import syntaxChecker
+        self._checker = syntaxChecker.SyntaxChecker(editor)
+        self._checker.outlined.connect(self.set_symbols)
+
+    def load(self, loader):
+        """
+        Stream a file into the editor of the tab, which is highlighted and
+        editable once the file is loaded
+
+        :param loader: scriptFile.ScriptLoader. started load of the file
+        """
+        self.last_used = time.time()
+        editor = codeEditor.CodeEditor()
+        editor.setReadOnly(True)
+        editor.setUndoRedoEnabled(False)
+        self.layout().addWidget(editor)
+        self._editor = editor
+        self._text = None
+        self.outline = None
+
+        self.loader = loader
+        loader.loaded.connect(self.append_text)
+        loader.restarted.connect(editor.clear)
+        loader.finished.connect(self.end_load)
+
+    def append_text(self, text):
+        """
+        :param text: str. text loaded after the current end of the tab
+        """
+        cursor = QtGui.QTextCursor(self._editor.document())
+        cursor.movePosition(QtGui.QTextCursor.End)
+        cursor.insertText(text)
+
+    def end_load(self, completed):
+        """
+        :param completed: bool. whether the whole file was loaded, the tab
+                          is discarded otherwise
+        """
+        loader, self.loader = self.loader, None
+        if not completed:
+            return
+
+        self.encoding = loader.encoding
+        self.newline = loader.newline
+        editor = self._editor
+        editor.setUndoRedoEnabled(True)
+        editor.document().setModified(False)
+        editor.setReadOnly(False)
+        editor.moveCursor(QtGui.QTextCursor.Start)
+        self.attach_tools()
+        self.changed.emit(self)
+
+    def dematerialize(self):
+        """
+        Release the code editor, keeping only the tab text
+
+        The undo history of the tab is lost, see ``has_undo``.
+        """
+        if self._editor is None or self.loader is not None:
+            return
+
+        self._text = self._editor.toPlainText()
+        self._modified = self._editor.document().isModified()
+        self.layout().removeWidget(self._editor)
+        # the highlighter and checker are owned by the editor or its document
+        self._editor.deleteLater()
+        self._editor = None
+        self._highlighter = None
+        self._checker = None
+
+    def has_undo(self):
+        """
+        :return: bool. whether the editor of the tab has undo steps, which
+                 would be lost by dematerializing it
+        """
+        return self._editor is not None and self._editor.document().isUndoAvailable()
+
+    def text_length(self):
+        """
+        :return: int. number of characters of the tab text
+        """
+        if self._editor is None:
+            return len(self._text)
+        return self._editor.document().characterCount()
+
+    def toPlainText(self):
+        if self._editor is None:
+            return self._text
+        return self._editor.toPlainText()
+
+    def setPlainText(self, text):
+        """
+        Replace the text of the tab, which is only marked modified if the
+        text changed; an editor keeps its undo history, the replacement
+        being a single undo step
+
+        :param text: str. new text
+        """
+        if text == self.toPlainText():
+            return
+
+        if self._editor is None:
+            self._text = text
+            self._modified = True
+            self.outline = None
+            self.changed.emit(self)
+        else:
+            cursor = QtGui.QTextCursor(self._editor.document())
+            cursor.select(QtGui.QTextCursor.Document)
+            cursor.insertText(text)
+
+    def is_modified(self):
+        """
+        :return: bool. whether the text was edited since the file of the
+                 tab was loaded or saved
+        """
+        if self._editor is None:
+            return self._modified
+        return self._editor.document().isModified()
+
+    def set_modified(self, modified):
+        """
+        :param modified: bool. whether the text differs from the file
+        """
+        if self._editor is None:
+            self._modified = modified
+        else:
+            self._editor.document().setModified(modified)
+
+    def reload_text(self, text):
+        """
+        Replace the text by a new version of the tab file
+
+        :param text: str. text of the file
+        """
+        self.replace_text(text)
+        self.set_modified(False)
+
+    def replace_text(self, text):
+        """
+        Replace the text, editing only the lines which differ, as a single
+        undo step
+
+        :param text: str. new text
+        """
+        if self._editor is None:
+            self.setPlainText(text)
+            return
+
+        editor = self._editor
+        scroll = editor.verticalScrollBar().value()
+        ranges = fileWatch.changed_ranges(
+            editor.toPlainText().split('\n'), text.split('\n'))
+        fileWatch.apply_ranges(editor.document(), ranges)
+        editor.verticalScrollBar().setValue(scroll)
+
+    def set_symbols(self, symbols):
+        """
+        Update the outline of the tab
+
+        :param symbols: [outline.Symbol]. symbols of the script, the
+                        outline is kept as is if None
+        """
+        self._outline_pending = False
+        if symbols is None:
+            return
+
+        from . import outline
+        new_outline = outline.Outline(symbols)
+        if new_outline != self.outline:
+            self.outline = new_outline
+            self.outline_changed.emit(self)
+
+    def request_outline(self):
+        """
+        Parse the outline of a tab without editor in the background, the
+        editor of a materialized tab keeps it up to date
+        """
+        if self.outline is not None or self._outline_pending or \
+                self._editor is not None:
+            return
+
+        from . import outline, syntaxChecker
+
+        self._outline_pending = True
+        future = syntaxChecker.worker().submit(
+            outline.parse_symbols, self._text)
+        future.add_done_callback(self.emit_outlined)
+
+    def emit_outlined(self, future):
+        """
+        Report the symbols parsed in the background, from the worker thread
+
+        :param future: concurrent.futures.Future. finished parse
+        """
+        try:
+            self.outlined.emit(None if future.exception() else future.result())
+        except RuntimeError:
+            # the tab was deleted meanwhile
+            pass
+
+    def go_to_line(self, line):
+        """
+        Move the cursor to the start of a line and scroll it into view
+
+        :param line: int. line (block) number, 0 based
+        """
+        editor = self.editor()
+        block = editor.document().findBlockByNumber(line)
+        if not block.isValid():
+            block = editor.document().lastBlock()
+        editor.setTextCursor(QtGui.QTextCursor(block))
+        editor.centerCursor()
+        editor.setFocus()
+
+    def select_text(self, line, column, length):
+        """
+        Select a span of a line and scroll it into view
+
+        :param line: int. line (block) number, 0 based
+        :param column: int. index of the span within the line
+        :param length: int. number of characters of the span
+        """
+        editor = self.editor()
+        block = editor.document().findBlockByNumber(line)
+        if not block.isValid():
+            return
+
+        text = block.text()
+        start = block.position() + codeEditor.utf16_length(text[:column])
+        cursor = QtGui.QTextCursor(block)
+        cursor.setPosition(start)
+        cursor.setPosition(
+            start + codeEditor.utf16_length(text[column:column + length]),
+            QtGui.QTextCursor.KeepAnchor)
+        editor.setTextCursor(cursor)
+        editor.centerCursor()
+
+    def replace_hits(self, text, hits):
+        """
+        Apply the replacements found in a snapshot of the tab text, as a
+        single undo step
+
+        :param text: str. text the hits were found in
+        :param hits: [search.Hit]. matches in order, with their replacement
+        :return: bool. whether they were applied, False if the tab changed
+                 since the snapshot
+        """
+        from . import search
+
+        if self._editor is None:
+            if self._text != text:
+                return False
+            self.setPlainText(search.splice(text, hits))
+            return True
+
+        if self._editor.toPlainText() != text:
+            return False
+        search.replace_in_document(self._editor.document(), text, hits)
+        return True
+
+
+def trim(tabs, keep=None, max_tabs=MAX_MATERIALIZED,
+         max_chars=MAX_MATERIALIZED_CHARS):
+    """
+    Dematerialize the least recently used tabs until the materialized ones
+    fit in the budget
+
+    Tabs with undo steps are kept, even over the budget, so their undo
+    history is never discarded behind the user's back.
+
+    :param tabs: [ScriptTab]. script tabs
+    :param keep: ScriptTab. tab never dematerialized, e.g. the current one
+    :param max_tabs: int. maximum number of materialized tabs
+    :param max_chars: int. maximum number of characters they hold
+    :return: [ScriptTab]. dematerialized tabs
+    """
+    materialized = sorted(
+        (tab for tab in tabs if tab.is_materialized()),
+        key=lambda tab: tab.last_used)
+    count = len(materialized)
+    chars = sum(tab.text_length() for tab in materialized)
+
+    released = list()
+    for tab in materialized:
+        if count <= max_tabs and chars <= max_chars:
+            break
+        if tab is keep or tab.loader is not None or tab.has_undo():
+            continue
+
+        chars -= tab.text_length()
+        count -= 1
+        tab.dematerialize()
+        released.append(tab)
+    return released
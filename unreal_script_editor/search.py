@@ -0,0 +1,365 @@
+"""
+Find and replace across the script tabs and the output log
+
+A search scans a snapshot of each source in chunks of whole lines, as many
+chunks per event loop iteration as fit in a time budget, so the GUI keeps
+responding while dozens of large tabs are searched, and the hits of each
+slice are streamed to the results as they are found. A match never spans
+two chunks, and empty matches are ignored.
+
+A replace-all runs the same scan and applies the replacements of a tab
+as soon as it is scanned, as a single undo step.
+"""
+
+import bisect
+import collections
+import re
+import time
+from array import array
+
+from Qt import QtCore, QtGui
+
+from . import logStore
+from .codeEditor.codeEditor import utf16_length
+
+
+# number of characters scanned at once, rounded up to whole lines
+CHUNK_SIZE = 256 * 1024
+
+# seconds of scanning per event loop iteration
+SLICE_TIME = 0.015
+
+# number of characters of the line shown before a hit, and in total
+PREVIEW_CONTEXT = 40
+MAX_PREVIEW = 200
+
+
+class Hit(collections.namedtuple(
+        'Hit', ['line', 'column', 'length', 'position', 'preview', 'replacement'])):
+    """
+    Match found in a source
+
+    :param line: int. line of the match, 0 based, the entry id for the log
+    :param column: int. column of the match within the line
+    :param length: int. number of characters matched
+    :param position: int. index of the match within the source text
+    :param preview: str. text of the line around the match
+    :param replacement: str. text replacing the match, None when searching
+    """
+    __slots__ = ()
+
+
+class Query(object):
+    """
+    Literal or regular expression search
+    """
+
+    def __init__(self, text, regex=False, case_sensitive=False, whole_word=False):
+        """
+        Initialization
+
+        :param text: str. searched text or pattern
+        :param regex: bool. whether the text is a regular expression
+        :param case_sensitive: bool. whether the case has to match
+        :param whole_word: bool. whether matches have to be whole words
+        :raise re.error: if the regular expression is invalid
+        """
+        self.text = text
+        self.regex = regex
+
+        pattern = text if regex else re.escape(text)
+        if whole_word:
+            pattern = r'\b(?:{})\b'.format(pattern)
+        flags = re.MULTILINE
+        if not case_sensitive:
+            flags |= re.IGNORECASE
+        self.pattern = re.compile(pattern, flags)
+
+    def expand(self, match, replacement):
+        """
+        :param match: re.Match. match to replace
+        :param replacement: str. replacement, group references such as
+                            \\1 are expanded for regular expressions
+        :return: str. text replacing the match
+        """
+        if self.regex and '\\' in replacement:
+            return match.expand(replacement)
+        return replacement
+
+
+def text_chunks(text, size=CHUNK_SIZE):
+    """
+    Split a text into chunks of whole lines
+
+    :param text: str. text to split
+    :param size: int. minimum number of characters per chunk
+    :return: generator. (position, first line, chunk) of each chunk
+    """
+    position = 0
+    line = 0
+    while position < len(text):
+        end = text.find('\n', position + size)
+        end = len(text) if end < 0 else end + 1
+        chunk = text[position:end]
+        yield position, line, chunk
+        line += chunk.count('\n')
+        position = end
+
+
+def log_chunks(data, offsets, size=CHUNK_SIZE):
+    """
+    Split the entries of a log snapshot into chunks, decoded one at a time
+
+    :param data: bytes. line break terminated utf-8 entries
+    :param offsets: array. byte offset of each entry
+    :param size: int. minimum number of bytes per chunk
+    :return: generator. (0, first entry id, chunk) of each chunk
+    """
+    entry_id = 0
+    while entry_id < len(offsets):
+        start = offsets[entry_id]
+        stop = max(bisect.bisect_left(offsets, start + size, entry_id), entry_id + 1)
+        end = offsets[stop] if stop < len(offsets) else len(data)
+        yield 0, entry_id, data[start:end].decode(logStore.ENCODING, 'replace')
+        entry_id = stop
+
+
+def chunk_hits(query, chunk, position, line, replacement=None):
+    """
+    Find the matches of a query in a chunk
+
+    :param query: Query. search
+    :param chunk: str. chunk of whole lines
+    :param position: int. index of the chunk within its source
+    :param line: int. line of the chunk within its source
+    :param replacement: str. replacement of the matches, if replacing
+    :return: [Hit]. matches in order
+    """
+    hits = list()
+    last = 0
+    for match in query.pattern.finditer(chunk):
+        start, end = match.span()
+        if start == end:
+            continue
+
+        line += chunk.count('\n', last, start)
+        last = start
+        line_start = chunk.rfind('\n', 0, start) + 1
+        line_end = chunk.find('\n', start)
+        if line_end < 0:
+            line_end = len(chunk)
+
+        preview_start = max(line_start, start - PREVIEW_CONTEXT)
+        preview = chunk[preview_start:min(line_end, preview_start + MAX_PREVIEW)]
+        hits.append(Hit(
+            line, start - line_start, end - start, position + start,
+            preview.strip(),
+            None if replacement is None else query.expand(match, replacement)))
+    return hits
+
+
+def splice(text, hits):
+    """
+    :param text: str. source text
+    :param hits: [Hit]. matches in order, with their replacement
+    :return: str. text with the matches replaced
+    """
+    pieces = list()
+    position = 0
+    for hit in hits:
+        pieces.append(text[position:hit.position])
+        pieces.append(hit.replacement)
+        position = hit.position + hit.length
+    pieces.append(text[position:])
+    return ''.join(pieces)
+
+
+def replace_in_document(document, text, hits):
+    """
+    Replace matches in a document as a single undo step, the rest of the
+    document, its blocks and their formats, being left untouched
+
+    :param document: QTextDocument. document holding the text
+    :param text: str. current plain text of the document
+    :param hits: [Hit]. matches in order, with their replacement
+    """
+    # document positions count utf-16 code units, python indices do not
+    if text.isascii():
+        spans = [(hit.position, hit.length) for hit in hits]
+    else:
+        spans = list()
+        offset = 0
+        last = 0
+        for hit in hits:
+            offset += utf16_length(text[last:hit.position])
+            length = utf16_length(text[hit.position:hit.position + hit.length])
+            spans.append((offset, length))
+            offset += length
+            last = hit.position + hit.length
+
+    cursor = QtGui.QTextCursor(document)
+    cursor.beginEditBlock()
+    # from the end, so the positions of the previous hits hold
+    for hit, (start, length) in zip(reversed(hits), reversed(spans)):
+        cursor.setPosition(start)
+        cursor.setPosition(start + length, QtGui.QTextCursor.KeepAnchor)
+        cursor.insertText(hit.replacement)
+    cursor.endEditBlock()
+
+
+class TextSource(object):
+    """
+    Searched text, e.g. a script tab
+    """
+
+    def __init__(self, key, label, get_text):
+        """
+        Initialization
+
+        :param key: object. searched object, e.g. a ScriptTab
+        :param label: str. name shown in the results
+        :param get_text: callable. returns the current text
+        """
+        self.key = key
+        self.label = label
+        self._get_text = get_text
+        self.text = None
+
+    def chunks(self):
+        """
+        :return: generator. chunks of a snapshot of the text, see text_chunks
+        """
+        self.text = self._get_text()
+        return text_chunks(self.text)
+
+
+class LogSource(object):
+    """
+    Searched output log, the line of its hits is an entry id
+    """
+
+    def __init__(self, key, label, store):
+        """
+        Initialization
+
+        :param key: object. searched object, e.g. the OutputTextWidget
+        :param label: str. name shown in the results
+        :param store: logStore.LogStore. log storage
+        """
+        self.key = key
+        self.label = label
+        self.store = store
+        self.evicted = store.evicted
+
+    def chunks(self):
+        """
+        :return: generator. chunks of a snapshot of the log, see log_chunks
+        """
+        self.evicted = self.store.evicted
+        return log_chunks(bytes(self.store.data), array('Q', self.store.offsets))
+
+    def entry_id(self, hit):
+        """
+        :param hit: Hit. hit found in the log
+        :return: int. current id of the entry of the hit, None if evicted
+        """
+        entry_id = hit.line - (self.store.evicted - self.evicted)
+        return entry_id if entry_id >= 0 else None
+
+
+class SearchTask(QtCore.QObject):
+    """
+    Time sliced search of sources, in the GUI thread
+    """
+    found = QtCore.Signal(object, object)
+    source_done = QtCore.Signal(object)
+    finished = QtCore.Signal(bool)
+
+    def __init__(self, query, sources, replacement=None, parent=None):
+        """
+        Initialization
+
+        :param query: Query. search
+        :param sources: [TextSource or LogSource]. sources, scanned in order
+        :param replacement: str. replacement of the matches, if replacing
+        :param parent: QObject. parent object
+        """
+        super(SearchTask, self).__init__(parent)
+        self.query = query
+        self.sources = list(sources)
+        self.replacement = replacement
+        # hits of every scanned source
+        self.results = collections.OrderedDict()
+        self.hit_count = 0
+        self.elapsed = 0.0
+
+        self._index = -1
+        self._chunks = iter(())
+        self._done = False
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.step)
+
+    def start(self):
+        self._timer.start()
+
+    def cancel(self):
+        """
+        Stop the scan, the hits found so far are kept
+        """
+        if not self._done:
+            self.finish(False)
+
+    def is_running(self):
+        return not self._done
+
+    def source(self):
+        return self.sources[self._index]
+
+    def step(self):
+        """
+        Scan chunks until the slice budget is spent, then report the hits
+        """
+        started = time.perf_counter()
+        deadline = started + SLICE_TIME
+        hits = list()
+        while time.perf_counter() < deadline:
+            chunk = next(self._chunks, None)
+            if chunk is not None:
+                position, line, text = chunk
+                hits.extend(chunk_hits(
+                    self.query, text, position, line, self.replacement))
+                continue
+
+            if self._index >= 0:
+                self.report(hits)
+                hits = list()
+                self.source_done.emit(self.source())
+
+            self._index += 1
+            if self._index >= len(self.sources):
+                self.elapsed += time.perf_counter() - started
+                self.finish(True)
+                return
+            self.results[self.source()] = list()
+            self._chunks = self.source().chunks()
+
+        self.report(hits)
+        self.elapsed += time.perf_counter() - started
+
+    def report(self, hits):
+        """
+        :param hits: [Hit]. hits found in the current source since the
+                     last report
+        """
+        if not hits:
+            return
+        self.results[self.source()].extend(hits)
+        self.hit_count += len(hits)
+        self.found.emit(self.source(), hits)
+
+    def finish(self, completed):
+        self._timer.stop()
+        self._done = True
+        self.finished.emit(completed)
@@ -0,0 +1,184 @@
+"""
+Find and replace panel, listing the hits streamed by a search.SearchTask
+"""
+
+import re
+
+from Qt import QtWidgets, QtCore
+
+
+# role storing the hit index of an item within its source
+HIT_ROLE = QtCore.Qt.UserRole
+
+# maximum number of hits listed, the others are only counted
+MAX_LISTED = 5000
+
+
+class SearchPanel(QtWidgets.QWidget):
+    """
+    Query fields, options and results of a search across the tabs
+    """
+    search_requested = QtCore.Signal()
+    replace_requested = QtCore.Signal()
+    hit_activated = QtCore.Signal(object, object)
+
+    def __init__(self, parent=None):
+        """
+        Initialization
+        """
+        super(SearchPanel, self).__init__(parent)
+
+        self.ui_find_edit = QtWidgets.QLineEdit()
+        self.ui_find_edit.setPlaceholderText('find')
+        self.ui_replace_edit = QtWidgets.QLineEdit()
+        self.ui_replace_edit.setPlaceholderText('replace with')
+
+        self.ui_regex_check = QtWidgets.QCheckBox('Regex')
+        self.ui_case_check = QtWidgets.QCheckBox('Match case')
+        self.ui_word_check = QtWidgets.QCheckBox('Whole word')
+        self.ui_log_check = QtWidgets.QCheckBox('Output log')
+        self.ui_log_check.setChecked(True)
+
+        self.ui_find_btn = QtWidgets.QPushButton('Find All')
+        self.ui_replace_btn = QtWidgets.QPushButton('Replace All')
+        self.ui_stop_btn = QtWidgets.QPushButton('Stop')
+        self.ui_stop_btn.setEnabled(False)
+
+        self.ui_status_label = QtWidgets.QLabel()
+        self.ui_result_tree = QtWidgets.QTreeWidget()
+        self.ui_result_tree.setHeaderHidden(True)
+        self.ui_result_tree.setUniformRowHeights(True)
+
+        options = QtWidgets.QHBoxLayout()
+        for widget in (self.ui_regex_check, self.ui_case_check,
+                       self.ui_word_check, self.ui_log_check):
+            options.addWidget(widget)
+        options.addStretch()
+
+        buttons = QtWidgets.QHBoxLayout()
+        for widget in (self.ui_find_btn, self.ui_replace_btn, self.ui_stop_btn):
+            buttons.addWidget(widget)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self.ui_find_edit)
+        layout.addWidget(self.ui_replace_edit)
+        layout.addLayout(options)
+        layout.addLayout(buttons)
+        layout.addWidget(self.ui_status_label)
+        layout.addWidget(self.ui_result_tree)
+
+        self.task = None
+        self._source_items = dict()
+        self._listed = 0
+
+        self.ui_find_edit.returnPressed.connect(self.search_requested)
+        self.ui_find_btn.clicked.connect(self.search_requested)
+        self.ui_replace_btn.clicked.connect(self.replace_requested)
+        self.ui_stop_btn.clicked.connect(self.cancel)
+        self.ui_result_tree.itemActivated.connect(self.on_item_activated)
+        self.ui_result_tree.itemClicked.connect(self.on_item_activated)
+
+    def query(self):
+        """
+        :return: search.Query. query of the fields, None if empty or invalid
+        """
+        text = self.ui_find_edit.text()
+        if not text:
+            return None
+
+        from . import search
+        try:
+            return search.Query(
+                text,
+                regex=self.ui_regex_check.isChecked(),
+                case_sensitive=self.ui_case_check.isChecked(),
+                whole_word=self.ui_word_check.isChecked())
+        except re.error as error:
+            self.ui_status_label.setText('Invalid pattern: {}'.format(error))
+            return None
+
+    def replacement(self):
+        return self.ui_replace_edit.text()
+
+    def include_log(self):
+        return self.ui_log_check.isChecked()
+
+    def run(self, task):
+        """
+        Cancel the running search and list the hits of a new one
+
+        :param task: search.SearchTask. search to run
+        """
+        self.cancel()
+        self.task = task
+        self._source_items = dict()
+        self._listed = 0
+        self.ui_result_tree.clear()
+        self.ui_status_label.setText('Searching...')
+        self.ui_stop_btn.setEnabled(True)
+
+        task.found.connect(self.on_found)
+        task.finished.connect(self.on_finished)
+        task.start()
+
+    def cancel(self):
+        if self.task is not None:
+            self.task.cancel()
+
+    def on_found(self, source, hits):
+        """
+        List a batch of hits under the item of their source
+
+        :param source: search.TextSource or search.LogSource. searched source
+        :param hits: [search.Hit]. new hits of the source
+        """
+        item = self._source_items.get(source)
+        if item is None:
+            item = QtWidgets.QTreeWidgetItem([source.label])
+            self.ui_result_tree.addTopLevelItem(item)
+            item.setExpanded(True)
+            self._source_items[source] = item
+
+        first = len(self.task.results[source]) - len(hits)
+        count = min(len(hits), MAX_LISTED - self._listed)
+        children = list()
+        for index in range(count):
+            hit = hits[index]
+            child = QtWidgets.QTreeWidgetItem(
+                ['{}: {}'.format(hit.line + 1, hit.preview)])
+            child.setData(0, HIT_ROLE, first + index)
+            children.append(child)
+        item.addChildren(children)
+        self._listed += count
+
+        item.setText(0, '{} ({})'.format(
+            source.label, len(self.task.results[source])))
+        self.update_status()
+
+    def on_finished(self, completed):
+        self.ui_stop_btn.setEnabled(False)
+        self.update_status(completed)
+
+    def update_status(self, completed=None):
+        """
+        :param completed: bool. whether the search ended, None while running
+        """
+        task = self.task
+        text = '{} hits in {} sources'.format(
+            task.hit_count, sum(1 for hits in task.results.values() if hits))
+        if task.hit_count > self._listed:
+            text += ', {} listed'.format(self._listed)
+        if completed is not None:
+            text += ' ({:.2f}s{})'.format(
+                task.elapsed, '' if completed else ', stopped')
+        self.ui_status_label.setText(text)
+
+    def on_item_activated(self, item):
+        parent = item.parent()
+        if parent is None:
+            return
+
+        source = next(source for source, source_item in self._source_items.items()
+                      if source_item is parent)
+        self.hit_activated.emit(
+            source, self.task.results[source][item.data(0, HIT_ROLE)])
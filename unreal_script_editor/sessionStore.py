@@ -0,0 +1,248 @@
+"""
+Incremental, crash-safe persistence of the script tabs
+
+A session is a directory holding ``index.json``, the ordered list of tabs
+with their labels, and one ``tabs/<tab id>.py`` file per tab. Only the
+tabs whose text changed are written, every file is replaced atomically
+and writes are serialized by an inter-process lock, so several editor
+instances can share the session directory: a save keeps the tabs of the
+other instances in the index, and only removes the files of the tabs this
+instance closed.
+
+A session which cannot be read is moved aside, never overwritten, and
+nothing is written until a session was loaded or moved aside.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from . import fileIO
+
+
+LOGGER = logging.getLogger(__name__)
+
+VERSION = 1
+ENCODING = 'utf-8'
+
+
+def new_tab_id():
+    """
+    :return: str. unique id of a new tab
+    """
+    return uuid.uuid4().hex
+
+
+class SessionStore(object):
+    """
+    Session directory reader and writer
+    """
+
+    def __init__(self, path):
+        """
+        Initialization
+
+        :param path: str. session directory
+        """
+        self.path = path
+        self.index_path = os.path.join(path, 'index.json')
+        self.tabs_path = os.path.join(path, 'tabs')
+        self.lock_path = os.path.join(path, '.lock')
+
+        # thread of the background saves, started on the first one
+        self._executor = None
+        self._pending = None
+        # texts whose write failed, retried on the next save
+        self._unsaved = dict()
+        self._lock = threading.Lock()
+        # tabs loaded or saved by this instance, the files of the other
+        # tabs belong to other instances
+        self._owned = set()
+        # an existing session is only written once it was loaded
+        self.writable = not self.exists()
+
+    def exists(self):
+        return os.path.exists(self.index_path)
+
+    def tab_path(self, tab_id):
+        """
+        :param tab_id: str. tab id
+        :return: str. path of the tab text file
+        """
+        return os.path.join(self.tabs_path, '{}.py'.format(tab_id))
+
+    def read_index(self):
+        """
+        :return: [dict]. tab entries of the index, in order
+        :raise IOError, OSError: if the index cannot be read
+        :raise ValueError: if the index is damaged
+        """
+        with open(self.index_path, 'rb') as f:
+            index = json.loads(f.read().decode(ENCODING))
+        entries = index.get('tabs') if isinstance(index, dict) else None
+        if not isinstance(entries, list) or not all(
+                isinstance(entry, dict) and 'tab_id' in entry and 'label' in entry
+                for entry in entries):
+            raise ValueError('invalid session index {}'.format(self.index_path))
+        return entries
+
+    def load(self):
+        """
+        Read the session and clean up tab files no tab refers to
+
+        :return: [dict]. tab entries in order, with 'tab_id', 'label',
+                 'active' and 'command' keys
+        :raise IOError, OSError: if the index cannot be read
+        :raise ValueError: if the index is damaged
+        """
+        with fileIO.FileLock(self.lock_path):
+            entries = self.read_index()
+            tabs = list()
+            for entry in entries:
+                try:
+                    with open(self.tab_path(entry['tab_id']), 'rb') as f:
+                        command = f.read().decode(ENCODING)
+                except (IOError, OSError, UnicodeDecodeError):
+                    LOGGER.warning('missing text of tab %s', entry.get('label'))
+                    command = ''
+                entry = dict(entry)
+                entry.setdefault('active', False)
+                entry['command'] = command
+                tabs.append(entry)
+
+            self.clean(entry['tab_id'] for entry in tabs)
+
+        self._owned.update(entry['tab_id'] for entry in tabs)
+        self.writable = True
+        return tabs
+
+    def move_aside(self):
+        """
+        Rename a session which cannot be loaded, so it is kept for recovery
+        and a new session starts next to it
+
+        :return: str. new path of the session, None if it could not be moved
+        """
+        backup = '{}.broken-{}'.format(self.path, time.strftime('%Y%m%d-%H%M%S'))
+        try:
+            os.rename(self.path, backup)
+        except OSError:
+            LOGGER.exception('failed to move the session %s aside, it will not '
+                             'be saved', self.path)
+            return None
+        self.writable = True
+        return backup
+
+    def clean(self, tab_ids):
+        """
+        Remove the tab files which are not part of the session, the
+        store lock being held
+
+        :param tab_ids: [str]. ids of the session tabs
+        """
+        if not os.path.isdir(self.tabs_path):
+            return
+
+        names = set('{}.py'.format(tab_id) for tab_id in tab_ids)
+        for name in os.listdir(self.tabs_path):
+            if name.endswith('.py') and name not in names:
+                try:
+                    os.remove(os.path.join(self.tabs_path, name))
+                except OSError:
+                    pass
+
+    def missing(self, tab_ids):
+        """
+        Get the tabs without a text file, e.g. cleaned up by another
+        instance, which have to be written even if unchanged
+
+        :param tab_ids: [str]. tab ids
+        :return: [str]. ids of the tabs without a file
+        """
+        return [tab_id for tab_id in tab_ids
+                if not os.path.exists(self.tab_path(tab_id))]
+
+    def save(self, entries, texts):
+        """
+        Write the session index and the changed tab texts
+
+        The tabs of other instances, found in the index and not closed by
+        this one, are kept after the tabs of this instance.
+
+        :param entries: [dict]. tab entries in order, with 'tab_id',
+                        'label' and 'active' keys
+        :param texts: dict. {tab_id: text} of the changed tabs
+        :raise RuntimeError: if the session was neither loaded nor moved aside
+        """
+        if not self.writable:
+            raise RuntimeError('the session {} was not loaded, it is not '
+                               'overwritten'.format(self.path))
+
+        with self._lock:
+            unsaved = self._unsaved
+            self._unsaved = dict()
+        unsaved.update(texts)
+        texts = unsaved
+
+        try:
+            with fileIO.FileLock(self.lock_path):
+                for tab_id, text in texts.items():
+                    fileIO.atomic_write(self.tab_path(tab_id), text.encode(ENCODING))
+
+                tab_ids = set(entry['tab_id'] for entry in entries)
+                others = list()
+                if os.path.exists(self.index_path):
+                    try:
+                        others = [
+                            dict(entry, active=False) for entry in self.read_index()
+                            if entry['tab_id'] not in tab_ids and
+                            entry['tab_id'] not in self._owned and
+                            os.path.exists(self.tab_path(entry['tab_id']))]
+                    except (IOError, OSError, ValueError):
+                        LOGGER.exception('failed to read the tabs of the other '
+                                         'instances from %s', self.index_path)
+
+                index = {'version': VERSION, 'tabs': list(entries) + others}
+                fileIO.atomic_write(
+                    self.index_path,
+                    json.dumps(index, indent=1).encode(ENCODING))
+
+                # the tabs this instance closed
+                for tab_id in self._owned - tab_ids:
+                    try:
+                        os.remove(self.tab_path(tab_id))
+                    except OSError:
+                        pass
+                self._owned = tab_ids
+        except Exception:
+            LOGGER.exception('failed to save the session to %s', self.path)
+            with self._lock:
+                texts.update(self._unsaved)
+                self._unsaved = texts
+            raise
+
+    def save_async(self, entries, texts):
+        """
+        Save the session in the background, after any pending save
+
+        :param entries: [dict]. tab entries in order
+        :param texts: dict. {tab_id: text} of the changed tabs
+        :return: concurrent.futures.Future. the background save
+        """
+        if self._executor is None:
+            from concurrent import futures
+            self._executor = futures.ThreadPoolExecutor(max_workers=1)
+        self._pending = self._executor.submit(self.save, entries, texts)
+        return self._pending
+
+    def wait(self):
+        """
+        Block until the background save, if any, is done
+        """
+        if self._pending is not None:
+            from concurrent import futures
+            futures.wait([self._pending])
+            self._pending = None
@@ -0,0 +1,349 @@
+"""
+Deduplicated history of the tab texts
+
+A snapshot splits a text into chunks of whole lines, cut after the lines
+whose checksum matches a mask, so an edit only changes the chunks around
+it and the other chunks are shared with the previous snapshots. Chunks are
+stored once, by sha1, zlib compressed in an append-only pack, and a
+snapshot is the list of its chunk numbers. Thousands of snapshots of
+mostly identical scripts cost little more than their changes.
+
+Snapshots are taken in a worker thread. Like the run history, the files
+are append-only and read incrementally, and appends are serialized by an
+inter-process lock.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+from concurrent import futures
+
+from . import fileIO
+
+
+PACK_MAGIC = b'USEPACK1'
+INDEX_MAGIC = b'USECHNK1'
+
+# sha1 of the chunk, offset and size of its compressed data in the pack
+CHUNK_RECORD = struct.Struct('<20sQI')
+
+ENCODING = 'utf-8'
+COMPRESSION_LEVEL = 6
+
+# a chunk ends after a line whose crc32 has these bits clear, 16 lines
+# on average, once it holds MIN_CHUNK_CHARS
+BOUNDARY_MASK = 0xf
+MIN_CHUNK_CHARS = 256
+MAX_CHUNK_CHARS = 64 * 1024
+
+# number of decompressed chunks kept in memory
+CACHE_CHUNKS = 4096
+
+AUTOSAVE = 'autosave'
+CLEAR = 'before clear'
+CLOSE = 'before closing the tab'
+RELOAD = 'before reload from disk'
+RESTORE = 'before restore'
+
+
+class Snapshot(collections.namedtuple('Snapshot', [
+        'timestamp', 'tab_id', 'label', 'reason', 'text_hash', 'size',
+        'line_count', 'chunks'])):
+    """
+    Version of the text of a tab
+
+    :param timestamp: float. time the snapshot was taken
+    :param tab_id: str. session id of the tab
+    :param label: str. label of the tab at the time
+    :param reason: str. what triggered the snapshot, e.g. AUTOSAVE
+    :param text_hash: str. sha1 hex digest of the utf-8 text
+    :param size: int. number of characters of the text
+    :param line_count: int. number of lines of the text
+    :param chunks: (int). numbers of the chunks of the text, in order
+    """
+    __slots__ = ()
+
+
+def split_chunks(text, mask=BOUNDARY_MASK, min_chars=MIN_CHUNK_CHARS,
+                 max_chars=MAX_CHUNK_CHARS):
+    """
+    Split a text at content defined line boundaries
+
+    :param text: str. text to split
+    :param mask: int. bits of the crc32 of a line clear at a boundary
+    :param min_chars: int. size below which a chunk is never cut
+    :param max_chars: int. size from which a chunk is cut at the next line
+    :return: [bytes]. utf-8 chunks, joined they are the text
+    """
+    chunks = list()
+    lines = list()
+    length = 0
+    for line in text.splitlines(True):
+        data = line.encode(ENCODING)
+        lines.append(data)
+        length += len(data)
+        if length >= max_chars or (
+                length >= min_chars and not zlib.crc32(data) & mask):
+            chunks.append(b''.join(lines))
+            lines = list()
+            length = 0
+    if lines:
+        chunks.append(b''.join(lines))
+    return chunks
+
+
+class SnapshotStore(object):
+    """
+    Snapshots of the tab texts, and the chunk pack they refer to
+    """
+
+    def __init__(self, path):
+        """
+        Initialization
+
+        :param path: str. snapshot directory
+        """
+        self.path = path
+        self.pack_path = os.path.join(path, 'chunks.pack')
+        self.index_path = os.path.join(path, 'chunks.idx')
+        self.snapshots_path = os.path.join(path, 'snapshots.jsonl')
+        self.lock_path = os.path.join(path, '.lock')
+
+        self._executor = futures.ThreadPoolExecutor(max_workers=1)
+        self._pending = None
+        # the worker thread adds snapshots while the GUI thread reads them
+        self._lock = threading.RLock()
+        self._cache = collections.OrderedDict()
+        self._reset()
+
+    def _reset(self):
+        # (offset, size) in the pack of each chunk, by chunk number
+        self._chunks = list()
+        self._chunk_numbers = dict()
+        self._snapshots = list()
+        self._by_tab = dict()
+        # bytes of the index and snapshot files already read
+        self._index_offset = 0
+        self._snapshots_offset = 0
+
+    def refresh(self):
+        """
+        Read the chunks and snapshots appended since the last read, e.g.
+        by another editor instance
+        """
+        with self._lock:
+            self._read_index()
+            self._read_snapshots()
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, 'rb') as f:
+                if self._index_offset == 0:
+                    if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                        return
+                    self._index_offset = len(INDEX_MAGIC)
+                f.seek(self._index_offset)
+                data = f.read()
+        except (IOError, OSError):
+            return
+
+        # a record being written is read once complete
+        count = len(data) // CHUNK_RECORD.size
+        for digest, offset, size in CHUNK_RECORD.iter_unpack(
+                data[:count * CHUNK_RECORD.size]):
+            self._chunk_numbers[digest] = len(self._chunks)
+            self._chunks.append((offset, size))
+        self._index_offset += count * CHUNK_RECORD.size
+
+    def _read_snapshots(self):
+        try:
+            with open(self.snapshots_path, 'rb') as f:
+                f.seek(self._snapshots_offset)
+                data = f.read()
+        except (IOError, OSError):
+            return
+
+        # a line being written is read once complete
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            try:
+                values = json.loads(line.decode(ENCODING))
+                snapshot = Snapshot(
+                    values['time'], values['tab_id'], values['label'],
+                    values['reason'], values['hash'], values['size'],
+                    values['lines'], tuple(values['chunks']))
+            except (ValueError, KeyError, TypeError):
+                # e.g. the end of a write interrupted by a crash
+                continue
+            if any(number >= len(self._chunks) for number in snapshot.chunks):
+                continue
+            self._by_tab.setdefault(snapshot.tab_id, list()).append(len(self._snapshots))
+            self._snapshots.append(snapshot)
+        self._snapshots_offset += end
+
+    def snapshots(self, tab_id=None):
+        """
+        :param tab_id: str. only the snapshots of this tab
+        :return: [Snapshot]. snapshots, oldest first
+        """
+        with self._lock:
+            self.refresh()
+            if tab_id is None:
+                return list(self._snapshots)
+            return [self._snapshots[index] for index in self._by_tab.get(tab_id, list())]
+
+    def latest(self, tab_id):
+        """
+        :param tab_id: str. session id of a tab
+        :return: Snapshot. latest snapshot of the tab, None if it has none
+        """
+        with self._lock:
+            self.refresh()
+            indexes = self._by_tab.get(tab_id)
+            return self._snapshots[indexes[-1]] if indexes else None
+
+    def previous(self, snapshot):
+        """
+        :param snapshot: Snapshot. snapshot of a tab
+        :return: Snapshot. snapshot of the same tab before it, None if it
+                 is the first one
+        """
+        snapshots = self.snapshots(snapshot.tab_id)
+        index = snapshots.index(snapshot)
+        return snapshots[index - 1] if index else None
+
+    def add(self, tab_id, label, text, reason=AUTOSAVE):
+        """
+        Take a snapshot of a text, unless it is the latest one of the tab
+
+        :param tab_id: str. session id of the tab
+        :param label: str. label of the tab
+        :param text: str. text of the tab
+        :param reason: str. what triggered the snapshot
+        :return: Snapshot. new snapshot, None if the text is unchanged
+        """
+        chunks = split_chunks(text)
+        text_hash = hashlib.sha1()
+        for chunk in chunks:
+            text_hash.update(chunk)
+        text_hash = text_hash.hexdigest()
+
+        with self._lock:
+            latest = self.latest(tab_id)
+            if latest is not None and latest.text_hash == text_hash:
+                return None
+
+            with fileIO.FileLock(self.lock_path):
+                self.refresh()
+                numbers = self._write_chunks(chunks)
+                snapshot = Snapshot(
+                    time.time(), tab_id, label, reason, text_hash, len(text),
+                    text.count('\n') + 1, tuple(numbers))
+                line = json.dumps({
+                    'time': snapshot.timestamp, 'tab_id': tab_id, 'label': label,
+                    'reason': reason, 'hash': text_hash, 'size': snapshot.size,
+                    'lines': snapshot.line_count, 'chunks': numbers,
+                }, separators=(',', ':'))
+                with open(self.snapshots_path, 'ab') as f:
+                    f.write(line.encode(ENCODING) + b'\n')
+                self.refresh()
+        return snapshot
+
+    def _write_chunks(self, chunks):
+        """
+        Append the chunks not stored yet, the store lock being held
+
+        :param chunks: [bytes]. chunks of a text
+        :return: [int]. numbers of the chunks
+        """
+        numbers = list()
+        new = list()
+        new_numbers = dict()
+        with open(self.pack_path, 'ab') as pack:
+            offset = pack.tell()
+            if offset == 0:
+                pack.write(PACK_MAGIC)
+                offset = len(PACK_MAGIC)
+            for chunk in chunks:
+                digest = hashlib.sha1(chunk).digest()
+                number = self._chunk_numbers.get(digest, new_numbers.get(digest))
+                if number is None:
+                    data = zlib.compress(chunk, COMPRESSION_LEVEL)
+                    pack.write(data)
+                    number = new_numbers[digest] = len(self._chunks) + len(new)
+                    new.append(CHUNK_RECORD.pack(digest, offset, len(data)))
+                    offset += len(data)
+                numbers.append(number)
+
+        if new:
+            with open(self.index_path, 'ab') as index:
+                size = index.tell()
+                if size == 0:
+                    index.write(INDEX_MAGIC)
+                elif (size - len(INDEX_MAGIC)) % CHUNK_RECORD.size:
+                    # a write interrupted by a crash
+                    index.truncate(size - (size - len(INDEX_MAGIC)) % CHUNK_RECORD.size)
+                index.write(b''.join(new))
+        return numbers
+
+    def add_async(self, tab_id, label, text, reason=AUTOSAVE):
+        """
+        Take a snapshot in the background, after any pending one
+
+        :return: concurrent.futures.Future. the background snapshot
+        """
+        self._pending = self._executor.submit(self.add, tab_id, label, text, reason)
+        return self._pending
+
+    def wait(self):
+        """
+        Block until the background snapshots, if any, are taken
+        """
+        if self._pending is not None:
+            futures.wait([self._pending])
+            self._pending = None
+
+    def text(self, snapshot):
+        """
+        :param snapshot: Snapshot. snapshot of a tab
+        :return: str. text of the snapshot
+        :raise ValueError: if a chunk of the pack is damaged
+        """
+        with self._lock:
+            self.refresh()
+            parts = list()
+            with open(self.pack_path, 'rb') as pack:
+                for number in snapshot.chunks:
+                    chunk = self._cache.get(number)
+                    if chunk is None:
+                        offset, size = self._chunks[number]
+                        pack.seek(offset)
+                        try:
+                            chunk = zlib.decompress(pack.read(size))
+                        except zlib.error as error:
+                            raise ValueError('damaged chunk {}: {}'.format(number, error))
+                        self._cache[number] = chunk
+                        if len(self._cache) > CACHE_CHUNKS:
+                            self._cache.popitem(last=False)
+                    else:
+                        self._cache.move_to_end(number)
+                    parts.append(chunk)
+        return b''.join(parts).decode(ENCODING)
+
+    def disk_size(self):
+        """
+        :return: int. bytes used by the store files
+        """
+        size = 0
+        for path in (self.pack_path, self.index_path, self.snapshots_path):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
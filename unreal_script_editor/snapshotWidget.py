@@ -0,0 +1,200 @@
+"""
+Timeline of the snapshots of the tabs, to diff and restore earlier versions
+"""
+
+import difflib
+import time
+
+from Qt import QtWidgets, QtCore, QtGui
+
+from .reportTable import NumberItem
+
+
+# maximum number of snapshots listed, the latest ones
+MAX_LISTED = 1000
+
+TAB_SCOPE = 'Snapshots of this tab'
+ALL_SCOPE = 'Snapshots of every tab, closed ones included'
+
+PREVIOUS_BASE = 'Changes since the previous snapshot'
+CURRENT_BASE = 'Changes from the snapshot to the current text'
+
+
+class DiffHighlighter(QtGui.QSyntaxHighlighter):
+    """
+    Colors of the added, removed and hunk header lines of a unified diff
+    """
+    FORMATS = {
+        '+': QtGui.QColor(110, 190, 110),
+        '-': QtGui.QColor(220, 90, 90),
+        '@': QtGui.QColor(100, 150, 220),
+    }
+
+    def highlightBlock(self, text):
+        color = self.FORMATS.get(text[:1])
+        if color is not None:
+            self.setFormat(0, len(text), color)
+
+
+class SnapshotDialog(QtWidgets.QDialog):
+    """
+    Snapshots of a tab, or of every tab, with the diff of the selected one
+    """
+    HEADERS = ['Time', 'Tab', 'Reason', 'Lines']
+    # snapshot to restore into its tab, or to open in a new tab
+    restore_requested = QtCore.Signal(object)
+    open_requested = QtCore.Signal(object)
+
+    def __init__(self, store, current_text, parent=None):
+        """
+        Initialization
+
+        :param store: snapshotStore.SnapshotStore. snapshots of the tabs
+        :param current_text: callable. returns the current text of a tab
+                             from its id, None if the tab is closed
+        """
+        super(SnapshotDialog, self).__init__(parent)
+        self.setWindowTitle('Tab History')
+        self.resize(900, 560)
+        self.store = store
+        self.current_text = current_text
+        self.tab_id = None
+        self.listed = list()
+
+        self.ui_scope_combo = QtWidgets.QComboBox()
+        self.ui_scope_combo.addItems([TAB_SCOPE, ALL_SCOPE])
+        self.ui_base_combo = QtWidgets.QComboBox()
+        self.ui_base_combo.addItems([PREVIOUS_BASE, CURRENT_BASE])
+
+        self.ui_snapshot_table = QtWidgets.QTableWidget(0, len(self.HEADERS))
+        self.ui_snapshot_table.setHorizontalHeaderLabels(self.HEADERS)
+        self.ui_snapshot_table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.ui_snapshot_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.ui_snapshot_table.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.ui_snapshot_table.verticalHeader().hide()
+        self.ui_snapshot_table.horizontalHeader().setStretchLastSection(True)
+
+        self.ui_diff_edit = QtWidgets.QPlainTextEdit()
+        self.ui_diff_edit.setReadOnly(True)
+        self.ui_diff_edit.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
+        self.ui_diff_edit.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont))
+        self._highlighter = DiffHighlighter(self.ui_diff_edit.document())
+
+        self.ui_status_label = QtWidgets.QLabel()
+        self.ui_restore_btn = QtWidgets.QPushButton('Restore')
+        self.ui_restore_btn.setToolTip(
+            'replace the text of the tab by the snapshot, as one undo step')
+        self.ui_open_btn = QtWidgets.QPushButton('Open in New Tab')
+
+        options = QtWidgets.QHBoxLayout()
+        options.addWidget(self.ui_scope_combo)
+        options.addWidget(self.ui_base_combo)
+        options.addStretch()
+
+        splitter = QtWidgets.QSplitter(QtCore.Qt.Horizontal)
+        splitter.addWidget(self.ui_snapshot_table)
+        splitter.addWidget(self.ui_diff_edit)
+        splitter.setSizes([340, 560])
+
+        buttons = QtWidgets.QHBoxLayout()
+        buttons.addWidget(self.ui_status_label)
+        buttons.addStretch()
+        buttons.addWidget(self.ui_open_btn)
+        buttons.addWidget(self.ui_restore_btn)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addLayout(options)
+        layout.addWidget(splitter)
+        layout.addLayout(buttons)
+
+        self.ui_scope_combo.currentIndexChanged.connect(self.refresh)
+        self.ui_base_combo.currentIndexChanged.connect(self.show_diff)
+        self.ui_snapshot_table.itemSelectionChanged.connect(self.show_diff)
+        self.ui_restore_btn.clicked.connect(
+            lambda: self.emit_selected(self.restore_requested))
+        self.ui_open_btn.clicked.connect(
+            lambda: self.emit_selected(self.open_requested))
+
+    def set_tab(self, tab_id):
+        """
+        :param tab_id: str. session id of the current tab
+        """
+        self.tab_id = tab_id
+        self.refresh()
+
+    def refresh(self):
+        """
+        List the snapshots of the chosen scope, latest first
+        """
+        if self.ui_scope_combo.currentText() == ALL_SCOPE:
+            snapshots = self.store.snapshots()
+        else:
+            snapshots = self.store.snapshots(self.tab_id)
+        self.listed = snapshots[::-1][:MAX_LISTED]
+
+        table = self.ui_snapshot_table
+        table.setSortingEnabled(False)
+        table.setRowCount(len(self.listed))
+        for row, snapshot in enumerate(self.listed):
+            cells = [
+                QtWidgets.QTableWidgetItem(time.strftime(
+                    '%Y-%m-%d %H:%M:%S', time.localtime(snapshot.timestamp))),
+                QtWidgets.QTableWidgetItem(snapshot.label),
+                QtWidgets.QTableWidgetItem(snapshot.reason),
+                NumberItem(snapshot.line_count, str(snapshot.line_count)),
+            ]
+            for column, cell in enumerate(cells):
+                table.setItem(row, column, cell)
+        table.resizeColumnsToContents()
+
+        self.ui_status_label.setText('{} snapshots, {:.1f} MiB on disk'.format(
+            len(snapshots), self.store.disk_size() / 1024.0 / 1024.0))
+        if self.listed:
+            table.selectRow(0)
+        else:
+            self.ui_diff_edit.clear()
+        self.ui_restore_btn.setEnabled(bool(self.listed))
+        self.ui_open_btn.setEnabled(bool(self.listed))
+
+    def selected(self):
+        """
+        :return: snapshotStore.Snapshot. selected snapshot, None if none
+        """
+        row = self.ui_snapshot_table.currentRow()
+        if not 0 <= row < len(self.listed):
+            return None
+        return self.listed[row]
+
+    def emit_selected(self, signal):
+        snapshot = self.selected()
+        if snapshot is not None:
+            signal.emit(snapshot)
+
+    def show_diff(self):
+        """
+        Show the changes of the selected snapshot
+        """
+        snapshot = self.selected()
+        if snapshot is None:
+            return
+
+        try:
+            text = self.store.text(snapshot)
+            if self.ui_base_combo.currentText() == CURRENT_BASE:
+                base, base_name = self.current_text(snapshot.tab_id), 'current'
+                if base is None:
+                    base, base_name = '', 'closed tab'
+                before, after = text, base
+                names = ('snapshot', base_name)
+            else:
+                previous = self.store.previous(snapshot)
+                before = '' if previous is None else self.store.text(previous)
+                after = text
+                names = ('previous', 'snapshot')
+        except (IOError, OSError, ValueError) as error:
+            self.ui_diff_edit.setPlainText('Failed to read the snapshot: {}'.format(error))
+            return
+
+        diff = '\n'.join(difflib.unified_diff(
+            before.splitlines(), after.splitlines(), names[0], names[1], lineterm=''))
+        self.ui_diff_edit.setPlainText(diff or 'No change')
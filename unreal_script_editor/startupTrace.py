@@ -0,0 +1,110 @@
+"""
+Timing of the editor startup phases
+
+The window construction records how long each phase takes (imports, ui
+loading, session loading, tab creation, stylesheet...), the report is
+logged once the window is shown, with a warning above the time budget.
+"""
+
+import contextlib
+import logging
+import time
+
+
+LOGGER = logging.getLogger(__name__)
+
+# seconds a cold launch is expected to take at most
+BUDGET = 0.5
+
+
+class StartupTrace(object):
+    """
+    Ordered record of named, timed phases, only active while tracing
+    """
+
+    def __init__(self):
+        """
+        Initialization
+        """
+        self.phases = list()
+        self.active = False
+        # time spent in the nested phases of each open phase
+        self._nested = list()
+
+    def start(self):
+        """
+        Start recording, discarding the previous phases
+        """
+        self.phases = list()
+        self.active = True
+
+    def stop(self):
+        self.active = False
+
+    def add(self, name, seconds):
+        """
+        Record a phase timed by the caller
+
+        :param name: str. phase name
+        :param seconds: float. duration of the phase
+        """
+        if self.active:
+            self.phases.append((name, seconds))
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Time the enclosed block as a phase, the phases nested in it are
+        excluded from its duration
+
+        :param name: str. phase name
+        """
+        start = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            nested = self._nested.pop()
+            if self._nested:
+                self._nested[-1] += seconds
+            self.add(name, seconds - nested)
+
+    def total(self):
+        """
+        :return: float. seconds spent in every phase
+        """
+        return sum(seconds for _, seconds in self.phases)
+
+    def report(self):
+        """
+        :return: [str]. one line per phase, the phases of the same name
+                 summed, then the total
+        """
+        durations = dict()
+        names = list()
+        for name, seconds in self.phases:
+            if name not in durations:
+                names.append(name)
+                durations[name] = 0.0
+            durations[name] += seconds
+
+        lines = ['{:<16}{:8.1f} ms'.format(name, durations[name] * 1000)
+                 for name in names]
+        lines.append('{:<16}{:8.1f} ms'.format('total', self.total() * 1000))
+        return lines
+
+    def log(self, budget=BUDGET):
+        """
+        Log the report, as a warning if the startup exceeded the budget
+
+        :param budget: float. expected maximum startup time in seconds
+        """
+        message = 'startup trace:\n' + '\n'.join(self.report())
+        if self.total() > budget:
+            LOGGER.warning('%s\nover the %.0f ms budget', message, budget * 1000)
+        else:
+            LOGGER.info(message)
+
+
+TRACE = StartupTrace()
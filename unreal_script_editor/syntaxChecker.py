@@ -0,0 +1,228 @@
+"""
+Live syntax checking of the script tabs
+
+A tab is compiled in a worker thread once typing pauses, and the line of a
+syntax error is marked in the editor gutter. Successfully compiled sources
+land in ``codeCache.CACHE``, so running an unchanged tab reuses the code
+object, and errors are cached by source hash, so an unchanged tab is never
+compiled twice.
+
+Compiling holds the GIL, large sources are therefore compiled in a python
+subprocess, so the GUI thread keeps responding while they are checked.
+
+The same background pass refreshes the symbol outline of the tab (see
+``outline``).
+"""
+
+import collections
+import json
+import sys
+import threading
+
+from concurrent import futures
+
+from Qt import QtCore
+
+from . import codeCache, executor, outline
+
+
+# delay (ms) after the last edit before a tab is checked
+CHECK_DELAY = 400
+
+# number of characters above which a source is compiled in a subprocess
+PROCESS_THRESHOLD = 200000
+
+# number of cached error results
+MAX_ERRORS = 256
+
+# subprocess entry point, printing the syntax error of the source on stdin
+PROCESS_BOOTSTRAP = (
+    "import json, sys\n"
+    "source = sys.stdin.buffer.read().decode('utf-8', 'surrogatepass')\n"
+    "try:\n"
+    "    compile(source, {filename!r}, 'exec', dont_inherit=True)\n"
+    "except (SyntaxError, ValueError) as error:\n"
+    "    print(json.dumps([getattr(error, 'lineno', None) or 1,"
+    " getattr(error, 'msg', None) or str(error)]))\n"
+).format(filename=executor.FILENAME)
+
+_EXECUTOR = None
+_ERRORS = collections.OrderedDict()
+_ERRORS_LOCK = threading.Lock()
+
+
+def worker():
+    """
+    :return: concurrent.futures.ThreadPoolExecutor. single thread executor
+             shared by the checkers of every tab
+    """
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = futures.ThreadPoolExecutor(max_workers=1)
+    return _EXECUTOR
+
+
+def python_executable():
+    """
+    :return: str. python interpreter running the subprocess checks,
+             None if there is none
+    """
+    if 'unreal' in sys.modules:
+        # sys.executable is the editor itself within Unreal
+        get_path = getattr(sys.modules['unreal'],
+                           'get_interpreter_executable_path', None)
+        return get_path() if get_path else None
+    return sys.executable
+
+
+def check(source):
+    """
+    Compile a source and report its syntax error, if any
+
+    :param source: str. python source
+    :return: (int, str). 1 based line and message of the syntax error,
+             None if the source compiles
+    """
+    key = codeCache.source_hash(source)
+    with _ERRORS_LOCK:
+        if key in _ERRORS:
+            _ERRORS.move_to_end(key)
+            return _ERRORS[key]
+
+    interpreter = python_executable()
+    if len(source) > PROCESS_THRESHOLD and interpreter:
+        error = check_process(source, interpreter)
+    else:
+        error = None
+        try:
+            codeCache.CACHE.compile(source, 'exec', executor.FILENAME)
+        except (SyntaxError, ValueError) as exception:
+            error = (getattr(exception, 'lineno', None) or 1,
+                     getattr(exception, 'msg', None) or str(exception))
+
+    with _ERRORS_LOCK:
+        _ERRORS[key] = error
+        while len(_ERRORS) > MAX_ERRORS:
+            _ERRORS.popitem(last=False)
+    return error
+
+
+def analyze(source):
+    """
+    :param source: str. python source
+    :return: ((int, str), [outline.Symbol]). syntax error as given by
+             check, and symbols of the statements that parse
+    """
+    return check(source), outline.parse_symbols(source)
+
+
+def check_process(source, interpreter):
+    """
+    Compile a source in a python subprocess
+
+    :param source: str. python source
+    :param interpreter: str. python executable
+    :return: (int, str). 1 based line and message of the syntax error,
+             None if the source compiles or the check failed
+    """
+    # only needed by large sources, not imported on startup
+    import subprocess
+
+    try:
+        process = subprocess.Popen(
+            [interpreter, '-c', PROCESS_BOOTSTRAP],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL)
+        output, _ = process.communicate(source.encode('utf-8', 'surrogatepass'))
+    except OSError:
+        return None
+
+    if not output.strip():
+        return None
+    try:
+        line, message = json.loads(output.decode('utf-8'))
+    except ValueError:
+        return None
+    return line, message
+
+
+class SyntaxChecker(QtCore.QObject):
+    """
+    Check the script of a code editor in the background after each edit
+    """
+    checked = QtCore.Signal(int, object)
+    outlined = QtCore.Signal(object)
+
+    def __init__(self, editor):
+        """
+        Initialization
+
+        :param editor: CodeEditor. editor to check and mark
+        """
+        super(SyntaxChecker, self).__init__(editor)
+        self._editor = editor
+        self._pending = False
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(CHECK_DELAY)
+        self._timer.timeout.connect(self.request)
+
+        self.checked.connect(self.on_checked)
+        editor.document().contentsChanged.connect(self._timer.start)
+        self._timer.start()
+
+    def request(self):
+        """
+        Check the current script, unless a check is still running: the
+        script is then checked again once it is done
+        """
+        if self._pending:
+            return
+
+        self._pending = True
+        document = self._editor.document()
+        future = worker().submit(analyze, document.toPlainText())
+        revision = document.revision()
+        future.add_done_callback(
+            lambda done: self.emit_checked(revision, done))
+
+    def emit_checked(self, revision, future):
+        """
+        Report a finished check, from the worker thread
+
+        :param revision: int. document revision that was checked
+        :param future: concurrent.futures.Future. finished check
+        """
+        result = (None, None) if future.exception() else future.result()
+        try:
+            # queued to the GUI thread
+            self.checked.emit(revision, result)
+        except RuntimeError:
+            # the editor was deleted meanwhile
+            pass
+
+    def on_checked(self, revision, result):
+        """
+        Mark the error of a finished check and report the symbols, or
+        check again if the script changed meanwhile
+
+        :param revision: int. document revision that was checked
+        :param result: ((int, str), [outline.Symbol]). line and message of
+                       the syntax error, and symbols of the script
+        """
+        self._pending = False
+        if revision != self._editor.document().revision():
+            self._timer.start()
+            return
+
+        error, symbols = result
+        if symbols is not None:
+            self.outlined.emit(symbols)
+
+        if error is None:
+            self._editor.set_error_lines(dict())
+        else:
+            line, message = error
+            self._editor.set_error_lines({line - 1: message})
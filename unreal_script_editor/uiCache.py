@@ -0,0 +1,153 @@
+"""
+Precompiled Qt Designer files
+
+Parsing a .ui file at runtime is slow, so each one is compiled once into a
+python module with the uic of the current Qt binding. The module is cached
+on disk and compiled again only when the .ui file changes. If the binding
+has no usable uic, the .ui file is loaded at runtime as before.
+"""
+
+import importlib.util
+import io
+import logging
+import os
+import shutil
+
+import Qt
+from Qt import _loadUi
+
+from . import fileIO
+
+
+LOGGER = logging.getLogger(__name__)
+
+CACHE_PATH = fileIO.data_path('cache', 'ui')
+
+# header of the compiled modules identifying their .ui source
+SOURCE_HEADER = '# source: {size} {mtime}\n'
+
+# generated classes, by compiled module path
+_CLASSES = dict()
+
+
+def module_path(ui_path):
+    """
+    :param ui_path: str. path of a .ui file
+    :return: str. path of its compiled module for the current binding
+    """
+    name = os.path.splitext(os.path.basename(ui_path))[0]
+    return os.path.join(
+        CACHE_PATH, '{}_{}.py'.format(name, Qt.__binding__.lower()))
+
+
+def source_header(ui_path):
+    """
+    :param ui_path: str. path of a .ui file
+    :return: str. header line matching the current state of the file
+    """
+    stat = os.stat(ui_path)
+    return SOURCE_HEADER.format(size=stat.st_size, mtime=stat.st_mtime_ns)
+
+
+def is_stale(ui_path, path):
+    """
+    :param ui_path: str. path of a .ui file
+    :param path: str. path of its compiled module
+    :return: bool. whether the module is missing or older than the file
+    """
+    try:
+        with open(path, 'r') as f:
+            header = f.readline()
+    except (IOError, OSError):
+        return True
+    return header != source_header(ui_path)
+
+
+def compile_ui(ui_path):
+    """
+    Generate the python source of a .ui file
+
+    :param ui_path: str. path of a .ui file
+    :return: str. python source, None if the binding has no uic
+    """
+    if Qt.__binding__ in ('PyQt5', 'PyQt6'):
+        uic = __import__(Qt.__binding__, fromlist=['uic']).uic
+        source = io.StringIO()
+        uic.compileUi(ui_path, source)
+        return source.getvalue()
+
+    # pyside ships uic as an executable, next to the package or on PATH
+    import subprocess
+
+    binding = __import__(Qt.__binding__)
+    candidates = [
+        os.path.join(os.path.dirname(binding.__file__), 'uic'),
+        os.path.join(os.path.dirname(binding.__file__), 'uic.exe'),
+        shutil.which('{}-uic'.format(Qt.__binding__.lower())),
+    ]
+    for executable in candidates:
+        if executable and os.path.isfile(executable):
+            args = [executable, ui_path]
+            if not executable.endswith('-uic'):
+                args[1:1] = ['-g', 'python']
+            return subprocess.check_output(args).decode('utf-8')
+    return None
+
+
+def ui_class(ui_path):
+    """
+    Get the generated class of a .ui file, compiling it if stale
+
+    :param ui_path: str. path of a .ui file
+    :return: type. Ui_* class with a setupUi method, None if the file
+             could not be compiled
+    """
+    path = module_path(ui_path)
+    if path in _CLASSES:
+        return _CLASSES[path]
+
+    cls = None
+    try:
+        fresh = not is_stale(ui_path, path)
+        if not fresh:
+            source = compile_ui(ui_path)
+            if source is None:
+                LOGGER.info('no uic found for %s, loading %s at runtime',
+                            Qt.__binding__, ui_path)
+            else:
+                header = source_header(ui_path)
+                fileIO.atomic_write(path, (header + source).encode('utf-8'))
+                fresh = True
+
+        if fresh:
+            spec = importlib.util.spec_from_file_location(
+                'unreal_script_editor_ui_{}'.format(
+                    os.path.splitext(os.path.basename(path))[0]), path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            cls = next(value for name, value in vars(module).items()
+                       if name.startswith('Ui_'))
+    except Exception:
+        LOGGER.exception('failed to compile %s, loading it at runtime', ui_path)
+
+    _CLASSES[path] = cls
+    return cls
+
+
+def load_ui(ui_path, widget):
+    """
+    Build the content of a .ui file into a widget, like ``Qt._loadUi``:
+    the child widgets become attributes of the widget
+
+    :param ui_path: str. path of a .ui file
+    :param widget: QWidget. base instance to build into
+    """
+    cls = ui_class(ui_path)
+    if cls is None:
+        _loadUi(ui_path, widget)
+        return
+
+    ui = cls()
+    ui.setupUi(widget)
+    for name, value in vars(ui).items():
+        setattr(widget, name, value)